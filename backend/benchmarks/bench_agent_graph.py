@@ -0,0 +1,38 @@
+"""
+代理图编译开销基准测试
+
+对比每个请求都调用 build_agent_graph() 与复用注册表中已编译图的单请求开销。
+
+运行：
+uv run python benchmarks/bench_agent_graph.py
+"""
+
+import time
+
+from synphora.agent import AgentGraphRegistry, build_agent_graph
+
+ITERATIONS = 200
+
+
+def bench(name: str, fn) -> float:
+    fn()  # 预热
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn()
+    elapsed = time.perf_counter() - start
+    per_request_us = elapsed / ITERATIONS * 1e6
+    print(f'{name:<24} {per_request_us:>10.1f} us/request')
+    return per_request_us
+
+
+def main():
+    registry = AgentGraphRegistry()
+
+    print(f'iterations: {ITERATIONS}')
+    rebuild = bench('build per request', build_agent_graph)
+    cached = bench('registry.get_graph()', registry.get_graph)
+    print(f'saved per request: {rebuild - cached:.1f} us ({rebuild / cached:.0f}x)')
+
+
+if __name__ == '__main__':
+    main()
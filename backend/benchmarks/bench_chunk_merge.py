@@ -0,0 +1,102 @@
+"""
+流式分片归并基准测试
+
+对比逐个 `final_message + chunk` 折叠与 AIMessageAccumulator 在 5k-50k 分片上的耗时。
+每种规模分别测试纯文本回答和带长参数的工具调用（如 generate_mind_map）。
+
+运行：
+uv run python benchmarks/bench_chunk_merge.py
+"""
+
+import time
+
+from langchain_core.messages import AIMessageChunk
+
+from synphora.stream_accumulator import AIMessageAccumulator
+
+CHUNK_COUNTS = [5_000, 10_000, 20_000, 50_000]
+# 工具调用参数的折叠归并是平方复杂度，超过该规模耗时数分钟，不再运行
+TOOL_CALL_FOLD_LIMIT = 10_000
+
+
+def make_text_chunks(count: int) -> list[AIMessageChunk]:
+    return [AIMessageChunk(content="动态", id="run-bench") for _ in range(count)]
+
+
+def make_tool_call_chunks(count: int) -> list[AIMessageChunk]:
+    chunks = [
+        AIMessageChunk(
+            content="",
+            tool_call_chunks=[
+                {
+                    "name": "generate_mind_map",
+                    "args": '{"markdown_content": "',
+                    "id": "call_bench",
+                    "index": 0,
+                }
+            ],
+        )
+    ]
+    for _ in range(count - 2):
+        chunks.append(
+            AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": None, "args": "+ 子问题\\n", "id": None, "index": 0}
+                ],
+            )
+        )
+    chunks.append(
+        AIMessageChunk(
+            content="",
+            tool_call_chunks=[{"name": None, "args": '"}', "id": None, "index": 0}],
+        )
+    )
+    return chunks
+
+
+def fold(chunks):
+    final_message = None
+    for chunk in chunks:
+        final_message = chunk if final_message is None else final_message + chunk
+    return final_message
+
+
+def accumulate(chunks):
+    accumulator = AIMessageAccumulator()
+    for chunk in chunks:
+        accumulator.add(chunk)
+    return accumulator.build()
+
+
+def timed(fn, chunks) -> float:
+    start = time.perf_counter()
+    fn(chunks)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f'{"case":<12} {"chunks":>8} {"fold":>10} {"accumulator":>12} {"speedup":>8}')
+    for count in CHUNK_COUNTS:
+        for case, make_chunks in (
+            ("text", make_text_chunks),
+            ("tool_call", make_tool_call_chunks),
+        ):
+            chunks = make_chunks(count)
+            accumulate_seconds = timed(accumulate, chunks)
+            if case == "tool_call" and count > TOOL_CALL_FOLD_LIMIT:
+                print(
+                    f'{case:<12} {count:>8} {"skipped":>10} '
+                    f'{accumulate_seconds:>11.3f}s {"-":>8}'
+                )
+                continue
+
+            fold_seconds = timed(fold, chunks)
+            print(
+                f'{case:<12} {count:>8} {fold_seconds:>9.3f}s '
+                f'{accumulate_seconds:>11.3f}s {fold_seconds / accumulate_seconds:>7.1f}x'
+            )
+
+
+if __name__ == '__main__':
+    main()
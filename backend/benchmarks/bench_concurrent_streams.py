@@ -0,0 +1,125 @@
+"""
+并发流式对话基准测试
+
+使用一个按固定间隔吐 token 的假模型，对比同步推理节点（stream，在线程池中阻塞读取）
+与异步推理节点（astream）在单个 worker 内能同时维持多少条流。
+
+运行：
+uv run python benchmarks/bench_concurrent_streams.py
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Iterator
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langgraph.graph import END, START, StateGraph
+
+from synphora import agent
+from synphora.agent import AgentRequest, AgentState
+from synphora.langgraph_sse import write_sse_event
+from synphora.llm import llm_client_registry
+from synphora.sse import TextMessageEvent
+from synphora.stream_accumulator import AIMessageAccumulator
+
+TOKENS_PER_STREAM = 20
+TOKEN_INTERVAL_SECONDS = 0.02
+CONCURRENCY_LEVELS = [1, 10, 50, 100, 200]
+
+
+class SlowFakeChatModel(BaseChatModel):
+    """按固定间隔输出 token 的假模型，模拟等待 LLM 供应商的网络延迟"""
+
+    tokens: int = TOKENS_PER_STREAM
+    interval: float = TOKEN_INTERVAL_SECONDS
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        message = AIMessage(content="x" * self.tokens)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> Iterator[ChatGenerationChunk]:
+        for _ in range(self.tokens):
+            time.sleep(self.interval)
+            yield ChatGenerationChunk(message=AIMessageChunk(content="x"))
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        for _ in range(self.tokens):
+            await asyncio.sleep(self.interval)
+            yield ChatGenerationChunk(message=AIMessageChunk(content="x"))
+
+
+def sync_reason_node(state: AgentState) -> AgentState:
+    """改造前的同步推理节点"""
+    llm = llm_client_registry.get_client_with_tools(state["request"].model_key, [])
+    message_id = agent.generate_id()
+    accumulator = AIMessageAccumulator()
+    for chunk in llm.stream(state["messages"]):
+        accumulator.add(chunk)
+        if chunk.content:
+            write_sse_event(
+                TextMessageEvent.new(message_id=message_id, content=chunk.content)
+            )
+    return {"messages": [accumulator.build()]}
+
+
+def build_graph(reason_node):
+    graph = StateGraph(AgentState)
+    graph.add_node("reason", reason_node)
+    graph.add_edge(START, "reason")
+    graph.add_edge("reason", END)
+    return graph.compile()
+
+
+async def run_stream(graph, index: int) -> int:
+    state: AgentState = {
+        "request": AgentRequest(
+            message="hi", model_key="fake", session_id=f"bench-{index}"
+        ),
+        "messages": [HumanMessage(content="hi")],
+    }
+    events = 0
+    async for kind, _ in graph.astream(state, stream_mode=["custom", "values"]):
+        if kind == "custom":
+            events += 1
+    return events
+
+
+async def bench(name: str, graph, concurrency: int) -> None:
+    start = time.perf_counter()
+    await asyncio.gather(*(run_stream(graph, i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    single_stream = TOKENS_PER_STREAM * TOKEN_INTERVAL_SECONDS
+    effective = concurrency * single_stream / elapsed
+    print(
+        f'{name:<8} streams={concurrency:<5} wall={elapsed:>6.2f}s '
+        f'effective concurrency={effective:>6.1f}'
+    )
+
+
+async def main():
+    fake_model = SlowFakeChatModel()
+    llm_client_registry.get_client_with_tools = lambda model_key, tools: fake_model
+
+    sync_graph = build_graph(sync_reason_node)
+    async_graph = build_graph(agent.reason_node)
+
+    single_stream = TOKENS_PER_STREAM * TOKEN_INTERVAL_SECONDS
+    print(f'tokens/stream={TOKENS_PER_STREAM}, single stream ~ {single_stream:.2f}s')
+    for concurrency in CONCURRENCY_LEVELS:
+        await bench('sync', sync_graph, concurrency)
+        await bench('async', async_graph, concurrency)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
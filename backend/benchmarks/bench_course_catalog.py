@@ -0,0 +1,81 @@
+"""
+课程目录加载基准测试
+
+生成 5000 门课程的数据目录，测量：
+- 冷启动：没有目录索引，解析每个课程清单
+- 热启动：加载目录索引，再增量扫描（只检查清单文件的 mtime 和大小）
+- 增量扫描：修改 10 门课程的清单后重新扫描
+
+运行：
+uv run python benchmarks/bench_course_catalog.py
+"""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from synphora.course import CourseManager
+from synphora.course_catalog import CourseCatalog
+
+COURSE_COUNT = 5000
+CHANGED_COUNT = 10
+
+
+def write_courses(data_dir: Path):
+    for i in range(COURSE_COUNT):
+        slug = f'{i:05d}-course'
+        course_dir = data_dir / f'collection-{i // 1000}' / slug
+        course_dir.mkdir(parents=True)
+        manifest = {
+            "title": f"{i} 例题精讲",
+            "tags": ["动态规划" if i % 2 else "链表"],
+            "summary": "本文讲解动态规划问题的解题步骤。" * 5,
+        }
+        (course_dir / 'course.json').write_text(
+            json.dumps(manifest, ensure_ascii=False), encoding='utf-8'
+        )
+        (course_dir / f'{slug}.md').write_text('# 例题\n\n' + '正文。' * 2000)
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / 'data'
+        index_path = Path(tmp) / 'course-index.json'
+        write_courses(data_dir)
+
+        # 课程目录在第一次访问时才扫描
+        def first_access():
+            CourseManager(catalog=CourseCatalog(data_dir, index_path)).list_courses()
+
+        cold = timed(first_access)
+        warm = timed(first_access)
+
+        manager = CourseManager(
+            catalog=CourseCatalog(data_dir, index_path), rescan_interval=0
+        )
+        manager.list_courses()
+        unchanged = timed(manager.rescan)
+        for i in range(CHANGED_COUNT):
+            manifest = data_dir / 'collection-0' / f'{i:05d}-course' / 'course.json'
+            manifest.write_text(
+                json.dumps({"title": f"{i} 例题精讲（修订）"}, ensure_ascii=False),
+                encoding='utf-8',
+            )
+        changed = timed(manager.rescan)
+
+    print(f'courses: {COURSE_COUNT}')
+    print(f'cold start (no index):         {cold:8.1f} ms')
+    print(f'warm start (index + scan):     {warm:8.1f} ms')
+    print(f'rescan, no changes:            {unchanged:8.1f} ms')
+    print(f'rescan, {CHANGED_COUNT} changed manifests: {changed:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+课程引用保存基准测试
+
+同一篇课程在多轮对话中被反复引用，测量每次保存 artifact 的耗时和存储目录中的数据量：
+- 复制：读取课程全文，用 create_artifact_with_id 写入一份副本（原来的做法）
+- 虚拟 artifact：create_virtual_artifact 只记录课程文件路径，重复引用时不做任何写入
+
+运行：
+uv run python benchmarks/bench_course_citation.py
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+from synphora.course import course_manager
+from synphora.file_storage import FileStorage
+from synphora.models import ArtifactRole, ArtifactType
+
+CITATIONS = 1000
+
+
+def storage_bytes(storage: FileStorage) -> int:
+    return sum(p.stat().st_size for p in storage.storage_path.iterdir() if p.is_file())
+
+
+def bench_copy(storage: FileStorage, artifact_id: str) -> float:
+    course = course_manager.get_course(artifact_id)
+    start = time.perf_counter()
+    for _ in range(CITATIONS):
+        storage.create_artifact_with_id(
+            artifact_id=artifact_id,
+            title=course.title,
+            content=course_manager.read_course_content(artifact_id),
+            artifact_type=ArtifactType.COURSE,
+            role=ArtifactRole.ASSISTANT,
+        )
+    return (time.perf_counter() - start) / CITATIONS
+
+
+def bench_virtual(storage: FileStorage, artifact_id: str) -> float:
+    course = course_manager.get_course(artifact_id)
+    start = time.perf_counter()
+    for _ in range(CITATIONS):
+        storage.create_virtual_artifact(
+            artifact_id=artifact_id,
+            title=course.title,
+            source_path=course_manager.get_course_file_path(artifact_id),
+            artifact_type=ArtifactType.COURSE,
+            role=ArtifactRole.ASSISTANT,
+        )
+    return (time.perf_counter() - start) / CITATIONS
+
+
+def main():
+    artifact_id = course_manager.list_courses()[0].artifact_id
+    print(f'{"mode":>8} {"us/citation":>12} {"storage KB":>11}')
+    for name, bench in [('copy', bench_copy), ('virtual', bench_virtual)]:
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = FileStorage(str(Path(tmp)))
+            per_citation = bench(storage, artifact_id)
+            size = storage_bytes(storage)
+            storage.cleanup_temp_storage()
+        print(f'{name:>8} {per_citation * 1e6:>12.1f} {size / 1024:>11.1f}')
+
+
+if __name__ == '__main__':
+    main()
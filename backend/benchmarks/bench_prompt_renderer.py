@@ -0,0 +1,61 @@
+"""
+Prompt 组装基准测试
+
+对比每次请求组装系统提示词和用户提示词的耗时：
+- 旧实现：每次调用 Environment.get_template（检查文件是否修改）再渲染
+- PromptRenderer：模板在启动时预编译，不含变量的模板只渲染一次
+
+运行：
+uv run python benchmarks/bench_prompt_renderer.py
+"""
+
+import time
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from synphora.prompt.renderer import PromptRenderer
+
+ITERATIONS = 20_000
+TEMPLATE_DIR = Path(__file__).parent.parent / "src/synphora/prompt/templates"
+
+
+class LegacyRenderer:
+    def __init__(self):
+        self.env = Environment(
+            loader=FileSystemLoader(str(TEMPLATE_DIR)),
+            autoescape=select_autoescape(['html', 'xml']),
+            trim_blocks=True,
+            lstrip_blocks=True,
+        )
+
+    def render(self, template_name: str, **kwargs) -> str:
+        return self.env.get_template(template_name).render(**kwargs)
+
+
+def bench(renderer, template_name: str, **kwargs) -> float:
+    renderer.render(template_name, **kwargs)
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        renderer.render(template_name, **kwargs)
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+def main():
+    legacy = LegacyRenderer()
+    renderer = PromptRenderer(TEMPLATE_DIR)
+    cases = [
+        ("system", "agent-system-prompt.md", {}),
+        ("user", "agent-user-prompt.md", {"user_message": "什么是动态规划？"}),
+    ]
+
+    print(f'{"prompt":>8} {"legacy us":>10} {"precompiled us":>15}')
+    for label, template_name, kwargs in cases:
+        print(
+            f'{label:>8} {bench(legacy, template_name, **kwargs):>10.2f} '
+            f'{bench(renderer, template_name, **kwargs):>15.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+会话持久化基准测试
+
+在已有 10 / 500 条历史消息的会话上，测量每轮对话结束后保存消息的耗时：
+- 整体重写：把完整的消息历史序列化后重写一个文件（每轮都持久化全量历史的朴素做法）
+- SqliteSessionStore：只追加本轮新增的消息
+同时测量重启后首次访问会话时从 SQLite 加载历史的耗时。
+
+运行：
+uv run python benchmarks/bench_session_store.py
+"""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from synphora.session_manager import SessionManager
+from synphora.session_store import SqliteSessionStore, dump_message
+
+HISTORY_SIZES = [10, 500]
+TURNS = 200
+
+
+def make_turn(turn: int) -> list:
+    """一轮对话：用户提问、模型调用工具、工具返回文章、模型回答"""
+    tool_call_id = f"call-{turn}"
+    return [
+        HumanMessage(content="请讲解一下动态规划中的状态转移方程" * 5),
+        AIMessage(
+            content="",
+            tool_calls=[
+                {
+                    "name": "read_article",
+                    "args": {"artifact_id": "course-1"},
+                    "id": tool_call_id,
+                }
+            ],
+        ),
+        ToolMessage(content="动态规划文章内容。" * 500, tool_call_id=tool_call_id),
+        AIMessage(content="状态转移方程描述了子问题之间的关系。" * 50),
+    ]
+
+
+def make_history(size: int) -> list:
+    messages = []
+    turn = 0
+    while len(messages) < size:
+        messages.extend(make_turn(turn))
+        turn += 1
+    return messages[:size]
+
+
+def bench_rewrite(path: Path, history: list) -> float:
+    messages = list(history)
+    start = time.perf_counter()
+    for turn in range(TURNS):
+        messages.extend(make_turn(turn))
+        data = json.dumps(
+            [json.loads(dump_message(m)) for m in messages], ensure_ascii=False
+        )
+        path.write_text(data, encoding='utf-8')
+        # 保持历史长度不变，只测量给定长度下的单轮开销
+        del messages[len(history) :]
+    return (time.perf_counter() - start) / TURNS
+
+
+def bench_sqlite(db_path: Path, history: list) -> tuple[float, float]:
+    manager = SessionManager(store=SqliteSessionStore(db_path))
+    manager.get_or_create_session("s")
+    manager.set_session_messages("s", list(history))
+
+    start = time.perf_counter()
+    for turn in range(TURNS):
+        messages = list(history) + make_turn(turn)
+        manager.set_session_messages("s", messages)
+        # 把会话恢复到原来的长度，只测量给定长度下的单轮开销
+        session = manager.get_session("s")
+        session.messages = session.messages[: len(history)]
+        session.stored_count = len(history)
+    per_turn = (time.perf_counter() - start) / TURNS
+    manager.close()
+
+    restarted = SessionManager(store=SqliteSessionStore(db_path))
+    start = time.perf_counter()
+    restarted.get_or_create_session("s")
+    load = time.perf_counter() - start
+    restarted.close()
+    return per_turn, load
+
+
+def main():
+    print(
+        f'{"history":>8} {"rewrite ms/turn":>16} {"sqlite ms/turn":>15} {"load ms":>8}'
+    )
+    for size in HISTORY_SIZES:
+        history = make_history(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            rewrite = bench_rewrite(tmp_path / "session.json", history)
+            sqlite, load = bench_sqlite(tmp_path / "sessions.db", history)
+        print(
+            f'{size:>8} {rewrite * 1000:>16.2f} {sqlite * 1000:>15.2f} '
+            f'{load * 1000:>8.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
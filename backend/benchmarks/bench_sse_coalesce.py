@@ -0,0 +1,138 @@
+"""
+SSE 文本事件合并基准测试
+
+1. 吞吐：上游不等待、尽可能快地产生文本事件，测量 SSE 阶段每秒能处理多少事件
+2. 并发流：模拟多条并发的流式回答（每次网络读取到若干个 token），测量写出的帧数、
+   帧速率，以及扣除上游产生事件本身（source only）之后 SSE 阶段每条流消耗的 CPU 时间
+
+SSE 阶段包括：合并、model_dump_json、格式化 data: 帧，以及每帧一次写系统调用
+（用写 /dev/null 模拟 StreamingResponse 写 socket）。
+
+运行：
+uv run python benchmarks/bench_sse_coalesce.py
+"""
+
+import asyncio
+import os
+import time
+
+from synphora.sse import SseEvent, TextMessageEvent
+from synphora.sse_coalesce import coalesce_sse_events
+
+FLUSH_INTERVALS_MS = [0, 20, 50]
+
+THROUGHPUT_EVENTS = 100_000
+
+STREAMS = 100
+TOKENS_PER_STREAM = 1000
+# 一次网络读取通常包含多个 token
+TOKENS_PER_READ = 5
+READ_INTERVAL_SECONDS = 0.01
+
+SINK = os.open(os.devnull, os.O_WRONLY)
+
+
+def format_sse_event(event: SseEvent) -> str:
+    return f"data: {event.to_data()}\n\n"
+
+
+def write_frame(event: SseEvent):
+    os.write(SINK, format_sse_event(event).encode('utf-8'))
+
+
+async def token_stream(
+    index: int, tokens: int, tokens_per_read: int, read_interval: float
+):
+    message_id = f"msg-{index}"
+    for i in range(tokens):
+        if i % tokens_per_read == 0:
+            await asyncio.sleep(read_interval)
+        yield TextMessageEvent.new(message_id=message_id, content="动态规划")
+
+
+def label(flush_interval_ms: int) -> str:
+    return "off" if flush_interval_ms == 0 else f"{flush_interval_ms}ms"
+
+
+async def consume_source(source) -> int:
+    """只消费上游事件，不做 SSE 处理，作为 CPU 基线"""
+    events = 0
+    async for _ in source:
+        events += 1
+    return events
+
+
+async def consume(source, flush_interval_ms: int) -> int:
+    frames = 0
+    async for event in coalesce_sse_events(source, flush_interval_ms):
+        write_frame(event)
+        frames += 1
+    return frames
+
+
+async def bench_throughput():
+    def source():
+        return token_stream(0, THROUGHPUT_EVENTS, 50, 0)
+
+    print(f'== throughput, {THROUGHPUT_EVENTS} events from one stream')
+    print(f'{"window":>12} {"frames":>8} {"events/s":>12}')
+
+    start = time.process_time()
+    await consume_source(source())
+    baseline = time.process_time() - start
+
+    for flush_interval_ms in FLUSH_INTERVALS_MS:
+        start = time.process_time()
+        frames = await consume(source(), flush_interval_ms)
+        sse_cpu = time.process_time() - start - baseline
+        print(
+            f'{label(flush_interval_ms):>12} {frames:>8} '
+            f'{THROUGHPUT_EVENTS / sse_cpu:>12.0f}'
+        )
+
+
+async def measure(consumers) -> tuple[int, float, float]:
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    counts = await asyncio.gather(*consumers)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    return sum(counts), wall, cpu / STREAMS * 1000
+
+
+async def bench_concurrent_streams():
+    def source(index: int):
+        return token_stream(
+            index, TOKENS_PER_STREAM, TOKENS_PER_READ, READ_INTERVAL_SECONDS
+        )
+
+    print(
+        f'== concurrent streams={STREAMS}, tokens/stream={TOKENS_PER_STREAM}, '
+        f'{TOKENS_PER_READ} tokens per read every {READ_INTERVAL_SECONDS * 1000:.0f}ms'
+    )
+    print(
+        f'{"window":>12} {"frames":>8} {"frames/s":>10} '
+        f'{"cpu ms/stream":>14} {"sse cpu ms/stream":>18}'
+    )
+
+    _, _, baseline = await measure(consume_source(source(i)) for i in range(STREAMS))
+    print(f'{"source only":>12} {"-":>8} {"-":>10} {baseline:>14.1f} {"-":>18}')
+
+    for flush_interval_ms in FLUSH_INTERVALS_MS:
+        frames, wall, cpu = await measure(
+            consume(source(i), flush_interval_ms) for i in range(STREAMS)
+        )
+        print(
+            f'{label(flush_interval_ms):>12} {frames:>8} {frames / wall:>10.0f} '
+            f'{cpu:>14.1f} {cpu - baseline:>18.1f}'
+        )
+
+
+async def main():
+    await bench_throughput()
+    print()
+    await bench_concurrent_streams()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
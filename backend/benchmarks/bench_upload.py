@@ -0,0 +1,114 @@
+"""
+上传内存占用基准测试
+
+用 1 / 8 / 32 MB 的文件模拟上传请求（请求体按 64KB 分片到达），用 tracemalloc 测量单次上传的内存峰值：
+- 整体读取：解析表单后 await file.read()、decode('utf-8')，再一次性写入存储（原来的做法）
+- 流式上传：receive_upload 边解析边校验 UTF-8 边写入临时文件，再原子重命名为数据文件
+
+运行：
+uv run python benchmarks/bench_upload.py
+"""
+
+import asyncio
+import tempfile
+import time
+import tracemalloc
+
+from starlette.requests import Request
+
+from synphora.file_storage import FileStorage
+from synphora.upload import receive_upload
+
+FILE_SIZES_MB = [1, 8, 32]
+CHUNK_BYTES = 64 * 1024
+BOUNDARY = 'bench-boundary'
+LINE = '动态规划的解题四步骤：定义子问题、写出递推关系。\n'.encode()
+
+
+def make_request(file_bytes: int) -> Request:
+    """请求体按分片逐个生成，不会在内存中保存完整的请求体"""
+    head = (
+        f'--{BOUNDARY}\r\n'
+        'Content-Disposition: form-data; name="file"; filename="bench.md"\r\n'
+        'Content-Type: text/markdown\r\n\r\n'
+    ).encode()
+    tail = f'\r\n--{BOUNDARY}--\r\n'.encode()
+    lines_per_chunk = CHUNK_BYTES // len(LINE)
+    chunk = LINE * lines_per_chunk
+
+    def body_chunks():
+        yield head
+        remaining = file_bytes - file_bytes % len(LINE)
+        while remaining > 0:
+            yield chunk[:remaining]
+            remaining -= len(chunk)
+        yield tail
+
+    chunks = body_chunks()
+
+    async def receive():
+        data = next(chunks, None)
+        if data is None:
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        return {'type': 'http.request', 'body': data, 'more_body': True}
+
+    scope = {
+        'type': 'http',
+        'method': 'POST',
+        'path': '/artifacts/upload',
+        'headers': [
+            (
+                b'content-type',
+                f'multipart/form-data; boundary={BOUNDARY}'.encode(),
+            )
+        ],
+    }
+    return Request(scope, receive)
+
+
+async def upload_buffered(storage: FileStorage, request: Request):
+    form = await request.form()
+    file = form['file']
+    content = await file.read()
+    content_str = content.decode('utf-8')
+    storage.create_artifact(title=file.filename, content=content_str)
+    await form.close()
+
+
+async def upload_streaming(storage: FileStorage, request: Request):
+    upload = await receive_upload(request, storage.new_temp_file, max_bytes=2**40)
+    storage.create_artifact_from_file(upload.path, title=upload.filename)
+
+
+def measure(storage: FileStorage, upload, size_mb: int) -> tuple[float, float]:
+    request = make_request(size_mb * 1024 * 1024)
+    tracemalloc.start()
+    start = time.perf_counter()
+    asyncio.run(upload(storage, request))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024, elapsed * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = FileStorage(tmp)
+        # 预热线程池和解析器，避免第一次测量包含一次性的初始化开销
+        asyncio.run(upload_streaming(storage, make_request(1024)))
+        print(
+            f'{"file MB":>8} {"buffered peak MB":>17} {"streaming peak MB":>18} '
+            f'{"buffered ms":>12} {"streaming ms":>13}'
+        )
+        for size_mb in FILE_SIZES_MB:
+            buffered_peak, buffered_ms = measure(storage, upload_buffered, size_mb)
+            streaming_peak, streaming_ms = measure(storage, upload_streaming, size_mb)
+            print(
+                f'{size_mb:>8} {buffered_peak:>17.1f} {streaming_peak:>18.2f} '
+                f'{buffered_ms:>12.1f} {streaming_ms:>13.1f}'
+            )
+        storage.cleanup_temp_storage()
+
+
+if __name__ == '__main__':
+    main()
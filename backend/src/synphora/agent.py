@@ -1,21 +1,37 @@
+import asyncio
+import contextvars
 import json
 import logging
+import os
+import threading
+import time
 import uuid
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from enum import Enum
-from typing import Annotated, TypedDict
-
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from typing import Annotated, NotRequired, TypedDict
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.tools import BaseTool
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
+from langgraph.graph.state import CompiledStateGraph
 from langgraph.prebuilt import ToolNode
 from pydantic import BaseModel
 
 from synphora.artifact_manager import artifact_manager
-from synphora.citation import Citation, CitationParser, CitationType
-from synphora.course import CourseManager
+from synphora.citation import Citation, CitationType, StreamingCitationScanner
+from synphora.course import course_manager
+from synphora.history_compaction import compact_history, get_token_budget
 from synphora.langgraph_sse import write_sse_event
-from synphora.llm import create_llm_client
+from synphora.llm import llm_client_registry
 from synphora.models import ArtifactRole, ArtifactType
 from synphora.prompt import AgentPrompts
 from synphora.reference import Reference, ReferenceType
@@ -23,20 +39,37 @@ from synphora.session_manager import session_manager
 from synphora.sse import (
     ArtifactListUpdatedEvent,
     RunFinishedEvent,
+    RunFinishedReason,
     RunStartedEvent,
     SseEvent,
     TextMessageEvent,
     ToolCallEndEvent,
     ToolCallStartEvent,
 )
+from synphora.stream_accumulator import AIMessageAccumulator
 from synphora.tool import AlgorithmTeacherTool
 
 # 设置日志
 logger = logging.getLogger(__name__)
 
 # 超时配置
-AGENT_TIMEOUT_SECONDS = 30
 TOOL_TIMEOUT_SECONDS = 60
+# 整轮回答的时限，需要远大于单个工具的超时，多步回答才不会在工具超时之前被截断
+AGENT_TIMEOUT_SECONDS = int(
+    os.getenv('SYNPHORA_AGENT_TIMEOUT_SECONDS', str(5 * TOOL_TIMEOUT_SECONDS))
+)
+# 检查 SSE 客户端是否断开的间隔
+DISCONNECT_POLL_INTERVAL_SECONDS = 1.0
+# 代理图正常运行结束的标记
+_RUN_DONE = object()
+
+# 工具执行线程池大小，同一步中的多个工具调用并发执行
+TOOL_MAX_WORKERS = int(os.getenv('SYNPHORA_TOOL_MAX_WORKERS', '8'))
+
+# 全局工具执行线程池
+tool_executor = ThreadPoolExecutor(
+    max_workers=TOOL_MAX_WORKERS, thread_name_prefix='synphora-tool'
+)
 
 
 class NodeType(str, Enum):
@@ -58,10 +91,46 @@ def generate_id() -> str:
     return str(uuid.uuid4())[:8]
 
 
+class ArtifactListNotifier:
+    """
+    一轮对话中 artifact 列表变化的通知器。
+
+    记录已经通知到的列表版本，每次通知只发送从该版本开始的增量，前后两个事件的版本首尾相接。
+    引用和工具创建 artifact 后立即调用 flush，end_node 再发送剩余的变化；列表没有变化时不发送事件。
+    工具线程和事件循环都会调用，通过加锁保证增量按版本顺序发送。
+    """
+
+    def __init__(self, version: int):
+        self.version = version
+        self._lock = threading.Lock()
+
+    def _take_event(self) -> ArtifactListUpdatedEvent | None:
+        # 调用方已持有 self._lock
+        if artifact_manager.get_list_version() == self.version:
+            return None
+        delta = artifact_manager.get_list_delta(self.version)
+        self.version = delta.version
+        return ArtifactListUpdatedEvent.new(delta)
+
+    def take_event(self) -> ArtifactListUpdatedEvent | None:
+        """取出还没有通知的增量事件，列表没有变化时返回 None"""
+        with self._lock:
+            return self._take_event()
+
+    def flush(self):
+        """把还没有通知的增量作为 SSE 事件发送"""
+        with self._lock:
+            event = self._take_event()
+            if event is not None:
+                write_sse_event(event)
+
+
 # LangGraph State Schema
 class AgentState(TypedDict):
     request: AgentRequest
     messages: Annotated[list, add_messages]
+    # 本轮 artifact 列表变化的通知器，引用和工具创建 artifact 后立即发送增量
+    artifact_list_notifier: NotRequired[ArtifactListNotifier]
 
 
 tools = AlgorithmTeacherTool.get_tools()
@@ -82,79 +151,106 @@ def process_references(references: list[Reference]):
         artifact_id = reference.artifactId
 
         if reference.type == ReferenceType.COURSE:
-            course_manager = CourseManager()
-            course = course_manager.get_course(artifact_id)
-            title = course.title
-            content = course_manager.read_course_content(artifact_id)
-
-            artifact_manager.create_artifact_with_id(
-                artifact_id=artifact_id,
-                title=title,
-                content=content,
-                artifact_type=ArtifactType.COURSE,
-                role=ArtifactRole.ASSISTANT,
-            )
+            _save_course_artifact(artifact_id)
 
         # 其他类型的 reference 无需处理，因为在 tool 中已经创建了 artifact
 
-        write_sse_event(ArtifactListUpdatedEvent.new())
 
+def _save_course_artifact(artifact_id: str):
+    """
+    把课程保存为引用课程文件的虚拟 artifact，不复制课程内容。
+    课程已经保存过时不做任何 I/O；首次保存会写入元数据日志，异步路径中需放到线程池执行
+    """
+    course = course_manager.get_course(artifact_id)
+
+    artifact_manager.create_virtual_artifact(
+        artifact_id=artifact_id,
+        title=course.title,
+        source_path=course_manager.get_course_file_path(artifact_id),
+        artifact_type=ArtifactType.COURSE,
+        role=ArtifactRole.ASSISTANT,
+    )
 
-def process_citations(citations: list[Citation]):
+
+async def process_citations(
+    citations: list[Citation], notifier: ArtifactListNotifier | None = None
+):
     print(f'process citations: {citations}')
-    artifacts_updated = False
     for citation in citations:
         artifact_id = citation.artifactId
 
         if citation.type == CitationType.COURSE:
-            course_manager = CourseManager()
-            course = course_manager.get_course(artifact_id)
-            title = course.title
-            content = course_manager.read_course_content(artifact_id)
-
-            artifact_manager.create_artifact_with_id(
-                artifact_id=artifact_id,
-                title=title,
-                content=content,
-                artifact_type=ArtifactType.COURSE,
-                role=ArtifactRole.ASSISTANT,
-            )
+            await asyncio.to_thread(_save_course_artifact, artifact_id)
 
-            artifacts_updated = True
+    # 引用标记闭合后立即通知前端，被引用的课程在回答过程中就出现在列表中
+    if notifier is not None:
+        notifier.flush()
 
-    if artifacts_updated:
-        write_sse_event(ArtifactListUpdatedEvent.new())
 
-
-def reason_node(state: AgentState) -> AgentState:
+async def reason_node(state: AgentState) -> AgentState:
     """推理节点：使用LLM决定调用哪个工具"""
     # print(f'reason_node, tools: {[t.name for t in tools]}')
-    llm = create_llm_client(state["request"].model_key)
-    llm_with_tools = llm.bind_tools(tools)
+    llm_with_tools = llm_client_registry.get_client_with_tools(
+        state["request"].model_key, tools
+    )
 
     # 使用分片归并：累积所有chunk，最后合并成完整AIMessage
     message_id = generate_id()
 
     # 用于归并的累加器
-    accumulated_chunks = []
+    accumulator = AIMessageAccumulator()
+
+    # 增量识别引用标记，标记一闭合就在后台创建 artifact，不阻塞后续 token 的输出
+    citation_scanner = StreamingCitationScanner()
+    citation_tasks: list[asyncio.Task] = []
+
+    # 按模型的 token 预算压缩历史，只影响发送给模型的消息，state 中保留完整历史
+    request = state["request"]
+    compaction = compact_history(state["messages"], get_token_budget(request.model_key))
+    if compaction.tokens_saved > 0:
+        print(
+            f'history compaction, session: {request.session_id}, '
+            f'tokens: {compaction.tokens_before} -> {compaction.tokens_after} '
+            f'(saved {compaction.tokens_saved}), '
+            f'stubbed tool outputs: {compaction.stubbed_tool_outputs}, '
+            f'summarized turns: {compaction.summarized_turns}'
+        )
 
     # print(f'reason_node, state["messages"]: {state["messages"]}')
-    for chunk in llm_with_tools.stream(state["messages"]):
-        # 累积分片用于最终归并
-        accumulated_chunks.append(chunk)
-
-        # 流式输出文本内容到SSE
-        if chunk.content:
-            write_sse_event(
-                TextMessageEvent.new(message_id=message_id, content=chunk.content)
-            )
-
-    ai_message = merge_chunks(accumulated_chunks)
+    try:
+        # 使用异步流式接口，等待 token 时不占用事件循环或线程池线程
+        async for chunk in llm_with_tools.astream(compaction.messages):
+            # 累积分片用于最终归并
+            accumulator.add(chunk)
+
+            # 流式输出文本内容到SSE
+            if chunk.content:
+                write_sse_event(
+                    TextMessageEvent.new(message_id=message_id, content=chunk.content)
+                )
 
-    citation_parser = CitationParser(ai_message.content)
-    citations = citation_parser.parse_citations()
-    if citations:
-        process_citations(citations)
+                if isinstance(chunk.content, str):
+                    citations = citation_scanner.feed(chunk.content)
+                    if citations:
+                        citation_tasks.append(
+                            asyncio.create_task(
+                                process_citations(
+                                    citations, state.get("artifact_list_notifier")
+                                )
+                            )
+                        )
+
+        ai_message = accumulator.build()
+
+        if citation_tasks:
+            await asyncio.gather(*citation_tasks)
+    finally:
+        # 运行被取消（超时、客户端断开、被新请求取代）时，一并取消还没完成的引用处理任务
+        pending = [task for task in citation_tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
 
     return {"messages": [ai_message]}
 
@@ -174,93 +270,171 @@ def should_continue(state: AgentState) -> NodeType:
         return NodeType.LAST
 
 
-def merge_chunks(accumulated_chunks):
-    # 使用LangChain的分片归并机制得到完整AIMessage
-    # 这样可以正确处理tool_calls、ID等结构化信息
-    final_message = None
-    for chunk in accumulated_chunks:
-        if final_message is None:
-            final_message = chunk
-        else:
-            # 使用 + 运算符合并分片，这是LangChain推荐的方式
-            final_message = final_message + chunk
-
-    return final_message
-
-
 def end_node(state: AgentState) -> AgentState:
     """结束节点：发送运行完成事件"""
     # print('end_node')
 
+    # 引用和工具已经通知过各自的变化，这里只发送剩余的部分（如 reference 创建的课程）
+    notifier = state.get("artifact_list_notifier")
+    if notifier is not None:
+        notifier.flush()
     write_sse_event(RunFinishedEvent.new())
 
     return state
 
 
-class ActNode(ToolNode):
-    """执行节点，继承自 ToolNode，添加工具调用事件拦截"""
+class _ToolCallRun:
+    """
+    一次工具调用的执行状态。
 
-    def __init__(self, tools, **kwargs):
-        super().__init__(tools, **kwargs)
+    工具在线程池中真正开始执行时才发送开始事件，执行完成时发送结束事件；超时时由调用方补发。
+    通过加锁保证开始和结束事件各只发送一次，超时之后才轮到执行的工具不再执行。
+    """
 
-    def invoke(self, state, config=None):
-        self._send_tool_call_start_events(state)
-        result = super().invoke(state, config)
-        self._send_tool_call_end_events(state, result)
-        return result
+    def __init__(
+        self,
+        node: "ActNode",
+        tool_call: dict,
+        config,
+        notifier: ArtifactListNotifier | None = None,
+    ):
+        self.node = node
+        self.tool_call = tool_call
+        self.config = config
+        self.notifier = notifier
+        # 未知的工具名直接返回错误结果
+        self.invalid = node._validate_tool_call(tool_call)
+        self._started = False
+        self._finished = False
+        self._lock = threading.Lock()
+
+    def _claim_start(self) -> bool:
+        with self._lock:
+            started, self._started = self._started, True
+            return not started
+
+    def _claim_finish(self) -> bool:
+        with self._lock:
+            finished, self._finished = self._finished, True
+            return not finished
+
+    def run(self) -> ToolMessage | None:
+        """在工具线程中执行"""
+        if not self._claim_start():
+            return None
+        self.node._send_tool_call_start_event(self.tool_call)
+        message = self.invalid
+        if message is None:
+            tool = self.node.tools_by_name[self.tool_call["name"]]
+            message = tool.invoke({**self.tool_call, "type": "tool_call"}, self.config)
+        if self._claim_finish():
+            self.node._send_tool_call_end_event(self.tool_call, message)
+        # 工具创建的 artifact（思维导图、题解等）立即出现在列表中
+        if self.notifier is not None:
+            self.notifier.flush()
+        return message
+
+    def time_out(self, timeout: float) -> ToolMessage:
+        """工具执行超时，返回超时结果代替工具输出"""
+        name = self.tool_call["name"]
+        message = ToolMessage(
+            content=f'工具 {name} 执行超时（超过 {timeout:g} 秒），没有返回结果。',
+            tool_call_id=self.tool_call["id"],
+            name=name,
+            status="error",
+        )
+        if self._claim_start():
+            self.node._send_tool_call_start_event(self.tool_call)
+        if self._claim_finish():
+            self.node._send_tool_call_end_event(self.tool_call, message)
+        print(f'tool call timeout: {name}, {timeout:g}s')
+        return message
+
+    def submit(self) -> Future:
+        # 复制上下文，使工具线程中也能通过 get_stream_writer 发送 SSE 事件
+        context = contextvars.copy_context()
+        return tool_executor.submit(context.run, self.run)
 
-    async def ainvoke(self, state, config=None):
-        self._send_tool_call_start_events(state)
-        result = await super().ainvoke(state, config)
-        self._send_tool_call_end_events(state, result)
-        return result
 
-    def _send_tool_call_start_events(self, state):
+class ActNode(ToolNode):
+    """
+    执行节点，继承自 ToolNode，添加工具调用事件拦截。
+
+    同一步中的多个工具调用在工具线程池中并发执行，每个调用最多等待 timeout 秒，
+    超时的调用返回超时结果，不会阻塞整个请求。
+    """
+
+    def __init__(self, tools, timeout: float = TOOL_TIMEOUT_SECONDS, **kwargs):
+        super().__init__(tools, **kwargs)
+        self.timeout = timeout
+
+    def _prepare_runs(self, state, config) -> list[_ToolCallRun] | None:
+        if not isinstance(state, dict) or not state.get("messages"):
+            return None
+        last_message = state["messages"][-1]
+        if not getattr(last_message, 'tool_calls', None):
+            return None
+        notifier = state.get("artifact_list_notifier")
+        return [
+            _ToolCallRun(self, tool_call, config, notifier)
+            for tool_call in last_message.tool_calls
+        ]
+
+    def invoke(self, state, config=None, **kwargs):
+        runs = self._prepare_runs(state, config)
+        if runs is None:
+            return super().invoke(state, config, **kwargs)
+
+        futures = [run.submit() for run in runs]
+        deadline = time.monotonic() + self.timeout
+        messages = []
+        for run, future in zip(runs, futures, strict=True):
+            try:
+                remaining = max(deadline - time.monotonic(), 0)
+                messages.append(future.result(timeout=remaining))
+            except FutureTimeoutError:
+                future.cancel()
+                messages.append(run.time_out(self.timeout))
+        return {"messages": messages}
+
+    async def ainvoke(self, state, config=None, **kwargs):
+        runs = self._prepare_runs(state, config)
+        if runs is None:
+            return await super().ainvoke(state, config, **kwargs)
+
+        async def execute(run: _ToolCallRun) -> ToolMessage:
+            future = asyncio.wrap_future(run.submit())
+            try:
+                return await asyncio.wait_for(future, self.timeout)
+            except TimeoutError:
+                # 线程无法被强制终止，已经开始执行的工具会在后台继续运行直到结束
+                return run.time_out(self.timeout)
+
+        messages = await asyncio.gather(*(execute(run) for run in runs))
+        return {"messages": list(messages)}
+
+    def _send_tool_call_start_event(self, tool_call: dict):
         """发送工具调用开始事件"""
-        messages = state["messages"]
-        last_message = messages[-1]
-
-        # 发送工具调用开始事件
-        if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
-            for tool_call in last_message.tool_calls:
-                attributes = self._parse_attributes_from_dict(tool_call["args"])
-
-                event = ToolCallStartEvent.new(
-                    tool_call_id=tool_call["id"],
-                    tool_name=tool_call["name"],
-                    attributes=attributes,
-                )
-                # print(f'send tool call start event: {event}')
-                write_sse_event(event)
+        attributes = self._parse_attributes_from_dict(tool_call["args"])
+        event = ToolCallStartEvent.new(
+            tool_call_id=tool_call["id"],
+            tool_name=tool_call["name"],
+            attributes=attributes,
+        )
+        # print(f'send tool call start event: {event}')
+        write_sse_event(event)
 
-    def _send_tool_call_end_events(self, state, result):
+    def _send_tool_call_end_event(self, tool_call: dict, message: ToolMessage):
         """发送工具调用结束事件"""
-        messages = state["messages"]
-        last_message = messages[-1]
-
-        if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
-            # 获取工具执行结果
-            result_messages = result["messages"]
-            tool_result_message = result_messages[-1]  # 最后一条消息应该是工具结果
-
-            for tool_call in last_message.tool_calls:
-                # 尝试从工具结果消息中提取对应的结果
-                tool_result = ""
-                if hasattr(tool_result_message, 'content'):
-                    tool_result = tool_result_message.content
-                elif hasattr(tool_result_message, 'tool_calls'):
-                    # 如果是工具调用结果消息，可能需要不同的处理方式
-                    tool_result = str(tool_result_message)
-
-                attributes = self._parse_attributes_from_string(tool_result)
-
-                event = ToolCallEndEvent.new(
-                    tool_call_id=tool_call["id"],
-                    tool_name=tool_call["name"],
-                    attributes=attributes,
-                )
-                # print(f'send tool call end event: {event}')
-                write_sse_event(event)
+        tool_result = message.content if isinstance(message.content, str) else ""
+        attributes = self._parse_attributes_from_string(tool_result)
+        event = ToolCallEndEvent.new(
+            tool_call_id=tool_call["id"],
+            tool_name=tool_call["name"],
+            attributes=attributes,
+        )
+        # print(f'send tool call end event: {event}')
+        write_sse_event(event)
 
     def _parse_attributes_from_string(self, data: str) -> dict:
         if not data.startswith('{'):
@@ -301,7 +475,7 @@ class ActNode(ToolNode):
                     title = artifact.title
             if not title:
                 # try 2
-                course = CourseManager().get_course(artifact_id)
+                course = course_manager.get_course(artifact_id)
                 if course:
                     title = course.title
 
@@ -311,14 +485,17 @@ class ActNode(ToolNode):
         return attributes
 
 
-def build_agent_graph() -> StateGraph:
+def build_agent_graph(graph_tools: list[BaseTool] | None = None) -> CompiledStateGraph:
     """构建LangGraph代理图 - 标准 re-act 模式"""
+    if graph_tools is None:
+        graph_tools = tools
+
     graph = StateGraph(AgentState)
 
     # 添加节点
     graph.add_node(NodeType.FIRST, start_node)
     graph.add_node(NodeType.REASON, reason_node)
-    graph.add_node(NodeType.ACT, ActNode(tools, handle_tool_errors=False))
+    graph.add_node(NodeType.ACT, ActNode(graph_tools, handle_tool_errors=False))
     graph.add_node(NodeType.LAST, end_node)
 
     # 连接节点 - re-act 模式
@@ -342,17 +519,75 @@ def build_agent_graph() -> StateGraph:
     return graph.compile()
 
 
+class AgentGraphRegistry:
+    """进程级的编译图注册表
+
+    编译后的图不持有运行状态，可以被所有请求并发复用。
+    只在首次使用或工具集变化时（调用 rebuild）重新编译。
+    """
+
+    def __init__(self):
+        self._graph: CompiledStateGraph | None = None
+        self._lock = threading.Lock()
+
+    def get_graph(self) -> CompiledStateGraph:
+        """获取编译好的代理图，首次调用时编译"""
+        graph = self._graph
+        if graph is None:
+            with self._lock:
+                if self._graph is None:
+                    self._graph = build_agent_graph()
+                graph = self._graph
+        return graph
+
+    def rebuild(self, graph_tools: list[BaseTool] | None = None) -> CompiledStateGraph:
+        """工具集变化时重新编译代理图，之后的请求使用新的工具集"""
+        global tools
+        with self._lock:
+            if graph_tools is not None:
+                tools = list(graph_tools)
+            self._graph = build_agent_graph()
+            logger.info(f'agent graph rebuilt, tools: {[t.name for t in tools]}')
+            return self._graph
+
+    @property
+    def tools(self) -> list[BaseTool]:
+        """当前代理图使用的工具集，rebuild 之后返回新的工具集"""
+        return tools
+
+    def warm_up(self) -> None:
+        """服务启动时预先编译代理图"""
+        self.get_graph()
+
+
+# 全局代理图注册表实例
+agent_graph_registry = AgentGraphRegistry()
+
+
+def _completed_messages(messages: list[BaseMessage]) -> list[BaseMessage]:
+    """去掉末尾没有工具结果的工具调用消息，运行被中断时保证保存的历史仍然合法"""
+    if messages and isinstance(messages[-1], AIMessage) and messages[-1].tool_calls:
+        return messages[:-1]
+    return messages
+
+
 async def generate_agent_response(
     request: AgentRequest,
+    is_disconnected: Callable[[], Awaitable[bool]] | None = None,
+    timeout: float = AGENT_TIMEOUT_SECONDS,
+    superseded: asyncio.Event | None = None,
 ) -> AsyncGenerator[SseEvent]:
     """
     主要的Agent响应函数，使用LangGraph流式处理
+
+    代理图在后台任务中运行。超过 timeout 秒、is_disconnected 返回 True 或 superseded 被设置时
+    取消后台任务，正在进行的 LLM 流和尚未开始的工具调用随之取消，并发送带有原因的 RUN_FINISHED 事件。
     """
 
     print(f'generate_agent_response, request: {request}')
 
     session_id = request.session_id
-    session, is_created = session_manager.get_or_create_session(session_id)
+    session, is_created = await session_manager.aget_or_create_session(session_id)
 
     messages = session.get_messages().copy()
     agent_prompts = AgentPrompts()
@@ -366,41 +601,124 @@ async def generate_agent_response(
         HumanMessage(content=agent_prompts.user(user_message=request.message))
     )
 
-    graph = build_agent_graph()
+    graph = agent_graph_registry.get_graph()
 
     # 创建初始状态
+    artifact_list_notifier = ArtifactListNotifier(artifact_manager.get_list_version())
     initial_state: AgentState = {
         "request": request,
         "messages": messages,
+        "artifact_list_notifier": artifact_list_notifier,
     }
 
-    # 使用LangGraph的流式处理，订阅custom事件来获取SSE事件
+    # 后台任务产生的 SSE 事件，以及表示运行结束的 _RUN_DONE、中断原因或异常
+    queue: asyncio.Queue = asyncio.Queue()
     final_state = None
-    async for kind, payload in graph.astream(
-        initial_state, stream_mode=["custom", "values"]
-    ):
-        if kind == "custom":
-            # 处理自定义事件（SSE事件）
-            channel = payload.get("channel")
-            if channel == "sse":
-                event = payload.get("event")
-                if event:
-                    yield event
-        elif kind == "values":
-            # 保存最终状态用于批量保存
-            final_state = payload
 
-    # agent 运行结束后，批量保存所有消息到会话
-    if final_state and "messages" in final_state:
-        session_manager.set_session_messages(
-            request.session_id, final_state["messages"]
-        )
+    async def run_graph():
+        nonlocal final_state
+        try:
+            # 使用LangGraph的流式处理，订阅custom事件来获取SSE事件
+            async for kind, payload in graph.astream(
+                initial_state, stream_mode=["custom", "values"]
+            ):
+                if kind == "custom":
+                    # 处理自定义事件（SSE事件）
+                    channel = payload.get("channel")
+                    if channel == "sse":
+                        event = payload.get("event")
+                        if event:
+                            queue.put_nowait(event)
+                elif kind == "values":
+                    # 保存最终状态用于批量保存
+                    final_state = payload
+            queue.put_nowait(_RUN_DONE)
+        except Exception as e:
+            queue.put_nowait(e)
+
+    async def watch_disconnect():
+        while not await is_disconnected():
+            await asyncio.sleep(DISCONNECT_POLL_INTERVAL_SECONDS)
+        queue.put_nowait(RunFinishedReason.CLIENT_DISCONNECTED)
+
+    async def watch_superseded():
+        await superseded.wait()
+        queue.put_nowait(RunFinishedReason.SUPERSEDED)
+
+    deadline = asyncio.get_running_loop().time() + timeout
+    runner = asyncio.create_task(run_graph())
+    watchers = []
+    if is_disconnected is not None:
+        watchers.append(asyncio.create_task(watch_disconnect()))
+    if superseded is not None:
+        watchers.append(asyncio.create_task(watch_superseded()))
+    reason = None
+    try:
+        while True:
+            try:
+                async with asyncio.timeout_at(deadline):
+                    item = await queue.get()
+            except TimeoutError:
+                reason = RunFinishedReason.TIMEOUT
+                break
+            if item is _RUN_DONE:
+                break
+            if isinstance(item, RunFinishedReason):
+                reason = item
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # 正常结束、超时、客户端断开或调用方提前关闭生成器时，都要停止后台任务
+        for watcher in watchers:
+            watcher.cancel()
+        if not runner.done():
+            runner.cancel()
+            try:
+                await runner
+            except asyncio.CancelledError:
+                pass
+
+        # agent 运行结束后，批量保存所有消息到会话
+        if final_state and "messages" in final_state:
+            await session_manager.aset_session_messages(
+                request.session_id, _completed_messages(final_state["messages"])
+            )
+
+    if reason is not None:
+        if reason == RunFinishedReason.TIMEOUT:
+            message = f'回答超过 {timeout:g} 秒，已停止生成。'
+        elif reason == RunFinishedReason.SUPERSEDED:
+            message = '已被同一会话中更新的请求取代，已停止生成。'
+        else:
+            message = '客户端已断开连接，已停止生成。'
+        print(f'agent run cancelled, session: {session_id}, reason: {reason.value}')
+        # 运行被中断时没有经过 end_node，在这里通知本轮还没有通知的 artifact 变化
+        event = artifact_list_notifier.take_event()
+        if event is not None:
+            yield event
+        yield RunFinishedEvent.new(reason=reason, message=message)
 
 
 def run_agent(request: AgentRequest):
     """命令行运行agent的函数"""
+    asyncio.run(_arun_agent_and_close(request))
+
+
+async def _arun_agent_and_close(request: AgentRequest):
+    try:
+        await arun_agent(request)
+    finally:
+        # asyncio.run 每次都创建新的事件循环，连接池中的异步连接绑定在本次的事件循环上，
+        # 事件循环关闭前关闭连接池，下一轮对话重新创建
+        await llm_client_registry.aclose()
+
+
+async def arun_agent(request: AgentRequest):
+    """命令行运行agent的异步实现（推理节点是异步节点，需要使用 astream 驱动）"""
     session_id = request.session_id
-    session, is_created = session_manager.get_or_create_session(session_id)
+    session, is_created = await session_manager.aget_or_create_session(session_id)
 
     messages = session.get_messages().copy()
     agent_prompts = AgentPrompts()
@@ -414,7 +732,7 @@ def run_agent(request: AgentRequest):
         HumanMessage(content=agent_prompts.user(user_message=request.message))
     )
 
-    graph = build_agent_graph()
+    graph = agent_graph_registry.get_graph()
 
     # 创建初始状态
     initial_state: AgentState = {
@@ -424,22 +742,32 @@ def run_agent(request: AgentRequest):
 
     # 执行 agent，并打印 message 和 tool calls
     final_state = None
-    for event in graph.stream(initial_state):
-        # 检查是否为 last node，如果是则跳过打印
-        if NodeType.LAST in event:
-            final_state = event[NodeType.LAST]
-            continue
-
-        for value in event.values():
-            last_message = value["messages"][-1]
-            if not isinstance(last_message, AIMessage):
-                continue
-            print('-' * 100)
-            if last_message.content:
-                print(f"🤖: {last_message.content}")
-            if hasattr(last_message, "tool_calls") and len(last_message.tool_calls) > 0:
-                for tool_call in last_message.tool_calls:
-                    print(f'🔧: ToolCall({tool_call["name"]}, {tool_call["args"]})')
+    try:
+        # 与 HTTP 接口相同的整体超时
+        async with asyncio.timeout(AGENT_TIMEOUT_SECONDS):
+            async for event in graph.astream(initial_state):
+                # 检查是否为 last node，如果是则跳过打印
+                if NodeType.LAST in event:
+                    final_state = event[NodeType.LAST]
+                    continue
+
+                for value in event.values():
+                    last_message = value["messages"][-1]
+                    if not isinstance(last_message, AIMessage):
+                        continue
+                    print('-' * 100)
+                    if last_message.content:
+                        print(f"🤖: {last_message.content}")
+                    if (
+                        hasattr(last_message, "tool_calls")
+                        and len(last_message.tool_calls) > 0
+                    ):
+                        for tool_call in last_message.tool_calls:
+                            print(
+                                f'🔧: ToolCall({tool_call["name"]}, {tool_call["args"]})'
+                            )
+    except TimeoutError:
+        print(f'⏰ 回答超过 {AGENT_TIMEOUT_SECONDS} 秒，已停止生成。')
 
     # agent 运行结束后，批量保存所有消息到会话
     if final_state and "messages" in final_state:
@@ -456,7 +784,7 @@ def run_agent(request: AgentRequest):
         #             print(f'[{i}] {message.type}: {content}')
         #     else:
         #         print(f'[{i}] {message.type}: {message.content}')
-        session_manager.set_session_messages(session_id, messages)
+        await session_manager.aset_session_messages(session_id, messages)
 
 
 def main():
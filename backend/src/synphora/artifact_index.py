@@ -0,0 +1,183 @@
+import base64
+import bisect
+import json
+import threading
+from collections.abc import Iterator
+from enum import Enum
+
+from synphora.models import ArtifactOrderBy, ArtifactRole, ArtifactType
+
+# (排序字段值, artifact_id)，id 保证排序键唯一
+SortKey = tuple[str, str]
+
+
+def _value(value) -> str:
+    return value.value if isinstance(value, Enum) else value
+
+
+class _SortedIndex:
+    """按排序键有序的 artifact 列表，支持从游标位置开始正序或倒序遍历"""
+
+    def __init__(self):
+        self._keys: list[SortKey] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: SortKey):
+        bisect.insort(self._keys, key)
+
+    def remove(self, key: SortKey):
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def iter_from(self, after: SortKey | None, descending: bool) -> Iterator[SortKey]:
+        """从游标之后开始遍历（不包含游标本身）"""
+        keys = self._keys
+        if descending:
+            start = len(keys) if after is None else bisect.bisect_left(keys, after)
+            for i in range(start - 1, -1, -1):
+                yield keys[i]
+        else:
+            start = 0 if after is None else bisect.bisect_right(keys, after)
+            for i in range(start, len(keys)):
+                yield keys[i]
+
+
+class ArtifactIndex:
+    """
+    artifact 元数据的内存二级索引。
+
+    为每个排序字段（created_at、updated_at）维护全量有序索引，以及按 type、role 和 (type, role) 分区的有序索引。
+    查询时直接从对应分区的游标位置开始遍历，开销只与页大小有关，与 artifact 总数和内容大小无关。
+    """
+
+    def __init__(self):
+        self._entries: dict[str, dict] = {}
+        self._indexes: dict[tuple, _SortedIndex] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _partitions(metadata: dict) -> list[tuple]:
+        return [
+            (),
+            ("type", _value(metadata["type"])),
+            ("role", _value(metadata["role"])),
+            ("type", _value(metadata["type"]), "role", _value(metadata["role"])),
+        ]
+
+    @staticmethod
+    def _sort_key(metadata: dict, order_by: ArtifactOrderBy) -> SortKey:
+        return (metadata[order_by.value], metadata["id"])
+
+    def _add(self, metadata: dict):
+        self._entries[metadata["id"]] = metadata
+        for order_by in ArtifactOrderBy:
+            key = self._sort_key(metadata, order_by)
+            for partition in self._partitions(metadata):
+                index = self._indexes.get((order_by, *partition))
+                if index is None:
+                    index = self._indexes[(order_by, *partition)] = _SortedIndex()
+                index.add(key)
+
+    def _remove(self, artifact_id: str):
+        metadata = self._entries.pop(artifact_id, None)
+        if metadata is None:
+            return
+        for order_by in ArtifactOrderBy:
+            key = self._sort_key(metadata, order_by)
+            for partition in self._partitions(metadata):
+                self._indexes[(order_by, *partition)].remove(key)
+
+    def put(self, metadata: dict):
+        """新增或更新一条元数据的索引"""
+        with self._lock:
+            self._remove(metadata["id"])
+            self._add(metadata)
+
+    def remove(self, artifact_id: str):
+        with self._lock:
+            self._remove(artifact_id)
+
+    def rebuild(self, metadata: dict[str, dict]):
+        """根据全部元数据重建索引"""
+        with self._lock:
+            self._entries.clear()
+            self._indexes.clear()
+            for item in metadata.values():
+                self._add(item)
+
+    def clear(self):
+        self.rebuild({})
+
+    def list_all(
+        self,
+        order_by: ArtifactOrderBy = ArtifactOrderBy.CREATED_AT,
+        descending: bool = False,
+    ) -> list[dict]:
+        """按排序字段返回全部元数据"""
+        with self._lock:
+            index = self._indexes.get((order_by,))
+            if index is None:
+                return []
+            return [
+                self._entries[artifact_id]
+                for _, artifact_id in index.iter_from(None, descending)
+            ]
+
+    def query(
+        self,
+        artifact_type: ArtifactType | None = None,
+        role: ArtifactRole | None = None,
+        order_by: ArtifactOrderBy = ArtifactOrderBy.CREATED_AT,
+        descending: bool = True,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """
+        分页查询，返回 (当前页的元数据列表, 下一页游标)。没有下一页时游标为 None。
+        游标格式非法或与排序字段不匹配时抛出 ValueError。
+        """
+        after = self._decode_cursor(cursor, order_by) if cursor else None
+
+        partition: tuple = (order_by,)
+        if artifact_type is not None:
+            partition += ("type", _value(artifact_type))
+        if role is not None:
+            partition += ("role", _value(role))
+
+        items: list[dict] = []
+        has_more = False
+        with self._lock:
+            index = self._indexes.get(partition)
+            if index is None:
+                return [], None
+            for _, artifact_id in index.iter_from(after, descending):
+                if len(items) == limit:
+                    has_more = True
+                    break
+                items.append(self._entries[artifact_id])
+
+        next_cursor = None
+        if has_more and items:
+            next_cursor = self._encode_cursor(
+                self._sort_key(items[-1], order_by), order_by
+            )
+        return items, next_cursor
+
+    @staticmethod
+    def _encode_cursor(key: SortKey, order_by: ArtifactOrderBy) -> str:
+        raw = json.dumps([order_by.value, *key], ensure_ascii=False)
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _decode_cursor(cursor: str, order_by: ArtifactOrderBy) -> SortKey:
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode('ascii'))
+            cursor_order_by, value, artifact_id = json.loads(raw)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+        if cursor_order_by != order_by.value:
+            raise ValueError(f"Cursor was created for order_by={cursor_order_by}")
+        return (value, artifact_id)
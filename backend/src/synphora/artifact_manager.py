@@ -1,7 +1,16 @@
 import os
+from pathlib import Path
 
 from synphora.file_storage import FileStorage
-from synphora.models import ArtifactData, ArtifactRole, ArtifactType
+from synphora.models import (
+    ArtifactData,
+    ArtifactListDelta,
+    ArtifactMetadata,
+    ArtifactOrderBy,
+    ArtifactPage,
+    ArtifactRole,
+    ArtifactType,
+)
 
 
 class ArtifactManager:
@@ -45,6 +54,46 @@ class ArtifactManager:
             artifact_id, title, content, artifact_type, role, description
         )
 
+    def create_virtual_artifact(
+        self,
+        artifact_id: str,
+        title: str,
+        source_path: Path,
+        artifact_type: ArtifactType = ArtifactType.OTHER,
+        role: ArtifactRole = ArtifactRole.USER,
+        description: str | None = None,
+    ) -> ArtifactMetadata:
+        """创建引用 source_path 内容的虚拟 artifact，重复创建相同的 artifact 时不做任何写入"""
+        return self._storage.create_virtual_artifact(
+            artifact_id,
+            title=title,
+            source_path=source_path,
+            artifact_type=artifact_type,
+            role=role,
+            description=description,
+        )
+
+    def new_temp_file(self) -> Path:
+        """在存储目录中创建临时文件，写入内容后交给 create_artifact_from_file"""
+        return self._storage.new_temp_file()
+
+    def create_artifact_from_file(
+        self,
+        temp_file: Path,
+        title: str,
+        artifact_type: ArtifactType = ArtifactType.OTHER,
+        role: ArtifactRole = ArtifactRole.USER,
+        description: str | None = None,
+    ) -> ArtifactMetadata:
+        """用临时文件创建 artifact，临时文件被重命名为数据文件"""
+        return self._storage.create_artifact_from_file(
+            temp_file,
+            title=title,
+            artifact_type=artifact_type,
+            role=role,
+            description=description,
+        )
+
     def get_artifact(self, artifact_id: str) -> ArtifactData | None:
         """根据 ID 获取 artifact"""
         return self._storage.get_artifact(artifact_id)
@@ -53,12 +102,70 @@ class ArtifactManager:
         """获取所有 artifacts"""
         return self._storage.list_artifacts()
 
+    def list_artifact_metadata(self) -> list[ArtifactMetadata]:
+        """获取所有 artifacts 的元数据，不读取内容"""
+        return self._storage.list_artifact_metadata()
+
+    def get_artifact_content_path(self, artifact_id: str) -> Path | None:
+        """获取 artifact 内容文件的路径，不存在时返回 None"""
+        return self._storage.get_artifact_content_path(artifact_id)
+
+    def get_list_version(self) -> int:
+        """artifact 列表的版本号，任何 artifact 变化后都会增加"""
+        return self._storage.version
+
+    def get_list_delta(self, since_version: int) -> ArtifactListDelta:
+        """从 since_version 到当前版本的列表增量"""
+        return self._storage.get_list_delta(since_version)
+
+    def get_list_etag(self) -> str:
+        """artifact 列表的 ETag，任何 artifact 变化后都会改变"""
+        return self._storage.get_list_etag()
+
+    def get_artifact_etag(self, artifact_id: str) -> str | None:
+        """单个 artifact 的 ETag，artifact 不存在时返回 None"""
+        return self._storage.get_artifact_etag(artifact_id)
+
+    def get_artifact_metadata(self, artifact_id: str) -> ArtifactMetadata | None:
+        """根据 ID 获取 artifact 元数据，不读取内容"""
+        return self._storage.get_artifact_metadata(artifact_id)
+
+    def query_artifacts(
+        self,
+        artifact_type: ArtifactType | None = None,
+        role: ArtifactRole | None = None,
+        order_by: ArtifactOrderBy = ArtifactOrderBy.CREATED_AT,
+        descending: bool = True,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> ArtifactPage:
+        """分页查询 artifact 元数据，内容需要时再通过 get_artifact 获取"""
+        return self._storage.query_artifacts(
+            artifact_type=artifact_type,
+            role=role,
+            order_by=order_by,
+            descending=descending,
+            limit=limit,
+            cursor=cursor,
+        )
+
     def get_original_artifact(self) -> ArtifactData:
-        artifacts = self.list_artifacts()
-        for artifact in artifacts:
-            if artifact.type == ArtifactType.OTHER:
-                return artifact
-        raise ValueError("No original artifact found")
+        """最早创建的 OTHER 类型 artifact，内容文件已不存在的 artifact 被跳过"""
+        cursor = None
+        while True:
+            page = self.query_artifacts(
+                artifact_type=ArtifactType.OTHER,
+                descending=False,
+                limit=10,
+                cursor=cursor,
+            )
+            for metadata in page.artifacts:
+                artifact = self.get_artifact(metadata.id)
+                if artifact:
+                    return artifact
+            cursor = page.next_cursor
+            if cursor is None:
+                raise ValueError("No original artifact found")
 
     def update_artifact(
         self,
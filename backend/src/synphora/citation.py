@@ -141,3 +141,69 @@ class CitationParser:
             return None
 
         return Citation(title=title, type=citation_type, artifactId=artifact_id)
+
+
+class StreamingCitationScanner:
+    """
+    流式引用扫描器：在 LLM 逐个输出分片时增量识别引用标记。
+
+    引用标记可能被拆分到多个分片中，例如 `[14 打家劫舍`、`：动态规划的解题四步骤](COU`、
+    `RSE:14-dynamic-programming-basics)`。扫描器只保留可能构成未闭合标记的尾部文本，
+    每当一个标记闭合就立即返回对应的 Citation，同一条消息中重复的引用只返回一次。
+
+    与 CitationParser 一致，不考虑引用标记跨段的情况。
+    """
+
+    CITATION_PATTERN = re.compile(r'\[([^\[\]\n]+)\]\(([^:()\n]+):([^()\n]+)\)')
+
+    # 未闭合标记的最大长度，超过后丢弃，避免缓冲区无限增长
+    MAX_PENDING_CHARS = 1000
+
+    def __init__(self):
+        self._pending = ""
+        self._seen: set[tuple[CitationType, str]] = set()
+
+    def feed(self, text: str) -> list[Citation]:
+        """输入一个文本分片，返回其中新闭合的引用"""
+        if not text:
+            return []
+
+        buffer = self._pending + text
+        citations: list[Citation] = []
+        consumed = 0
+
+        for match in self.CITATION_PATTERN.finditer(buffer):
+            consumed = match.end()
+            citation = self._to_citation(match)
+            if citation is None:
+                continue
+            key = (citation.type, citation.artifactId)
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            citations.append(citation)
+
+        self._pending = self._trim_pending(buffer[consumed:])
+        return citations
+
+    def _trim_pending(self, rest: str) -> str:
+        # 标记不跨行，也必须以 `[` 开头
+        rest = rest[rest.rfind("\n") + 1 :]
+        start = rest.rfind("[")
+        if start == -1:
+            return ""
+        pending = rest[start:]
+        if len(pending) > self.MAX_PENDING_CHARS:
+            return ""
+        return pending
+
+    @staticmethod
+    def _to_citation(match: re.Match) -> Citation | None:
+        title = match.group(1)
+        try:
+            citation_type = CitationType(match.group(2).strip().lower())
+        except ValueError:
+            return None
+        return Citation(
+            title=title, type=citation_type, artifactId=match.group(3).strip()
+        )
@@ -1,61 +1,324 @@
+import json
+import mmap
+import os
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 
-from pydantic import BaseModel
+from synphora.course_catalog import (
+    COURSE_DATA_DIR,
+    COURSE_LIST_FIELDS,
+    Course,
+    CourseCatalog,
+)
+from synphora.course_outline import CourseOutline, CourseSection, parse_outline
 
+# 课程内容缓存的字节上限
+COURSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# 课程列表 JSON 缓存的最大条目数（按标签、字段和摘要长度区分）
+COURSE_LIST_CACHE_MAX_ENTRIES = 256
+# 两次增量扫描课程目录的最小间隔
+COURSE_RESCAN_INTERVAL_SECONDS = float(
+    os.getenv('SYNPHORA_COURSE_RESCAN_INTERVAL_SECONDS', '10')
+)
 
-class Course(BaseModel):
-    artifact_id: str
-    slug: str
-    title: str
-    tags: list[str]
-    summary: str
 
-    def to_data(self) -> dict:
-        return self.model_dump()
+class _CachedContent:
+    def __init__(self, mtime_ns: int, size: int, content: str):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.content = content
 
 
-COURSES = [
-    Course(
-        artifact_id="14-dynamic-programming-basics",
-        slug="14-dynamic-programming-basics",
-        title="14 打家劫舍：动态规划的解题四步骤",
-        tags=["动态规划"],
-        summary="动态规划是一类很讲究「触类旁通」的题型。很多动态规划的解法需要你做过某一类型的例题，再做类似的题目的时候就可以想起来相应的思路。动态规划的典型入门题目是打家劫舍问题，本文以打家劫舍问题为例，讲解动态规划的解题四步骤：定义子问题、写出子问题的递推关系、确定 DP 数组的计算顺序、空间优化。",
-    ),
-    Course(
-        artifact_id="15-two-dimensional-dynamic-programming",
-        slug="15-two-dimensional-dynamic-programming",
-        title="15 最长公共子序列：二维动态规划的解法",
-        tags=["动态规划"],
-        summary="本文会以典型题目最长公共子序列（LCS）问题入手，讲解二维动态规划问题的解题要领。",
-    ),
-]
+class CourseManager:
+    """
+    课程服务。课程目录来自 catalog（数据目录中的课程清单），也可以直接传入 courses。
+    课程正文在第一次读取时加载，按 LRU 缓存在内存中，总大小受 max_cache_bytes 限制。
+    每次读取会检查文件的 mtime 和大小，文件变化后自动重新读取。
+    """
 
+    def __init__(
+        self,
+        max_cache_bytes: int = COURSE_CACHE_MAX_BYTES,
+        use_mmap: bool = False,
+        courses: list[Course] | None = None,
+        catalog: CourseCatalog | None = None,
+        rescan_interval: float = COURSE_RESCAN_INTERVAL_SECONDS,
+    ):
+        self.catalog = catalog
+        self.rescan_interval = rescan_interval
+        self._last_rescan: float | None = None
+        self._rescan_lock = threading.Lock()
 
-class CourseManager:
-    def __init__(self):
-        self.courses_map = {course.artifact_id: course for course in COURSES}
+        self.courses: list[Course] = []
+        self.courses_map: dict[str, Course] = {}
+        self._course_files: dict[str, Path] = {}
+        self._tag_index: dict[str, list[Course]] = {}
+        # 课程目录每次变化时加一，用于让依赖目录的缓存失效
+        self.catalog_version = 0
+        # (catalog_version, tag, fields, summary_max_chars) -> 序列化后的 JSON
+        self._list_json_cache: OrderedDict[tuple, str] = OrderedDict()
+        self.max_cache_bytes = max_cache_bytes
+        self.use_mmap = use_mmap
+
+        self._cache: OrderedDict[str, _CachedContent] = OrderedDict()
+        # artifact_id -> (mtime_ns, size, 标题树)，标题树很小，不计入缓存上限
+        self._outlines: dict[str, tuple[int, int, CourseOutline]] = {}
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
+
+        # 使用 catalog 时不在创建时扫描，第一次访问课程时才扫描目录（导入模块时没有文件系统副作用）
+        if courses is not None:
+            self.set_courses(courses)
+
+    def rescan(self, force: bool = False) -> bool:
+        """
+        增量扫描课程目录（最多每 rescan_interval 秒一次），目录有变化时返回 True。
+        变化的课程会从内容缓存中移除。
+        """
+        if self.catalog is None:
+            return False
+        now = time.monotonic()
+        if (
+            not force
+            and self._last_rescan is not None
+            and now - self._last_rescan < self.rescan_interval
+        ):
+            return False
+
+        with self._rescan_lock:
+            self._last_rescan = now
+            result = self.catalog.scan()
+            if not result.changed and self.catalog_version:
+                return False
+            entries = self.catalog.courses()
+            self.set_courses(
+                [course for course, _ in entries],
+                files={course.artifact_id: path for course, path in entries},
+            )
+            with self._lock:
+                for artifact_id in result.updated + result.removed:
+                    entry = self._cache.pop(artifact_id, None)
+                    if entry is not None:
+                        self._cache_bytes -= entry.size
+                    self._outlines.pop(artifact_id, None)
+            return True
+
+    def set_courses(self, courses: list[Course], files: dict[str, Path] | None = None):
+        """
+        替换课程目录，重建标签索引，并使课程列表的 JSON 缓存失效。
+        files 是课程正文文件路径，未给出的课程使用默认路径。
+        """
+        tag_index: dict[str, list[Course]] = {}
+        for course in courses:
+            for tag in course.tags:
+                tag_index.setdefault(tag, []).append(course)
+
+        self.courses = list(courses)
+        self.courses_map = {course.artifact_id: course for course in self.courses}
+        self._course_files = files or {}
+        self._tag_index = tag_index
+        self.catalog_version += 1
+        self._list_json_cache.clear()
 
-    def list_courses(self) -> list[Course]:
-        """列出所有课程"""
-        return COURSES
+    def list_courses(self, tag: str = '') -> list[Course]:
+        """列出所有课程；tag 不为空时只列出带有该标签的课程"""
+        self.rescan()
+        tag = tag.strip()
+        if not tag:
+            return self.courses
+        return self._tag_index.get(tag, [])
+
+    def list_tags(self) -> list[str]:
+        self.rescan()
+        return list(self._tag_index)
+
+    def list_courses_json(
+        self,
+        tag: str = '',
+        fields: list[str] | None = None,
+        summary_max_chars: int = 0,
+    ) -> str:
+        """
+        课程列表的 JSON。同样的参数只序列化一次，之后直接返回缓存的字符串，
+        课程目录变化（catalog_version 改变）后缓存失效。
+        """
+        if fields:
+            # artifact_id 总是返回；按固定顺序排列，使同样的字段集合共享缓存
+            projection = tuple(
+                f for f in COURSE_LIST_FIELDS if f == 'artifact_id' or f in fields
+            )
+        else:
+            projection = COURSE_LIST_FIELDS
+        summary_max_chars = max(0, summary_max_chars)
+        tag = tag.strip()
+        self.rescan()
+        key = (self.catalog_version, tag, projection, summary_max_chars)
+
+        with self._lock:
+            cached = self._list_json_cache.get(key)
+            if cached is not None:
+                self._list_json_cache.move_to_end(key)
+                return cached
+
+        data = [
+            course.to_list_data(projection, summary_max_chars)
+            for course in self.list_courses(tag)
+        ]
+        result = json.dumps(data, ensure_ascii=False)
+
+        with self._lock:
+            # 序列化期间目录可能已变化，旧版本的结果不再缓存
+            if key[0] == self.catalog_version:
+                self._list_json_cache[key] = result
+                while len(self._list_json_cache) > COURSE_LIST_CACHE_MAX_ENTRIES:
+                    self._list_json_cache.popitem(last=False)
+        return result
 
     def get_course(self, artifact_id: str) -> Course:
         """根据 artifact_id 获取课程"""
-        return self.courses_map.get(artifact_id)
+        course = self.courses_map.get(artifact_id)
+        if course is None and self.rescan():
+            course = self.courses_map.get(artifact_id)
+        return course
 
-    def read_course_content(self, artifact_id: str) -> str:
-        """根据 artifact_id 读取课程内容"""
-        course = self.get_course(artifact_id)
-        file_path = self._get_course_file_path(course.slug)
-        if not file_path.exists():
-            raise FileNotFoundError(f"Course file not found: {file_path}")
-        with open(file_path, encoding='utf-8') as f:
-            content = f.read()
+    def get_course_fingerprint(self, artifact_id: str) -> tuple[int, int]:
+        """课程正文文件的 (mtime_ns, size)，用于判断内容是否变化，不读取文件内容"""
+        file_path = self.get_course_file_path(artifact_id)
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Course file not found: {file_path}") from None
+        return stat.st_mtime_ns, stat.st_size
+
+    def read_course_content(self, artifact_id: str, cache: bool = True) -> str:
+        """
+        根据 artifact_id 读取课程内容。
+        cache 为 False 时缓存未命中也不把内容放入缓存，用于一次性的批量读取（如构建搜索索引）
+        """
+        file_path = self.get_course_file_path(artifact_id)
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Course file not found: {file_path}") from None
+
+        with self._lock:
+            cached = self._cache.get(artifact_id)
+            if (
+                cached is not None
+                and cached.mtime_ns == stat.st_mtime_ns
+                and cached.size == stat.st_size
+            ):
+                self._cache.move_to_end(artifact_id)
+                self.cache_hits += 1
+                return cached.content
+            self.cache_misses += 1
+
+        content = self._read_file(file_path)
+        if not cache:
+            return content
+
+        with self._lock:
+            self._put(
+                artifact_id, _CachedContent(stat.st_mtime_ns, stat.st_size, content)
+            )
         return content
 
-    @staticmethod
-    def _get_course_file_path(slug: str) -> Path:
-        return (
-            Path(__file__).parent / 'data' / 'leetcode-by-example' / slug / f'{slug}.md'
-        )
+    def get_course_outline(self, artifact_id: str) -> CourseOutline:
+        """获取课程的标题树，文件只在首次访问或修改后解析一次"""
+        file_path = self.get_course_file_path(artifact_id)
+        stat = file_path.stat()
+
+        with self._lock:
+            cached = self._outlines.get(artifact_id)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
+        with open(file_path, 'rb') as f:
+            outline = parse_outline(f.read())
+        with self._lock:
+            self._outlines[artifact_id] = (stat.st_mtime_ns, stat.st_size, outline)
+        return outline
+
+    def read_course_section(self, artifact_id: str, section_path: str) -> str | None:
+        """读取课程中的一个章节（包括子章节），章节不存在时返回 None"""
+        outline = self.get_course_outline(artifact_id)
+        section = outline.find_section(section_path)
+        if section is None:
+            return None
+        return self._read_range(artifact_id, section)
+
+    def _read_range(self, artifact_id: str, section: CourseSection) -> str:
+        with open(self.get_course_file_path(artifact_id), 'rb') as f:
+            f.seek(section.start)
+            data = f.read(section.end - section.start)
+        return data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+    def _read_file(self, file_path: Path) -> str:
+        with open(file_path, 'rb') as f:
+            if self.use_mmap and os.fstat(f.fileno()).st_size > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    data = mm[:]
+            else:
+                data = f.read()
+        # 与 open(..., encoding='utf-8') 的文本模式保持一致，统一换行符
+        return data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+    def _put(self, artifact_id: str, entry: _CachedContent):
+        # 调用方已持有 self._lock
+        old = self._cache.pop(artifact_id, None)
+        if old is not None:
+            self._cache_bytes -= old.size
+        if entry.size > self.max_cache_bytes:
+            return
+
+        self._cache[artifact_id] = entry
+        self._cache_bytes += entry.size
+        while self._cache_bytes > self.max_cache_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= evicted.size
+            self.cache_evictions += 1
+
+    def cache_stats(self) -> dict:
+        """课程内容缓存的统计信息"""
+        with self._lock:
+            return {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "evictions": self.cache_evictions,
+                "entries": len(self._cache),
+                "bytes": self._cache_bytes,
+                "courses": len(self.courses),
+                "catalog_version": self.catalog_version,
+                "list_json_entries": len(self._list_json_cache),
+            }
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+            self._outlines.clear()
+            self._list_json_cache.clear()
+            self._cache_bytes = 0
+
+    def get_course_file_path(self, artifact_id: str) -> Path:
+        """课程正文文件的路径，只查内存中的课程目录，不访问文件"""
+        course = self.get_course(artifact_id)
+        if course is None:
+            raise FileNotFoundError(f"Course not found: {artifact_id}")
+        file_path = self._course_files.get(artifact_id)
+        if file_path is None:
+            file_path = (
+                COURSE_DATA_DIR
+                / 'leetcode-by-example'
+                / course.slug
+                / f'{course.slug}.md'
+            )
+        return file_path
+
+
+# 全局课程服务实例
+course_manager = CourseManager(catalog=CourseCatalog())
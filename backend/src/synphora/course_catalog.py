@@ -0,0 +1,243 @@
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pydantic import BaseModel, ValidationError
+
+# 课程数据目录，结构为 <合集>/<slug>/course.json 和 <合集>/<slug>/<slug>.md
+COURSE_DATA_DIR = Path(
+    os.getenv('SYNPHORA_COURSE_DATA_DIR', str(Path(__file__).parent / 'data'))
+)
+# 缓存目录，保存可以重新生成的文件（如课程目录索引），不写入数据目录
+CACHE_DIR = Path(
+    os.getenv(
+        'SYNPHORA_CACHE_DIR',
+        str(
+            Path(os.getenv('XDG_CACHE_HOME', str(Path.home() / '.cache'))) / 'synphora'
+        ),
+    )
+)
+# 课程目录索引文件，保存上次扫描得到的课程元信息，启动时不需要重新解析每个清单文件
+COURSE_INDEX_PATH = Path(
+    os.getenv('SYNPHORA_COURSE_INDEX_PATH', str(CACHE_DIR / 'course-index.json'))
+)
+# 课程清单文件名
+COURSE_MANIFEST_NAME = 'course.json'
+# 索引文件格式变化时加一，旧格式的索引会被忽略
+COURSE_INDEX_FORMAT = 1
+# list_articles 可以返回的字段，artifact_id 总是返回
+COURSE_LIST_FIELDS = ('artifact_id', 'slug', 'title', 'tags', 'summary')
+
+
+class Course(BaseModel):
+    artifact_id: str
+    slug: str
+    title: str
+    tags: list[str]
+    summary: str
+
+    def to_data(self) -> dict:
+        return self.model_dump()
+
+    def to_list_data(
+        self, fields: tuple[str, ...] = COURSE_LIST_FIELDS, summary_max_chars: int = 0
+    ) -> dict:
+        """课程列表中的一项：只保留 fields 中的字段，摘要超过 summary_max_chars 时截断"""
+        data = {field: getattr(self, field) for field in fields}
+        if 'summary' in data and 0 < summary_max_chars < len(self.summary):
+            data['summary'] = self.summary[:summary_max_chars] + '…'
+        return data
+
+
+class CatalogEntry(BaseModel):
+    """课程目录中的一项，mtime_ns 和 size 是解析时清单文件的状态"""
+
+    course: Course
+    # 课程所在目录，相对于数据目录
+    directory: str
+    mtime_ns: int
+    size: int
+
+
+@dataclass
+class CatalogScanResult:
+    added: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+class CourseCatalog:
+    """
+    从数据目录中发现课程。
+
+    每门课程是一个目录，其中的 course.json 清单描述课程的标题、标签和摘要，
+    正文在同目录的 <slug>.md 中，只在第一次读取时才加载。
+    扫描是增量的：只有 mtime 或大小变化的清单会被重新解析。
+    扫描结果写入缓存目录中的索引文件，下次启动时先加载索引，再增量扫描。
+    创建目录对象时不访问文件系统，第一次扫描或列出课程时才加载索引。
+    """
+
+    def __init__(
+        self,
+        data_dir: str | Path = COURSE_DATA_DIR,
+        index_path: str | Path | None = COURSE_INDEX_PATH,
+    ):
+        self.data_dir = Path(data_dir)
+        self.index_path = Path(index_path) if index_path else None
+        # directory -> 课程目录项
+        self._entries: dict[str, CatalogEntry] = {}
+        self._lock = threading.Lock()
+        self._index_loaded = False
+
+    def _ensure_index_loaded(self):
+        if not self._index_loaded:
+            self.load_index()
+
+    def load_index(self) -> bool:
+        """加载索引文件，文件不存在或格式不匹配时返回 False"""
+        self._index_loaded = True
+        if self.index_path is None:
+            return False
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('format') != COURSE_INDEX_FORMAT or data.get('data_dir') != str(
+                self.data_dir.resolve()
+            ):
+                return False
+            entries = [CatalogEntry.model_validate(e) for e in data['entries']]
+        except (OSError, ValueError, KeyError, ValidationError):
+            return False
+
+        with self._lock:
+            self._entries = {entry.directory: entry for entry in entries}
+        return True
+
+    def save_index(self):
+        """原子地写入索引文件；索引只是缓存，写入失败（如目录只读）时只打印警告"""
+        if self.index_path is None:
+            return
+        with self._lock:
+            entries = [entry.model_dump() for entry in self._entries.values()]
+        data = {
+            'format': COURSE_INDEX_FORMAT,
+            'data_dir': str(self.data_dir.resolve()),
+            'entries': entries,
+        }
+        tmp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f'⚠️ Failed to write course index {self.index_path}: {e}')
+            try:
+                tmp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    def scan(self) -> CatalogScanResult:
+        """增量扫描数据目录，课程有变化时更新索引文件"""
+        self._ensure_index_loaded()
+        result = CatalogScanResult()
+        with self._lock:
+            old_entries = self._entries
+            entries: dict[str, CatalogEntry] = {}
+            for directory, manifest in self._iter_manifests():
+                try:
+                    stat = manifest.stat()
+                except FileNotFoundError:
+                    continue
+                old = old_entries.get(directory)
+                if old is not None and (old.mtime_ns, old.size) == (
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                ):
+                    entries[directory] = old
+                    continue
+
+                course = self._load_manifest(manifest)
+                if course is None:
+                    continue
+                entries[directory] = CatalogEntry(
+                    course=course,
+                    directory=directory,
+                    mtime_ns=stat.st_mtime_ns,
+                    size=stat.st_size,
+                )
+                (result.updated if old is not None else result.added).append(
+                    course.artifact_id
+                )
+
+            result.removed = [
+                entry.course.artifact_id
+                for directory, entry in old_entries.items()
+                if directory not in entries
+            ]
+            self._entries = entries
+
+        if result.changed:
+            self.save_index()
+        return result
+
+    def _iter_manifests(self):
+        """按目录名顺序列出 <合集>/<slug>/course.json"""
+        try:
+            collections = sorted(
+                e.name for e in os.scandir(self.data_dir) if e.is_dir()
+            )
+        except FileNotFoundError:
+            return
+        for collection in collections:
+            try:
+                slugs = sorted(
+                    e.name for e in os.scandir(self.data_dir / collection) if e.is_dir()
+                )
+            except FileNotFoundError:
+                continue
+            for slug in slugs:
+                directory = f'{collection}/{slug}'
+                yield directory, self.data_dir / directory / COURSE_MANIFEST_NAME
+
+    @staticmethod
+    def _load_manifest(manifest: Path) -> Course | None:
+        slug = manifest.parent.name
+        try:
+            with open(manifest, encoding='utf-8') as f:
+                data = json.load(f)
+            return Course(
+                artifact_id=data.get('artifact_id', slug),
+                slug=data.get('slug', slug),
+                title=data['title'],
+                tags=data.get('tags', []),
+                summary=data.get('summary', ''),
+            )
+        except (OSError, ValueError, KeyError, ValidationError) as e:
+            print(f'⚠️ Invalid course manifest {manifest}: {e}')
+            return None
+
+    def courses(self) -> list[tuple[Course, Path]]:
+        """所有课程及其正文文件路径，artifact_id 重复时保留目录名靠前的课程"""
+        self._ensure_index_loaded()
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda e: e.directory)
+        seen = set()
+        courses = []
+        for entry in entries:
+            course = entry.course
+            if course.artifact_id in seen:
+                print(
+                    f'⚠️ Duplicate course artifact_id {course.artifact_id} in {entry.directory}'
+                )
+                continue
+            seen.add(course.artifact_id)
+            file_path = self.data_dir / entry.directory / f'{course.slug}.md'
+            courses.append((course, file_path))
+        return courses
@@ -0,0 +1,121 @@
+import re
+
+from pydantic import BaseModel
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+# 章节路径的分隔符，与 search_articles 返回的 section 一致
+SECTION_PATH_SEPARATOR = ' > '
+
+
+class HeadingStack:
+    """
+    扫描 Markdown 时当前所在的各级标题，用于生成章节路径。
+    第一个一级标题是文章标题，不计入章节路径。parse_outline 和搜索的段落切分共用，
+    保证 search_articles 返回的 section 可以直接传给 read_article_section。
+    """
+
+    def __init__(self):
+        self.title = ''
+        # 当前所在的各级标题 (level, title)，层级递增
+        self._headings: list[tuple[int, str]] = []
+
+    def push(self, level: int, title: str) -> tuple[int, str | None]:
+        """进入新标题，返回 (因此结束的章节数, 新章节的路径)；文章标题的路径为 None"""
+        if level == 1 and not self.title:
+            self.title = title
+            return 0, None
+        closed = 0
+        while self._headings and self._headings[-1][0] >= level:
+            self._headings.pop()
+            closed += 1
+        self._headings.append((level, title))
+        return closed, SECTION_PATH_SEPARATOR.join(t for _, t in self._headings)
+
+
+class CourseSection(BaseModel):
+    """文章中的一个章节，start/end 是章节（包括标题行）在 UTF-8 文件中的字节偏移"""
+
+    title: str
+    level: int
+    path: str
+    start: int
+    end: int
+    children: list['CourseSection'] = []
+
+    def to_data(self) -> dict:
+        return {
+            "title": self.title,
+            "path": self.path,
+            "bytes": self.end - self.start,
+            "children": [child.to_data() for child in self.children],
+        }
+
+
+class CourseOutline(BaseModel):
+    """文章的标题树。一级标题是文章标题，不计入章节路径"""
+
+    title: str
+    sections: list[CourseSection]
+
+    def iter_sections(self):
+        stack = list(reversed(self.sections))
+        while stack:
+            section = stack.pop()
+            yield section
+            stack.extend(reversed(section.children))
+
+    def find_section(self, section_path: str) -> CourseSection | None:
+        """按完整路径查找章节；找不到时按最后一级标题查找（只有唯一匹配时返回）"""
+        parts = [p.strip() for p in section_path.split(SECTION_PATH_SEPARATOR.strip())]
+        path = SECTION_PATH_SEPARATOR.join(p for p in parts if p)
+        matches = []
+        for section in self.iter_sections():
+            if section.path == path:
+                return section
+            if section.title == parts[-1]:
+                matches.append(section)
+        return matches[0] if len(matches) == 1 else None
+
+    def to_data(self) -> dict:
+        return {
+            "title": self.title,
+            "sections": [section.to_data() for section in self.sections],
+        }
+
+
+def parse_outline(data: bytes) -> CourseOutline:
+    """扫描 Markdown 文件内容，记录每个标题的层级和字节偏移，代码块中的 # 不视为标题"""
+    headings = HeadingStack()
+    sections: list[CourseSection] = []
+    # 尚未结束的章节，层级递增，与 headings 中的标题一一对应
+    stack: list[CourseSection] = []
+    in_code = False
+    offset = 0
+
+    for raw_line in data.splitlines(keepends=True):
+        line_start = offset
+        offset += len(raw_line)
+        line = raw_line.decode('utf-8').rstrip('\r\n')
+        if line.lstrip().startswith('```'):
+            in_code = not in_code
+            continue
+        heading = None if in_code else HEADING_PATTERN.match(line)
+        if not heading:
+            continue
+
+        level = len(heading.group(1))
+        closed, path = headings.push(level, heading.group(2))
+        if path is None:
+            continue
+
+        for _ in range(closed):
+            stack.pop().end = line_start
+        section = CourseSection(
+            title=heading.group(2), level=level, path=path, start=line_start, end=0
+        )
+        (stack[-1].children if stack else sections).append(section)
+        stack.append(section)
+
+    for section in stack:
+        section.end = offset
+    return CourseOutline(title=headings.title, sections=sections)
@@ -0,0 +1,290 @@
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+from synphora.course import CourseManager, course_manager
+from synphora.course_outline import HEADING_PATTERN, HeadingStack
+
+# BM25 参数
+BM25_K1 = 1.5
+BM25_B = 0.75
+# 段落切分的目标长度（字符数），超过后在下一个段落边界处切分
+PASSAGE_TARGET_CHARS = 400
+# 两次检查课程内容是否变化的最小间隔
+REFRESH_INTERVAL_SECONDS = 5.0
+# 单次搜索最多返回的段落数
+SEARCH_MAX_K = 20
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9_]+|[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    分词：英文和数字按单词切分（统一小写），连续的中文字符切成相邻两个字的二元组，
+    单独出现的一个中文字符保留为一个词。
+    """
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(text.lower()):
+        word = match.group()
+        if word[0].isascii():
+            tokens.append(word)
+        elif len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+@dataclass
+class Passage:
+    artifact_id: str
+    section: str
+    content: str
+
+
+@dataclass
+class SearchHit:
+    artifact_id: str
+    title: str
+    section: str
+    score: float
+    content: str
+
+    def to_data(self) -> dict:
+        return {
+            "artifact_id": self.artifact_id,
+            "title": self.title,
+            "section": self.section,
+            "score": round(self.score, 3),
+            "content": self.content,
+        }
+
+
+def split_passages(artifact_id: str, content: str) -> list[Passage]:
+    """按标题和空行把 Markdown 切分成段落，每个段落记录所在的标题路径"""
+    passages: list[Passage] = []
+    headings = HeadingStack()
+    section = ''
+    blocks: list[str] = []
+    lines: list[str] = []
+    size = 0
+    in_code = False
+
+    def end_block():
+        nonlocal lines, size
+        if lines:
+            block = '\n'.join(lines).strip()
+            if block:
+                blocks.append(block)
+                size += len(block)
+            lines = []
+
+    def flush():
+        nonlocal blocks, size
+        end_block()
+        if blocks:
+            passages.append(Passage(artifact_id, section, '\n\n'.join(blocks)))
+        blocks, size = [], 0
+
+    for line in content.split('\n'):
+        if line.lstrip().startswith('```'):
+            in_code = not in_code
+            lines.append(line)
+            continue
+        heading = None if in_code else HEADING_PATTERN.match(line)
+        if heading:
+            flush()
+            _, path = headings.push(len(heading.group(1)), heading.group(2))
+            section = path or ''
+        elif not in_code and not line.strip():
+            end_block()
+            if size >= PASSAGE_TARGET_CHARS:
+                flush()
+        else:
+            lines.append(line)
+    flush()
+    return passages
+
+
+@dataclass
+class _PassageRef:
+    """索引中的段落只记录位置，内容在命中时重新切分课程得到，索引不保存课程正文"""
+
+    artifact_id: str
+    section: str
+    # 段落在 split_passages 结果中的下标
+    ordinal: int
+
+
+@dataclass
+class _IndexedCourse:
+    # 索引时课程文件的 (mtime_ns, size)
+    fingerprint: tuple[int, int]
+    passage_ids: list[int]
+    # 课程中出现过的词，删除课程时只需要清理这些词的倒排表
+    tokens: set[str]
+
+
+class CourseSearchIndex:
+    """
+    课程段落的 BM25 倒排索引。
+
+    每篇课程切分成若干段落，倒排表记录每个词在哪些段落中出现及出现次数。
+    索引在第一次搜索时构建。之后搜索时检查课程文件的 mtime 和大小（最多每 REFRESH_INTERVAL_SECONDS 一次），
+    只重新切分和分词变化的课程。索引不保存课程正文，命中的段落内容从课程服务的内容缓存中读取。
+    """
+
+    def __init__(self, manager: CourseManager = course_manager):
+        self.manager = manager
+        self._passages: dict[int, _PassageRef] = {}
+        self._passage_lengths: dict[int, int] = {}
+        self._postings: dict[str, dict[int, int]] = {}
+        self._total_length = 0
+        self._next_id = 0
+        self._courses: dict[str, _IndexedCourse] = {}
+        self._last_refresh: float | None = None
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> int:
+        """重建内容有变化的课程，返回重建的课程数量"""
+        now = time.monotonic()
+        if (
+            not force
+            and self._last_refresh is not None
+            and now - self._last_refresh < REFRESH_INTERVAL_SECONDS
+        ):
+            return 0
+
+        with self._lock:
+            self._last_refresh = now
+            courses = {c.artifact_id: c for c in self.manager.list_courses()}
+            updated = 0
+            for artifact_id in list(self._courses):
+                if artifact_id not in courses:
+                    self._remove_course(artifact_id)
+            for artifact_id in courses:
+                try:
+                    fingerprint = self.manager.get_course_fingerprint(artifact_id)
+                    indexed = self._courses.get(artifact_id)
+                    if indexed is not None and indexed.fingerprint == fingerprint:
+                        continue
+                    # 只为分词读取一次，不占用课程内容缓存
+                    content = self.manager.read_course_content(artifact_id, cache=False)
+                except FileNotFoundError:
+                    self._remove_course(artifact_id)
+                    continue
+                self._remove_course(artifact_id)
+                self._add_course(artifact_id, fingerprint, content)
+                updated += 1
+            return updated
+
+    def _add_course(self, artifact_id: str, fingerprint: tuple[int, int], content: str):
+        passage_ids = []
+        course_tokens: set[str] = set()
+        for ordinal, passage in enumerate(split_passages(artifact_id, content)):
+            passage_id = self._next_id
+            self._next_id += 1
+            tokens = tokenize(passage.section) + tokenize(passage.content)
+            self._passages[passage_id] = _PassageRef(
+                artifact_id, passage.section, ordinal
+            )
+            self._passage_lengths[passage_id] = len(tokens)
+            self._total_length += len(tokens)
+            counts = Counter(tokens)
+            for token, count in counts.items():
+                self._postings.setdefault(token, {})[passage_id] = count
+            course_tokens.update(counts)
+            passage_ids.append(passage_id)
+        self._courses[artifact_id] = _IndexedCourse(
+            fingerprint, passage_ids, course_tokens
+        )
+
+    def _remove_course(self, artifact_id: str):
+        indexed = self._courses.pop(artifact_id, None)
+        if indexed is None:
+            return
+        for passage_id in indexed.passage_ids:
+            del self._passages[passage_id]
+            self._total_length -= self._passage_lengths.pop(passage_id)
+        for token in indexed.tokens:
+            postings = self._postings[token]
+            for passage_id in indexed.passage_ids:
+                postings.pop(passage_id, None)
+            if not postings:
+                del self._postings[token]
+
+    def search(self, query: str, k: int = 5) -> list[SearchHit]:
+        """搜索与 query 最相关的 k 个段落，按 BM25 分数从高到低排列"""
+        self.refresh()
+        k = max(1, min(k, SEARCH_MAX_K))
+        query_tokens = set(tokenize(query))
+
+        with self._lock:
+            count = len(self._passages)
+            if not count or not query_tokens:
+                return []
+            avg_length = self._total_length / count
+
+            scores: dict[int, float] = {}
+            for token in query_tokens:
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+                idf = math.log(
+                    1 + (count - len(postings) + 0.5) / (len(postings) + 0.5)
+                )
+                for passage_id, tf in postings.items():
+                    length_norm = (
+                        1
+                        - BM25_B
+                        + BM25_B * (self._passage_lengths[passage_id] / avg_length)
+                    )
+                    score = idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm)
+                    scores[passage_id] = scores.get(passage_id, 0.0) + score
+
+            top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            refs = [(self._passages[passage_id], score) for passage_id, score in top]
+
+        # 命中的课程重新切分，取出段落内容；课程在两次刷新之间被修改时段落可能对不上，跳过
+        passages: dict[str, list[Passage]] = {}
+        hits = []
+        for ref, score in refs:
+            if ref.artifact_id not in passages:
+                try:
+                    content = self.manager.read_course_content(ref.artifact_id)
+                except FileNotFoundError:
+                    content = ''
+                passages[ref.artifact_id] = split_passages(ref.artifact_id, content)
+            course_passages = passages[ref.artifact_id]
+            if ref.ordinal >= len(course_passages):
+                continue
+            passage = course_passages[ref.ordinal]
+            if passage.section != ref.section:
+                continue
+            course = self.manager.get_course(ref.artifact_id)
+            hits.append(
+                SearchHit(
+                    artifact_id=ref.artifact_id,
+                    title=course.title if course else ref.artifact_id,
+                    section=passage.section,
+                    score=score,
+                    content=passage.content,
+                )
+            )
+        return hits
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "courses": len(self._courses),
+                "passages": len(self._passages),
+                "terms": len(self._postings),
+            }
+
+
+# 全局课程搜索索引实例
+course_search_index = CourseSearchIndex()
@@ -1,25 +1,225 @@
+import hashlib
 import json
+import logging
+import os
 import shutil
 import tempfile
+import threading
+import time
 import uuid
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 
 from dotenv import load_dotenv
 
-from synphora.models import ArtifactData, ArtifactRole, ArtifactType
+from synphora.artifact_index import ArtifactIndex
+from synphora.models import (
+    ArtifactData,
+    ArtifactListDelta,
+    ArtifactMetadata,
+    ArtifactOrderBy,
+    ArtifactPage,
+    ArtifactRole,
+    ArtifactType,
+)
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# 日志条数超过该值后，在后台把日志压缩进快照
+JOURNAL_COMPACT_THRESHOLD = 10_000
+# 保留最近多少次 artifact 变化，用于计算列表的增量；更早的版本只能全量同步
+ARTIFACT_CHANGE_LOG_SIZE = 1000
+
+
+class MetadataJournal:
+    """
+    元数据的「快照 + 追加日志」存储。
+
+    - `metadata.json`：快照，格式与之前完全相同
+    - `metadata.journal`：快照之后的每次修改，一行一个 JSON 操作（put / delete / clear）
+
+    每次写入只追加一行日志，开销与 artifact 总数无关。日志条数超过阈值后，
+    在后台线程中把当前元数据写成新快照（先写临时文件再原子替换），然后丢弃旧日志。
+
+    每个操作都是按 ID 覆盖或删除，重复回放已包含在快照中的日志不会改变结果，
+    因此在压缩过程中任意时刻崩溃，重启后「快照 + 全部剩余日志」都能恢复出正确状态。
+    写到一半的最后一行日志会在加载时被截掉。
+    """
+
+    def __init__(
+        self,
+        storage_path: Path,
+        compact_threshold: int = JOURNAL_COMPACT_THRESHOLD,
+        fsync: bool = False,
+    ):
+        self.snapshot_file = storage_path / "metadata.json"
+        self.journal_file = storage_path / "metadata.journal"
+        # 压缩时被轮转出去、尚未合入快照的旧日志
+        self.rotated_file = storage_path / "metadata.journal.compacting"
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+
+        self._lock = threading.Lock()
+        self._journal = None
+        self._entries = 0
+        self._compaction: threading.Thread | None = None
+
+        self.metadata: dict[str, dict] = self._load()
+
+    def _load(self) -> dict[str, dict]:
+        """加载快照并按顺序回放日志"""
+        metadata = self._read_snapshot()
+        if self.rotated_file.exists():
+            self._replay(self.rotated_file, metadata)
+        if self.journal_file.exists():
+            self._entries = self._replay(self.journal_file, metadata)
+        return metadata
+
+    def _read_snapshot(self) -> dict[str, dict]:
+        if not self.snapshot_file.exists():
+            return {}
+        try:
+            with open(self.snapshot_file, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _replay(self, path: Path, metadata: dict[str, dict]) -> int:
+        """回放日志文件，返回回放的条数；截掉末尾写了一半的行"""
+        entries = 0
+        valid_bytes = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                # 没有换行符或无法解析，说明这一行没有写完（写入过程中崩溃）
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError('incomplete line')
+                    op = json.loads(line)
+                except ValueError:
+                    logger.warning(f'truncate torn metadata journal entry in {path}')
+                    break
+                self._apply(op, metadata)
+                entries += 1
+                valid_bytes += len(line)
+
+        if valid_bytes < path.stat().st_size:
+            os.truncate(path, valid_bytes)
+        return entries
+
+    @staticmethod
+    def _apply(op: dict, metadata: dict[str, dict]):
+        kind = op["op"]
+        if kind == "put":
+            metadata[op["id"]] = op["metadata"]
+        elif kind == "delete":
+            metadata.pop(op["id"], None)
+        elif kind == "clear":
+            metadata.clear()
+
+    def _append(self, op: dict):
+        # 调用方已持有 self._lock
+        if self._journal is None:
+            self._journal = open(self.journal_file, 'a', encoding='utf-8')
+        self._journal.write(
+            json.dumps(op, ensure_ascii=False, separators=(',', ':')) + '\n'
+        )
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+
+        self._entries += 1
+        if self._entries >= self.compact_threshold:
+            self._start_compaction()
+
+    def put(self, artifact_id: str, metadata: dict):
+        """写入（新增或覆盖）一条元数据"""
+        with self._lock:
+            # 保存副本，保证快照线程读取时不会被调用方修改
+            self.metadata[artifact_id] = dict(metadata)
+            self._append({"op": "put", "id": artifact_id, "metadata": metadata})
+
+    def delete(self, artifact_id: str):
+        """删除一条元数据"""
+        with self._lock:
+            self.metadata.pop(artifact_id, None)
+            self._append({"op": "delete", "id": artifact_id})
+
+    def clear(self):
+        """清空所有元数据"""
+        with self._lock:
+            self.metadata.clear()
+            self._append({"op": "clear"})
+
+    def _start_compaction(self):
+        # 调用方已持有 self._lock
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+        self._compaction = threading.Thread(
+            target=self.compact, name="metadata-compaction", daemon=True
+        )
+        self._compaction.start()
+
+    def compact(self):
+        """把当前元数据写成新快照，并丢弃已合入快照的日志"""
+        with self._lock:
+            # 已存在的轮转日志说明上一次压缩没有完成，保留它，本次快照会覆盖其内容
+            if not self.rotated_file.exists() and self.journal_file.exists():
+                if self._journal is not None:
+                    self._journal.close()
+                    self._journal = None
+                os.replace(self.journal_file, self.rotated_file)
+                self._entries = 0
+            snapshot = dict(self.metadata)
+
+        tmp_file = self.snapshot_file.with_suffix('.json.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+
+        if self.rotated_file.exists():
+            self.rotated_file.unlink()
+
+    def close(self):
+        """等待后台压缩结束并关闭日志文件"""
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
 
 class FileStorage:
     def __init__(self, storage_path: str = "tests/data/store"):
         self.original_storage_path = Path(storage_path)
         # 创建临时目录副本
         self.storage_path = self._create_temp_copy()
-        self.metadata_file = self.storage_path / "metadata.json"
         self._ensure_storage_directory()
-        self._metadata: dict[str, dict] = self._load_metadata()
+        self._journal = MetadataJournal(self.storage_path)
+        self.metadata_file = self._journal.snapshot_file
+        self._metadata: dict[str, dict] = self._journal.metadata
+        self._index = ArtifactIndex()
+        self._index.rebuild(self._metadata)
+
+        # 存储版本号：每次创建、更新、删除 artifact 都加一，用于生成列表的 ETag 和增量。
+        # 初始值取当前毫秒时间，重启后版本号仍然递增；epoch 保证重启后不会和之前进程的 ETag 重复
+        self._epoch = uuid.uuid4().hex[:8]
+        self._version = time.time_ns() // 1_000_000
+        # artifact_id -> 最后一次写入时的存储版本号
+        self._artifact_versions: dict[str, int] = {}
+        # 最近的变化 (版本号, artifact_id, created/updated/deleted)
+        self._changes: deque[tuple[int, str, str]] = deque(
+            maxlen=ARTIFACT_CHANGE_LOG_SIZE
+        )
+        # 能计算增量的最早版本号：更早的变化已不在 _changes 中
+        self._changes_floor = self._version
+        self._version_lock = threading.Lock()
 
     def _create_temp_copy(self) -> Path:
         """创建原始存储目录的临时副本"""
@@ -39,25 +239,17 @@ class FileStorage:
         """确保存储目录存在"""
         self.storage_path.mkdir(parents=True, exist_ok=True)
 
-    def _load_metadata(self) -> dict[str, dict]:
-        """从metadata.json加载元数据"""
-        if self.metadata_file.exists():
-            try:
-                with open(self.metadata_file, encoding='utf-8') as f:
-                    return json.load(f)
-            except (OSError, json.JSONDecodeError):
-                return {}
-        return {}
-
-    def _save_metadata(self):
-        """保存元数据到metadata.json"""
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(self._metadata, f, indent=2, ensure_ascii=False)
-
     def _get_data_file_path(self, artifact_id: str) -> Path:
         """获取数据文件路径"""
         return self.storage_path / f"{artifact_id}.txt"
 
+    def _get_content_path(self, artifact_id: str, metadata: dict) -> Path:
+        """获取内容所在的文件：虚拟 artifact 是被引用的源文件，其他 artifact 是数据文件"""
+        source = metadata.get("source")
+        if source:
+            return Path(source)
+        return self._get_data_file_path(artifact_id)
+
     def generate_artifact_id(self) -> str:
         """生成 artifact ID"""
         return str(uuid.uuid4())
@@ -86,13 +278,84 @@ class FileStorage:
         description: str | None = None,
     ) -> ArtifactData:
         """用户指定 ID 创建新的 artifact"""
-        now = datetime.now().isoformat()
-
         # 保存内容到数据文件
         data_file = self._get_data_file_path(artifact_id)
         with open(data_file, 'w', encoding='utf-8') as f:
             f.write(content)
 
+        metadata = self._put_new_metadata(
+            artifact_id, title, artifact_type, role, description
+        )
+        return ArtifactData(content=content, **metadata)
+
+    def new_temp_file(self) -> Path:
+        """在存储目录中创建一个空的临时文件，用于写入后原子地重命名为数据文件"""
+        fd, path = tempfile.mkstemp(dir=self.storage_path, prefix='.upload-')
+        os.close(fd)
+        return Path(path)
+
+    def create_artifact_from_file(
+        self,
+        temp_file: Path,
+        title: str,
+        artifact_type: ArtifactType = ArtifactType.OTHER,
+        role: ArtifactRole = ArtifactRole.USER,
+        description: str | None = None,
+    ) -> ArtifactMetadata:
+        """
+        用 new_temp_file 创建并已写入内容的临时文件创建 artifact：
+        临时文件被原子地重命名为数据文件，内容不经过内存
+        """
+        artifact_id = self.generate_artifact_id()
+        os.replace(temp_file, self._get_data_file_path(artifact_id))
+        metadata = self._put_new_metadata(
+            artifact_id, title, artifact_type, role, description
+        )
+        return ArtifactMetadata(**metadata)
+
+    def create_virtual_artifact(
+        self,
+        artifact_id: str,
+        title: str,
+        source_path: Path,
+        artifact_type: ArtifactType = ArtifactType.OTHER,
+        role: ArtifactRole = ArtifactRole.USER,
+        description: str | None = None,
+    ) -> ArtifactMetadata:
+        """
+        创建引用 source_path 内容的虚拟 artifact，不复制内容。
+        同一个 artifact 已经以相同的源文件、标题和类型存在时直接返回，不写入任何文件。
+        """
+        source = str(source_path)
+        metadata = self._metadata.get(artifact_id)
+        if (
+            metadata is not None
+            and metadata.get("source") == source
+            and metadata["title"] == title
+            and metadata["type"] == artifact_type.value
+        ):
+            return ArtifactMetadata(**metadata)
+
+        # 之前是普通 artifact 时删除它的数据文件
+        if metadata is not None and not metadata.get("source"):
+            self._get_data_file_path(artifact_id).unlink(missing_ok=True)
+
+        metadata = self._put_new_metadata(
+            artifact_id, title, artifact_type, role, description, source=source
+        )
+        return ArtifactMetadata(**metadata)
+
+    def _put_new_metadata(
+        self,
+        artifact_id: str,
+        title: str,
+        artifact_type: ArtifactType,
+        role: ArtifactRole,
+        description: str | None,
+        source: str | None = None,
+    ) -> dict:
+        now = datetime.now().isoformat()
+
         # 保存元数据
         metadata = {
             "id": artifact_id,
@@ -103,11 +366,15 @@ class FileStorage:
             "created_at": now,
             "updated_at": now,
         }
+        if source is not None:
+            # 虚拟 artifact 的内容来自该文件，不在存储目录中保存副本
+            metadata["source"] = source
 
-        self._metadata[artifact_id] = metadata
-        self._save_metadata()
-
-        return ArtifactData(content=content, **metadata)
+        created = artifact_id not in self._metadata
+        self._journal.put(artifact_id, metadata)
+        self._index.put(metadata)
+        self._bump_version(artifact_id, 'created' if created else 'updated')
+        return metadata
 
     def get_artifact(self, artifact_id: str) -> ArtifactData | None:
         """根据 ID 获取 artifact"""
@@ -116,7 +383,7 @@ class FileStorage:
             return None
 
         # 读取内容文件
-        data_file = self._get_data_file_path(artifact_id)
+        data_file = self._get_content_path(artifact_id, metadata)
         if not data_file.exists():
             return None
 
@@ -128,6 +395,50 @@ class FileStorage:
         except OSError:
             return None
 
+    def get_artifact_content_path(self, artifact_id: str) -> Path | None:
+        """获取 artifact 内容文件的路径，用于直接流式读取文件，不读入内存"""
+        metadata = self._metadata.get(artifact_id)
+        if not metadata:
+            return None
+        data_file = self._get_content_path(artifact_id, metadata)
+        if not data_file.exists():
+            return None
+        return data_file
+
+    def get_artifact_metadata(self, artifact_id: str) -> ArtifactMetadata | None:
+        """根据 ID 获取 artifact 元数据，不读取内容文件"""
+        metadata = self._metadata.get(artifact_id)
+        if not metadata:
+            return None
+        return ArtifactMetadata(**metadata)
+
+    def query_artifacts(
+        self,
+        artifact_type: ArtifactType | None = None,
+        role: ArtifactRole | None = None,
+        order_by: ArtifactOrderBy = ArtifactOrderBy.CREATED_AT,
+        descending: bool = True,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> ArtifactPage:
+        """按类型、角色过滤并分页查询 artifact 元数据，不读取内容文件"""
+        items, next_cursor = self._index.query(
+            artifact_type=artifact_type,
+            role=role,
+            order_by=order_by,
+            descending=descending,
+            limit=limit,
+            cursor=cursor,
+        )
+        return ArtifactPage(
+            artifacts=[ArtifactMetadata(**metadata) for metadata in items],
+            next_cursor=next_cursor,
+        )
+
+    def list_artifact_metadata(self) -> list[ArtifactMetadata]:
+        """按创建时间返回所有 artifact 的元数据，直接从索引读取，不读取内容文件"""
+        return [ArtifactMetadata(**metadata) for metadata in self._index.list_all()]
+
     def list_artifacts(self) -> list[ArtifactData]:
         """获取所有 artifacts"""
         artifacts = []
@@ -149,6 +460,7 @@ class FileStorage:
         if not metadata:
             return None
 
+        metadata = dict(metadata)
         now = datetime.now().isoformat()
 
         # 更新元数据
@@ -158,14 +470,16 @@ class FileStorage:
             metadata['description'] = description
         metadata['updated_at'] = now
 
-        # 更新内容文件
+        # 更新内容文件；虚拟 artifact 的内容被修改后转为普通 artifact，不修改被引用的源文件
         if content is not None:
             data_file = self._get_data_file_path(artifact_id)
             with open(data_file, 'w', encoding='utf-8') as f:
                 f.write(content)
+            metadata.pop('source', None)
 
-        self._metadata[artifact_id] = metadata
-        self._save_metadata()
+        self._journal.put(artifact_id, metadata)
+        self._index.put(metadata)
+        self._bump_version(artifact_id, 'updated')
 
         return self.get_artifact(artifact_id)
 
@@ -174,14 +488,15 @@ class FileStorage:
         if artifact_id not in self._metadata:
             return False
 
-        # 删除数据文件
+        # 删除数据文件（虚拟 artifact 没有数据文件，被引用的源文件不能删除）
         data_file = self._get_data_file_path(artifact_id)
         if data_file.exists():
             data_file.unlink()
 
         # 删除元数据
-        del self._metadata[artifact_id]
-        self._save_metadata()
+        self._journal.delete(artifact_id)
+        self._index.remove(artifact_id)
+        self._bump_version(artifact_id, 'deleted')
 
         return True
 
@@ -194,11 +509,90 @@ class FileStorage:
                 data_file.unlink()
 
         # 清空元数据
-        self._metadata.clear()
-        self._save_metadata()
+        self._journal.clear()
+        self._index.clear()
+        with self._version_lock:
+            self._version += 1
+            self._artifact_versions.clear()
+            # 清空之前的版本无法计算增量
+            self._changes.clear()
+            self._changes_floor = self._version
+
+    def _bump_version(self, artifact_id: str, change: str):
+        with self._version_lock:
+            self._version += 1
+            if change == 'deleted':
+                self._artifact_versions.pop(artifact_id, None)
+            else:
+                self._artifact_versions[artifact_id] = self._version
+            if len(self._changes) == self._changes.maxlen:
+                self._changes_floor = self._changes[0][0]
+            self._changes.append((self._version, artifact_id, change))
+
+    def get_list_delta(self, since_version: int) -> ArtifactListDelta:
+        """
+        计算从 since_version 到当前版本的列表增量。
+        since_version 太旧（变化记录已被丢弃）时返回 resync=True 的增量，调用方需要全量同步。
+        """
+        with self._version_lock:
+            version = self._version
+            if since_version < self._changes_floor or since_version > version:
+                return ArtifactListDelta(
+                    base_version=since_version, version=version, resync=True
+                )
+            # artifact_id -> (是否在 since_version 时已存在, 是否仍存在)，按首次变化的顺序
+            states: dict[str, tuple[bool, bool]] = {}
+            for change_version, artifact_id, change in self._changes:
+                if change_version <= since_version:
+                    continue
+                existed = states.get(artifact_id, (change != 'created', True))[0]
+                states[artifact_id] = (existed, change != 'deleted')
+
+        delta = ArtifactListDelta(base_version=since_version, version=version)
+        for artifact_id, (existed, exists) in states.items():
+            metadata = self._metadata.get(artifact_id) if exists else None
+            if metadata is None:
+                # 在这段时间内创建又删除的 artifact 不需要通知
+                if existed:
+                    delta.removed.append(artifact_id)
+                continue
+            if existed:
+                delta.updated.append(ArtifactMetadata(**metadata))
+            else:
+                delta.added.append(ArtifactMetadata(**metadata))
+        return delta
+
+    @property
+    def version(self) -> int:
+        """存储版本号，任何 artifact 变化后都会增加"""
+        return self._version
+
+    def get_list_etag(self) -> str:
+        """artifact 列表的强 ETag，由存储版本号生成"""
+        return f'"{self._epoch}-{self._version}"'
+
+    def get_artifact_etag(self, artifact_id: str) -> str | None:
+        """
+        单个 artifact 的强 ETag，由 updated_at 和最后一次写入时的存储版本号生成；
+        虚拟 artifact 还包括源文件的 mtime 和大小
+        """
+        metadata = self._metadata.get(artifact_id)
+        if not metadata:
+            return None
+        version = self._artifact_versions.get(artifact_id, 0)
+        key = f'{artifact_id}|{metadata["updated_at"]}|{self._epoch}|{version}'
+        source = metadata.get("source")
+        if source:
+            try:
+                stat = os.stat(source)
+                key += f'|{stat.st_mtime_ns}|{stat.st_size}'
+            except OSError:
+                pass
+        return f'"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
 
     def cleanup_temp_storage(self):
         """清理临时存储目录（可选）"""
+        self._journal.close()
         if self.storage_path.exists() and str(self.storage_path).startswith("/tmp"):
             shutil.rmtree(self.storage_path)
             print(f"🗑️ Cleaned up temporary storage: {self.storage_path}")
@@ -0,0 +1,224 @@
+import logging
+import os
+from dataclasses import dataclass
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_budgets(raw: str) -> dict[str, int]:
+    """解析 "kimi=100000,gemini=200000" 格式的预算配置，格式错误的项记录日志后跳过"""
+    budgets = {}
+    for item in raw.split(','):
+        if not item.strip():
+            continue
+        key, _, value = item.partition('=')
+        key = key.strip()
+        try:
+            budget = int(value)
+        except ValueError:
+            budget = 0
+        if not key or budget <= 0:
+            logger.warning(f'ignore invalid history token budget: {item.strip()!r}')
+            continue
+        budgets[key] = budget
+    return budgets
+
+
+# 发送给模型的历史消息的默认 token 预算
+HISTORY_TOKEN_BUDGET = int(os.getenv('SYNPHORA_HISTORY_TOKEN_BUDGET', '32000'))
+# 按模型覆盖预算，格式为 "kimi=100000,gemini=200000"，与 model_key 做子串匹配
+HISTORY_TOKEN_BUDGETS = _parse_budgets(os.getenv('SYNPHORA_HISTORY_TOKEN_BUDGETS', ''))
+# 最近的若干轮对话始终原样保留（包括当前正在进行的一轮）
+KEEP_RECENT_TURNS = 2
+# 工具输出超过该长度时才会被替换成占位说明
+TOOL_OUTPUT_STUB_MIN_TOKENS = 200
+# 摘要中每条用户问题和回答保留的字符数
+SUMMARY_QUESTION_CHARS = 100
+SUMMARY_ANSWER_CHARS = 200
+# 每条消息的格式开销（角色、分隔符等）
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def get_token_budget(model_key: str | None) -> int:
+    """获取模型对应的历史 token 预算"""
+    model_key = model_key or ''
+    for key, budget in HISTORY_TOKEN_BUDGETS.items():
+        if key in model_key:
+            return budget
+    return HISTORY_TOKEN_BUDGET
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本的 token 数：中文等非 ASCII 字符约 1 个 token，ASCII 字符约 4 个一个 token。
+    利用 UTF-8 编码长度计算非 ASCII 字符数，避免逐字符遍历。
+    """
+    chars = len(text)
+    non_ascii = (len(text.encode('utf-8')) - chars) // 2
+    return non_ascii + (chars - non_ascii) // 4
+
+
+def _content_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return ''.join(
+        block if isinstance(block, str) else block.get('text', '') for block in content
+    )
+
+
+def estimate_message_tokens(message: BaseMessage) -> int:
+    tokens = MESSAGE_OVERHEAD_TOKENS + estimate_tokens(_content_text(message))
+    for tool_call in getattr(message, 'tool_calls', None) or []:
+        tokens += estimate_tokens(str(tool_call.get('args', {})))
+    return tokens
+
+
+@dataclass
+class CompactionResult:
+    messages: list[BaseMessage]
+    tokens_before: int
+    tokens_after: int
+    stubbed_tool_outputs: int = 0
+    summarized_turns: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+def _split_turns(
+    messages: list[BaseMessage],
+) -> tuple[list[BaseMessage], list[list[BaseMessage]]]:
+    """把消息分成开头的系统消息和若干轮对话，每轮以一条用户消息开始"""
+    head: list[BaseMessage] = []
+    turns: list[list[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            turns.append([message])
+        elif turns:
+            turns[-1].append(message)
+        else:
+            head.append(message)
+    return head, turns
+
+
+def _tool_call_args(messages: list[BaseMessage]) -> dict[str, str]:
+    """tool_call_id -> 工具名和参数，用于判断两次工具调用是否相同"""
+    calls = {}
+    for message in messages:
+        if isinstance(message, AIMessage):
+            for tool_call in message.tool_calls:
+                calls[tool_call['id']] = f'{tool_call["name"]}:{tool_call["args"]}'
+    return calls
+
+
+def _stub(message: ToolMessage, tokens: int) -> ToolMessage:
+    # 保留 tool_call_id，模型接口要求每个工具调用都有对应的工具结果
+    return message.model_copy(
+        update={
+            'content': f'[已省略 {message.name or "工具"} 的输出（约 {tokens} tokens），'
+            f'如需其中的内容请重新调用工具]'
+        }
+    )
+
+
+def _truncate(text: str, limit: int) -> str:
+    text = ' '.join(text.split())
+    return text if len(text) <= limit else text[:limit] + '…'
+
+
+def _summarize_turns(turns: list[list[BaseMessage]]) -> str:
+    lines = ['以下是更早对话的摘要（完整内容已省略）：']
+    for turn in turns:
+        question = _truncate(_content_text(turn[0]), SUMMARY_QUESTION_CHARS)
+        answers = [
+            m for m in turn if isinstance(m, AIMessage) and _content_text(m).strip()
+        ]
+        lines.append(f'- 用户：{question}')
+        if answers:
+            answer = _truncate(_content_text(answers[-1]), SUMMARY_ANSWER_CHARS)
+            lines.append(f'  助手：{answer}')
+    return '\n'.join(lines)
+
+
+def compact_history(messages: list[BaseMessage], budget: int) -> CompactionResult:
+    """
+    在发送给模型之前压缩对话历史，不修改传入的消息列表。
+
+    未超出预算时原样返回。超出预算时依次：
+    1. 把重复调用（相同工具和参数）中较早的一次输出、以及较早轮次中较长的工具输出替换成占位说明；
+    2. 仍然超出时，从最早的一轮开始把对话替换成摘要，附加在系统消息之后。
+    最近 KEEP_RECENT_TURNS 轮对话始终原样保留。
+    """
+    tokens = [estimate_message_tokens(m) for m in messages]
+    tokens_before = sum(tokens)
+    if tokens_before <= budget:
+        return CompactionResult(messages, tokens_before, tokens_before)
+
+    token_of = {id(m): t for m, t in zip(messages, tokens, strict=True)}
+    total = tokens_before
+    head, turns = _split_turns(messages)
+    recent_start = max(len(turns) - KEEP_RECENT_TURNS, 0)
+
+    # 1. 替换过期的工具输出，从最早的开始
+    call_args = _tool_call_args(messages)
+    last_index_of_call: dict[str, int] = {}
+    for i, turn in enumerate(turns):
+        for message in turn:
+            if isinstance(message, ToolMessage):
+                last_index_of_call[call_args.get(message.tool_call_id, '')] = i
+
+    stubbed = 0
+    for i, turn in enumerate(turns):
+        for j, message in enumerate(turn):
+            if total <= budget:
+                break
+            if not isinstance(message, ToolMessage):
+                continue
+            message_tokens = token_of[id(message)]
+            if message_tokens < TOOL_OUTPUT_STUB_MIN_TOKENS:
+                continue
+            args = call_args.get(message.tool_call_id, '')
+            repeated_later = bool(args) and last_index_of_call[args] > i
+            if i >= recent_start and not repeated_later:
+                continue
+            stub = _stub(message, message_tokens)
+            turn[j] = stub
+            stub_tokens = estimate_message_tokens(stub)
+            token_of[id(stub)] = stub_tokens
+            total -= message_tokens - stub_tokens
+            stubbed += 1
+
+    # 2. 把较早的轮次替换成摘要
+    summarized = 0
+    if total > budget and recent_start > 0:
+        summary = ''
+        summary_tokens = 0
+        while summarized < recent_start and total + summary_tokens > budget:
+            total -= sum(token_of[id(m)] for m in turns[summarized])
+            summarized += 1
+            summary = _summarize_turns(turns[:summarized])
+            summary_tokens = estimate_tokens(summary)
+
+        system_text = '\n\n'.join(
+            _content_text(m) for m in head if isinstance(m, SystemMessage)
+        )
+        total -= sum(token_of[id(m)] for m in head if isinstance(m, SystemMessage))
+        new_system = SystemMessage(
+            content=f'{system_text}\n\n{summary}' if system_text else summary
+        )
+        total += estimate_message_tokens(new_system)
+        head = [new_system] + [m for m in head if not isinstance(m, SystemMessage)]
+        turns = turns[summarized:]
+
+    compacted = head + [message for turn in turns for message in turn]
+    return CompactionResult(compacted, tokens_before, total, stubbed, summarized)
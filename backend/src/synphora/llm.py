@@ -1,15 +1,30 @@
+import logging
 import os
+import threading
+from collections.abc import Sequence
 from functools import lru_cache
 
+import httpx
 from dotenv import load_dotenv
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-from langchain_core.tools import Tool
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool, Tool
 from langchain_openai import ChatOpenAI
-from pydantic import BaseModel, SecretStr
+from pydantic import BaseModel, SecretStr, ValidationError
 
 # 加载 .env 文件
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# 连接池配置：长连接保活，避免每次请求重新建立 TCP/TLS 连接
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+HTTP_KEEPALIVE_EXPIRY_SECONDS = 300
+HTTP_CONNECT_TIMEOUT_SECONDS = 10
+HTTP_READ_TIMEOUT_SECONDS = 120
+
 
 class LlmConfig(BaseModel):
     base_url: str
@@ -19,6 +34,7 @@ class LlmConfig(BaseModel):
 
 @lru_cache(maxsize=32)
 def _get_llm_config(model_key: str = None) -> LlmConfig:
+    model_key = model_key or ''
     if 'gemini' in model_key or 'google' in model_key:
         return LlmConfig(
             base_url=os.getenv("GEMINI_LLM_BASE_URL"),
@@ -38,29 +54,166 @@ def _get_llm_config(model_key: str = None) -> LlmConfig:
     )
 
 
-def create_llm_client(model_key: str = None) -> ChatOpenAI:
-    llm_config = _get_llm_config(model_key)
+def _config_key(llm_config: LlmConfig) -> tuple[str, str, str]:
+    return (
+        llm_config.base_url,
+        llm_config.model,
+        llm_config.api_key.get_secret_value(),
+    )
 
-    # print(f'create_llm_client, model_key: {model_key}, llm_config: {llm_config}')
 
-    return ChatOpenAI(
-        base_url=llm_config.base_url,
-        api_key=llm_config.api_key.get_secret_value(),
-        model=llm_config.model,
-    )
+class LlmClientRegistry:
+    """LLM 客户端注册表
 
+    每个供应商配置（base_url + model + api_key）只创建一个长期存活的 ChatOpenAI，
+    同一 base_url 的客户端共享一组保活的 HTTP 连接池。绑定工具后的 runnable
+    也会被缓存，避免每轮推理重复转换工具 schema。
+    """
 
-def create_llm_with_tools(tools: list[Tool]) -> ChatOpenAI:
-    """创建绑定工具的LLM客户端"""
-    llm_config = _get_llm_config()
+    def __init__(self):
+        self._clients: dict[tuple[str, str, str], ChatOpenAI] = {}
+        self._bound: dict[tuple, Runnable[LanguageModelInput, BaseMessage]] = {}
+        self._http_clients: dict[str, httpx.Client] = {}
+        self._http_async_clients: dict[str, httpx.AsyncClient] = {}
+        self._lock = threading.Lock()
 
-    llm = ChatOpenAI(
-        base_url=llm_config.base_url,
-        api_key=llm_config.api_key.get_secret_value(),
-        model=llm_config.model,
-    )
+    @staticmethod
+    def _limits() -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        )
 
-    return llm.bind_tools(tools) if tools else llm
+    @staticmethod
+    def _timeout() -> httpx.Timeout:
+        return httpx.Timeout(
+            HTTP_READ_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS
+        )
+
+    def _get_http_clients(
+        self, base_url: str
+    ) -> tuple[httpx.Client, httpx.AsyncClient]:
+        # 调用方已持有 self._lock
+        if base_url not in self._http_clients:
+            self._http_clients[base_url] = httpx.Client(
+                limits=self._limits(), timeout=self._timeout()
+            )
+            self._http_async_clients[base_url] = httpx.AsyncClient(
+                limits=self._limits(), timeout=self._timeout()
+            )
+        return self._http_clients[base_url], self._http_async_clients[base_url]
+
+    def get_client(self, model_key: str = None) -> ChatOpenAI:
+        """获取 model_key 对应的共享 LLM 客户端"""
+        llm_config = _get_llm_config(model_key)
+        key = _config_key(llm_config)
+
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                http_client, http_async_client = self._get_http_clients(
+                    llm_config.base_url
+                )
+                client = ChatOpenAI(
+                    base_url=llm_config.base_url,
+                    api_key=llm_config.api_key.get_secret_value(),
+                    model=llm_config.model,
+                    http_client=http_client,
+                    http_async_client=http_async_client,
+                )
+                self._clients[key] = client
+        return client
+
+    def get_client_with_tools(
+        self, model_key: str, tools: Sequence[BaseTool]
+    ) -> Runnable[LanguageModelInput, BaseMessage]:
+        """获取绑定了工具的共享 runnable，按 (供应商配置, 工具集) 缓存"""
+        llm = self.get_client(model_key)
+        if not tools:
+            return llm
+
+        # 缓存的 runnable 持有工具对象的引用，因此 id 在缓存生命周期内不会被复用
+        key = (_config_key(_get_llm_config(model_key)), tuple(id(t) for t in tools))
+        bound = self._bound.get(key)
+        if bound is None:
+            with self._lock:
+                bound = self._bound.get(key)
+                if bound is None:
+                    bound = llm.bind_tools(tools)
+                    self._bound[key] = bound
+        return bound
+
+    def configured_model_keys(self) -> list[str]:
+        """返回已在环境变量中配置了供应商的代表性 model_key"""
+        model_keys = []
+        if os.getenv("LLM_BASE_URL"):
+            model_keys.append('')
+        if os.getenv("GEMINI_LLM_BASE_URL"):
+            model_keys.append('gemini')
+        if os.getenv("KIMI_LLM_BASE_URL"):
+            model_keys.append('kimi')
+        return model_keys
+
+    async def warm_up(
+        self,
+        model_keys: list[str] | None = None,
+        tools: Sequence[BaseTool] | None = None,
+    ) -> None:
+        """服务启动时预先创建客户端、绑定工具，并预先建立到供应商的连接"""
+        if model_keys is None:
+            model_keys = self.configured_model_keys()
+
+        for model_key in model_keys:
+            # 供应商配置不完整时只记录日志，等到真正使用该供应商时再报错
+            try:
+                llm_config = _get_llm_config(model_key)
+            except ValidationError as e:
+                logger.warning(f'skip warm-up for model_key {model_key!r}: {e}')
+                continue
+            self.get_client(model_key)
+            if tools:
+                self.get_client_with_tools(model_key, tools)
+
+            # 任意一次请求都会完成 TCP/TLS 握手，连接随后留在连接池中复用
+            with self._lock:
+                _, http_async_client = self._get_http_clients(llm_config.base_url)
+            try:
+                await http_async_client.head(llm_config.base_url)
+            except httpx.HTTPError as e:
+                logger.warning(f'pre-connect to {llm_config.base_url} failed: {e}')
+
+    async def aclose(self) -> None:
+        """关闭所有连接池"""
+        with self._lock:
+            http_clients = list(self._http_clients.values())
+            http_async_clients = list(self._http_async_clients.values())
+            self._clients.clear()
+            self._bound.clear()
+            self._http_clients.clear()
+            self._http_async_clients.clear()
+
+        for http_client in http_clients:
+            http_client.close()
+        for http_async_client in http_async_clients:
+            await http_async_client.aclose()
+
+
+# 全局 LLM 客户端注册表实例
+llm_client_registry = LlmClientRegistry()
+
+
+def create_llm_client(model_key: str = None) -> ChatOpenAI:
+    return llm_client_registry.get_client(model_key)
+
+
+def create_llm_with_tools(tools: list[Tool], model_key: str = None) -> Runnable:
+    """创建绑定工具的LLM客户端"""
+    return llm_client_registry.get_client_with_tools(model_key, tools)
 
 
 # 测试
@@ -17,17 +17,48 @@ class ArtifactRole(str, Enum):
     ASSISTANT = "assistant"
 
 
-class ArtifactData(BaseModel):
+class ArtifactMetadata(BaseModel):
+    """artifact 的元数据（不含内容）"""
+
     id: str
     role: ArtifactRole
     type: ArtifactType
     title: str
     description: str | None = None
-    content: str
     created_at: str
     updated_at: str
 
 
+class ArtifactData(ArtifactMetadata):
+    content: str
+
+
+class ArtifactListDelta(BaseModel):
+    """
+    artifact 列表从 base_version 到 version 的增量（只含元数据）。
+    resync 为 True 时无法计算增量，客户端需要重新获取完整列表。
+    """
+
+    base_version: int
+    version: int
+    added: list[ArtifactMetadata] = []
+    updated: list[ArtifactMetadata] = []
+    removed: list[str] = []
+    resync: bool = False
+
+
+class ArtifactOrderBy(str, Enum):
+    CREATED_AT = "created_at"
+    UPDATED_AT = "updated_at"
+
+
+class ArtifactPage(BaseModel):
+    """artifact 元数据的分页查询结果"""
+
+    artifacts: list[ArtifactMetadata]
+    next_cursor: str | None = None
+
+
 class EvaluateType(str, Enum):
     COMMENT = "comment"
     TITLE = "title"
@@ -1,19 +1,40 @@
+import logging
+import os
+import threading
 from pathlib import Path
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemLoader, Template, meta, select_autoescape
+
+logger = logging.getLogger(__name__)
+
+# Reload templates when files change (for development only)
+PROMPT_RELOAD = os.getenv('SYNPHORA_PROMPT_RELOAD') == 'true'
+PROMPT_RELOAD_INTERVAL_SECONDS = 1.0
 
 
 class PromptRenderer:
-    """Jinja2-based prompt template renderer that loads templates from files."""
+    """Jinja2-based prompt template renderer that loads templates from files.
+
+    All templates are compiled once when the renderer is set up. Templates that
+    use no variables are rendered once as well, and later renders return the
+    cached text.
+    """
 
-    def __init__(self, template_dir: str | Path = None):
+    def __init__(self, template_dir: str | Path = None, watch: bool = False):
         if template_dir is None:
             # Default to templates directory relative to this file
             template_dir = Path(__file__).parent / "templates"
 
         self.template_dir = Path(template_dir)
         self.env = None
+        self._templates: dict[str, Template] = {}
+        self._static_renders: dict[str, str] = {}
+        self._mtimes: dict[str, tuple[int, int]] = {}
+        self._watcher: threading.Thread | None = None
+        self._stop_watching = threading.Event()
         self._setup()
+        if watch:
+            self.start_watching()
 
     def _setup(self):
         """Setup the Jinja2 environment with file system loader."""
@@ -28,7 +49,67 @@ class PromptRenderer:
             autoescape=select_autoescape(['html', 'xml']),
             trim_blocks=True,
             lstrip_blocks=True,
+            # Templates are precompiled; reloading is handled by the watcher
+            auto_reload=False,
+        )
+        self._compile_all()
+
+    def _compile_all(self):
+        """Compile every template and pre-render the ones without variables."""
+        templates: dict[str, Template] = {}
+        static_renders: dict[str, str] = {}
+        for name in self.env.list_templates(extensions=['md']):
+            source, _, _ = self.env.loader.get_source(self.env, name)
+            template = self.env.get_template(name)
+            templates[name] = template
+            if not meta.find_undeclared_variables(self.env.parse(source)):
+                static_renders[name] = template.render()
+
+        # Swap in the new tables at once so concurrent renders never see a mix
+        self._templates = templates
+        self._static_renders = static_renders
+        self._mtimes = self._scan_mtimes()
+
+    def _scan_mtimes(self) -> dict[str, tuple[int, int]]:
+        mtimes = {}
+        for path in self.template_dir.rglob('*.md'):
+            stat = path.stat()
+            mtimes[str(path)] = (stat.st_mtime_ns, stat.st_size)
+        return mtimes
+
+    def reload(self):
+        """Recompile all templates from disk."""
+        self.env.cache.clear()
+        self._compile_all()
+
+    def start_watching(self, interval: float = PROMPT_RELOAD_INTERVAL_SECONDS):
+        """Poll the template directory and reload when a file changes."""
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), daemon=True
         )
+        self._watcher.start()
+
+    def stop_watching(self):
+        if self._watcher is None:
+            return
+        self._stop_watching.set()
+        self._watcher.join()
+        self._watcher = None
+
+    def _watch(self, interval: float):
+        while not self._stop_watching.wait(interval):
+            try:
+                mtimes = self._scan_mtimes()
+                if mtimes != self._mtimes:
+                    self._mtimes = mtimes
+                    self.reload()
+                    logger.info(f'prompt templates reloaded from {self.template_dir}')
+            except Exception as e:
+                # Keep the previous templates if the edited file does not compile
+                logger.warning(f'failed to reload prompt templates: {e}')
 
     def render(self, template_name: str, **kwargs) -> str:
         """Render a template with the given context."""
@@ -39,9 +120,15 @@ class PromptRenderer:
         if not template_name.endswith('.md'):
             template_name += '.md'
 
-        template = self.env.get_template(template_name)
+        static = self._static_renders.get(template_name)
+        if static is not None:
+            return static
+
+        template = self._templates.get(template_name)
+        if template is None:
+            template = self.env.get_template(template_name)
         return template.render(**kwargs)
 
 
 # Global renderer instance
-renderer = PromptRenderer()
+renderer = PromptRenderer(watch=PROMPT_RELOAD)
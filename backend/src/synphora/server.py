@@ -1,17 +1,51 @@
+from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Literal
 
-from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 
-from synphora.agent import AgentRequest, generate_agent_response
+from synphora.agent import (
+    AgentRequest,
+    agent_graph_registry,
+    generate_agent_response,
+)
 from synphora.artifact_manager import artifact_manager
-from synphora.llm import create_llm_client
-from synphora.models import ArtifactData, ArtifactRole, ArtifactType
+from synphora.course import course_manager
+from synphora.course_search import course_search_index
+from synphora.llm import create_llm_client, llm_client_registry
+from synphora.models import (
+    ArtifactData,
+    ArtifactMetadata,
+    ArtifactOrderBy,
+    ArtifactPage,
+    ArtifactRole,
+    ArtifactType,
+)
+from synphora.session_manager import session_manager
+from synphora.session_queue import SessionBusyError, session_run_queue
 from synphora.sse import EventType, SseEvent
+from synphora.sse_coalesce import coalesce_sse_events
+from synphora.upload import UploadError, receive_upload
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """服务启动时预热，避免在请求路径上做一次性的初始化工作"""
+    agent_graph_registry.warm_up()
+    print("🔥 Agent graph compiled")
+    await llm_client_registry.warm_up(tools=agent_graph_registry.tools)
+    print("🔥 LLM clients connected")
+    session_manager.start_sweeper()
+    yield
+    await session_manager.stop_sweeper()
+    session_manager.close()
+    await llm_client_registry.aclose()
 
-app = FastAPI(title="Synphora Agent Server", version="1.0.0")
+
+app = FastAPI(title="Synphora Agent Server", version="1.0.0", lifespan=lifespan)
 
 # 添加 CORS 中间件
 app.add_middleware(
@@ -39,7 +73,10 @@ class CreateArtifactRequest(BaseModel):
 
 
 class ArtifactListResponse(BaseModel):
-    artifacts: list[ArtifactData]
+    # 只含元数据，内容通过 GET /artifacts/{artifact_id} 按需获取
+    artifacts: list[ArtifactMetadata]
+    # 列表版本号，与 ARTIFACT_LIST_UPDATED 事件中的 base_version / version 对应
+    version: int
 
 
 class GenerateSampleArticleRequest(BaseModel):
@@ -54,17 +91,46 @@ async def api_health():
     )
 
 
+@app.get("/stats")
+async def api_stats():
+    """Runtime cache and resource statistics"""
+    return {
+        "course_cache": course_manager.cache_stats(),
+        "course_search": course_search_index.stats(),
+        "sessions": session_manager.memory_stats(),
+        "session_queue": session_run_queue.stats(),
+    }
+
+
 @app.post("/agent")
-async def api_agent(request: AgentRequest):
+async def api_agent(request: AgentRequest, http_request: Request):
     """Streaming agent endpoint"""
 
     print(f'receive /agent request: {request}')
 
+    # 同一会话的请求串行执行，排队过多时直接拒绝
+    try:
+        session_run_queue.check(request.session_id)
+    except SessionBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e)) from e
+
     def format_sse_event(event: SseEvent) -> str:
         return f"data: {event.to_data()}\n\n"
 
     async def generate_sse():
-        async for event in generate_agent_response(request):
+        # 合并逐 token 的文本事件，减少序列化和写帧次数
+        # 客户端断开时停止生成，不再继续消耗 LLM 调用
+        events = coalesce_sse_events(
+            session_run_queue.run(
+                request.session_id,
+                lambda superseded: generate_agent_response(
+                    request,
+                    is_disconnected=http_request.is_disconnected,
+                    superseded=superseded,
+                ),
+            )
+        )
+        async for event in events:
             if event.type not in (
                 EventType.TEXT_MESSAGE,
                 EventType.ARTIFACT_CONTENT_CHUNK,
@@ -83,13 +149,62 @@ async def api_agent(request: AgentRequest):
     )
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match 使用弱比较：忽略 W/ 前缀"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return any(
+        tag.strip().removeprefix('W/') == etag for tag in if_none_match.split(',')
+    )
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(
+        status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"}
+    )
+
+
 @app.get("/artifacts", response_model=ArtifactListResponse)
-async def get_artifacts():
-    """Get all artifacts"""
+async def get_artifacts(request: Request, response: Response):
+    """Get metadata of all artifacts (no content)"""
     print("📋 Starting get_artifacts operation")
-    artifacts = artifact_manager.list_artifacts()
+    # 在读取之前取版本号和 ETag：读取期间发生的修改会让客户端下次请求时重新获取
+    version = artifact_manager.get_list_version()
+    etag = artifact_manager.get_list_etag()
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        print("✅ get_artifacts not modified")
+        return _not_modified(etag)
+
+    artifacts = artifact_manager.list_artifact_metadata()
     print(f"✅ get_artifacts completed, found {len(artifacts)} artifacts")
-    return ArtifactListResponse(artifacts=artifacts)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return ArtifactListResponse(artifacts=artifacts, version=version)
+
+
+@app.get("/artifacts/query", response_model=ArtifactPage)
+async def query_artifacts(
+    type: ArtifactType | None = None,
+    role: ArtifactRole | None = None,
+    order_by: ArtifactOrderBy = ArtifactOrderBy.CREATED_AT,
+    order: Literal["asc", "desc"] = "desc",
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+):
+    """Query artifact metadata with filters and cursor pagination (no content)"""
+    try:
+        return artifact_manager.query_artifacts(
+            artifact_type=type,
+            role=role,
+            order_by=order_by,
+            descending=order == "desc",
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @app.post("/artifacts", response_model=ArtifactData)
@@ -107,40 +222,68 @@ async def create_artifact(request: CreateArtifactRequest):
     return artifact
 
 
-@app.post("/artifacts/upload", response_model=ArtifactData)
-async def upload_artifact(file: UploadFile = File(...)):
-    """Upload a file as an artifact"""
-    print(f"📤 Starting upload_artifact operation for file '{file.filename}'")
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="No file provided")
-
-    content = await file.read()
-    content_str = content.decode('utf-8')
-
-    artifact = artifact_manager.create_artifact(
-        title=file.filename,
-        content=content_str,
+@app.post("/artifacts/upload", response_model=ArtifactMetadata)
+async def upload_artifact(request: Request):
+    """Upload a file (multipart field `file`) as an artifact, streaming it to disk"""
+    print("📤 Starting upload_artifact operation")
+    try:
+        upload = await receive_upload(request, artifact_manager.new_temp_file)
+    except UploadError as e:
+        print(f"❌ upload_artifact failed: {e}")
+        raise HTTPException(status_code=e.status_code, detail=str(e)) from e
+
+    artifact = artifact_manager.create_artifact_from_file(
+        upload.path,
+        title=upload.filename,
         role=ArtifactRole.USER,
         artifact_type=ArtifactType.OTHER,
     )
     print(
-        f"✅ upload_artifact completed, file '{file.filename}' saved as artifact ID: {artifact.id}"
+        f"✅ upload_artifact completed, file '{upload.filename}' ({upload.size} bytes) saved as artifact ID: {artifact.id}"
     )
     return artifact
 
 
 @app.get("/artifacts/{artifact_id}", response_model=ArtifactData)
-async def get_artifact(artifact_id: str):
+async def get_artifact(artifact_id: str, request: Request, response: Response):
     """Get a specific artifact by ID"""
     print(f"🔍 Starting get_artifact operation for ID '{artifact_id}'")
+    # 先确认 artifact 及其内容文件存在，再做条件请求的比较，内容文件丢失时返回 404 而不是 304
+    if artifact_manager.get_artifact_content_path(artifact_id) is None:
+        print(f"❌ get_artifact failed, artifact ID '{artifact_id}' not found")
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    etag = artifact_manager.get_artifact_etag(artifact_id)
+    if etag is not None and _etag_matches(request.headers.get("if-none-match"), etag):
+        print(f"✅ get_artifact not modified, artifact ID '{artifact_id}'")
+        return _not_modified(etag)
+
     artifact = artifact_manager.get_artifact(artifact_id)
     if not artifact:
         print(f"❌ get_artifact failed, artifact ID '{artifact_id}' not found")
         raise HTTPException(status_code=404, detail="Artifact not found")
     print(f"✅ get_artifact completed, found artifact '{artifact.title}'")
+    if etag is not None:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
     return artifact
 
 
+@app.api_route("/artifacts/{artifact_id}/content", methods=["GET", "HEAD"])
+async def get_artifact_content(artifact_id: str):
+    """
+    Stream the raw content of an artifact from disk.
+
+    Supports HTTP Range requests (single and multiple ranges, If-Range), so large
+    artifacts can be fetched progressively. Metadata stays on GET /artifacts/{artifact_id}.
+    """
+    print(f"🔍 Starting get_artifact_content operation for ID '{artifact_id}'")
+    path = artifact_manager.get_artifact_content_path(artifact_id)
+    if path is None:
+        print(f"❌ get_artifact_content failed, artifact ID '{artifact_id}' not found")
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return FileResponse(path, media_type="text/plain; charset=utf-8")
+
+
 @app.delete("/artifacts/{artifact_id}")
 async def delete_artifact(artifact_id: str):
     """Delete an artifact"""
@@ -1,8 +1,53 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
 
 from langchain_core.messages import BaseMessage
 from pydantic import BaseModel
 
+from synphora.session_store import SessionStore, create_session_store
+
+logger = logging.getLogger(__name__)
+
+# 会话数量上限
+SESSION_MAX_COUNT = int(os.getenv('SYNPHORA_SESSION_MAX_COUNT', '1000'))
+# 会话空闲超过该时间后被清理
+SESSION_IDLE_TTL_SECONDS = int(os.getenv('SYNPHORA_SESSION_IDLE_TTL_SECONDS', '7200'))
+# 所有会话消息的估算内存上限
+SESSION_MAX_BYTES = int(os.getenv('SYNPHORA_SESSION_MAX_BYTES', str(512 * 1024 * 1024)))
+# 后台清理的间隔
+SESSION_SWEEP_INTERVAL_SECONDS = 60
+
+# 每条消息对象本身（pydantic 模型、字典等）的估算开销
+MESSAGE_OVERHEAD_BYTES = 1024
+
+
+def estimate_message_bytes(message: BaseMessage) -> int:
+    """估算一条消息占用的内存（字节），用于会话内存统计和淘汰"""
+    size = MESSAGE_OVERHEAD_BYTES
+    content = message.content
+    if isinstance(content, str):
+        size += sys.getsizeof(content)
+    else:
+        for block in content:
+            text = block if isinstance(block, str) else block.get("text", "")
+            size += sys.getsizeof(text)
+
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        size += len(json.dumps(tool_call.get("args", {}), ensure_ascii=False))
+    return size
+
+
+def estimate_messages_bytes(messages: list[BaseMessage]) -> int:
+    return sum(estimate_message_bytes(message) for message in messages)
+
 
 class Session(BaseModel):
     """对话会话模型"""
@@ -11,37 +56,151 @@ class Session(BaseModel):
     messages: list[BaseMessage]  # 直接存储 BaseMessage 对象
     created_at: datetime
     updated_at: datetime
+    last_accessed_at: datetime
+    approx_bytes: int = 0
+    # 已经写入存储后端的消息数量
+    stored_count: int = 0
 
     def get_messages(self) -> list[BaseMessage]:
         """获取会话中的所有消息"""
         return self.messages
 
-    def set_messages(self, messages: list[BaseMessage]) -> None:
-        """批量设置会话消息（用于 agent 运行结束后统一保存）"""
+    def estimate_bytes(self, messages: list[BaseMessage], keep: int = 0) -> int:
+        """估算把会话消息替换为 messages 后的内存
+
+        keep 为新消息列表中与原消息相同的前缀长度，这部分不再重新估算内存。
+        """
+        if keep == len(self.messages):
+            prefix_bytes = self.approx_bytes
+        else:
+            prefix_bytes = estimate_messages_bytes(messages[:keep])
+        return prefix_bytes + estimate_messages_bytes(messages[keep:])
+
+    def set_messages(
+        self,
+        messages: list[BaseMessage],
+        approx_bytes: int,
+        updated_at: datetime | None = None,
+    ) -> None:
+        """批量设置会话消息（用于 agent 运行结束后统一保存），approx_bytes 由 estimate_bytes 算出"""
         self.messages = messages
-        self.updated_at = datetime.now()
+        self.approx_bytes = approx_bytes
+        self.updated_at = updated_at or datetime.now()
+        self.last_accessed_at = self.updated_at
 
 
 class SessionManager:
-    """会话管理器 - 基于内存的实现"""
+    """
+    会话管理器
+
+    内存中的会话按最近访问顺序保存，超过数量上限或估算内存上限时淘汰最久未访问的会话，
+    空闲超过 TTL 的会话由后台任务定期清理。
+    会话同时写入存储后端（SessionStore），内存缓存未命中时从后端加载历史；
+    使用默认的内存后端时，被淘汰的会话不再保留。
+
+    _lock 只保护内存中的会话缓存和内存统计，持有时间很短，事件循环中也可以直接获取；
+    存储后端的读写和消息的序列化、内存估算在 _lock 之外进行，由每个会话各自的锁串行化，
+    一个会话的慢速读写不会阻塞其他会话。
+    """
 
-    def __init__(self):
-        self._sessions: dict[str, Session] = {}
+    def __init__(
+        self,
+        max_sessions: int = SESSION_MAX_COUNT,
+        idle_ttl_seconds: int = SESSION_IDLE_TTL_SECONDS,
+        max_bytes: int = SESSION_MAX_BYTES,
+        store: SessionStore | None = None,
+    ):
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_bytes = max_bytes
+        self.store = store if store is not None else create_session_store()
+
+        self._sessions: OrderedDict[str, Session] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        # session_id -> [会话 I/O 锁, 等待或持有该锁的线程数]，没有线程使用时移除
+        self._io_locks: dict[str, list] = {}
+        self._sweeper: asyncio.Task | None = None
+        self.evicted_count = 0
+
+    @contextmanager
+    def _session_io(self, session_id: str) -> Iterator[None]:
+        """串行化同一会话的存储后端读写，不同会话之间互不阻塞"""
+        with self._lock:
+            entry = self._io_locks.get(session_id)
+            if entry is None:
+                entry = self._io_locks[session_id] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._io_locks[session_id]
 
     def create_session(self, session_id: str) -> Session:
         """使用指定ID创建新会话"""
+        with self._session_io(session_id):
+            return self._create_session(session_id)
+
+    def _create_session(self, session_id: str) -> Session:
+        # 调用方已持有该会话的 I/O 锁
         now = datetime.now()
         session = Session(
-            session_id=session_id, messages=[], created_at=now, updated_at=now
+            session_id=session_id,
+            messages=[],
+            created_at=now,
+            updated_at=now,
+            last_accessed_at=now,
+        )
+        self.store.create(session_id, now)
+        with self._lock:
+            self._cache(session)
+        return session
+
+    def _cache(self, session: Session):
+        # 调用方已持有 self._lock
+        old = self._sessions.pop(session.session_id, None)
+        if old is not None:
+            self._total_bytes -= old.approx_bytes
+        self._sessions[session.session_id] = session
+        self._total_bytes += session.approx_bytes
+        self._evict(keep=session.session_id)
+
+    def _load(self, session_id: str) -> Session | None:
+        """从存储后端加载会话到内存缓存"""
+        # 调用方已持有该会话的 I/O 锁；等待 I/O 锁期间其他线程可能已经加载了该会话
+        with self._lock:
+            if session_id in self._sessions:
+                return self._touch(session_id)
+        stored = self.store.load(session_id)
+        if stored is None:
+            return None
+        session = Session(
+            session_id=session_id,
+            messages=stored.messages,
+            created_at=stored.created_at,
+            updated_at=stored.updated_at,
+            last_accessed_at=datetime.now(),
+            approx_bytes=estimate_messages_bytes(stored.messages),
+            stored_count=len(stored.messages),
         )
-        self._sessions[session_id] = session
+        with self._lock:
+            self._cache(session)
         return session
 
     def get_session(self, session_id: str) -> Session | None:
         """获取会话"""
-        if session_id not in self._sessions:
+        with self._lock:
+            if session_id in self._sessions:
+                return self._touch(session_id)
+        with self._session_io(session_id):
+            session = self._load(session_id)
+        if session is None:
             raise ValueError(f'session {session_id} not found')
-        return self._sessions[session_id]
+        return session
 
     def get_or_create_session(self, session_id: str) -> tuple[Session, bool]:
         """获取现有会话或创建新会话
@@ -49,16 +208,152 @@ class SessionManager:
             session: 会话对象
             is_created: 是否创建新会话
         """
-        if session_id not in self._sessions:
-            return self.create_session(session_id), True
-        return self._sessions[session_id], False
+        with self._lock:
+            if session_id in self._sessions:
+                return self._touch(session_id), False
+        with self._session_io(session_id):
+            return self._get_or_create_session(session_id)
+
+    def _get_or_create_session(self, session_id: str) -> tuple[Session, bool]:
+        # 调用方已持有该会话的 I/O 锁
+        session = self._load(session_id)
+        if session is not None:
+            return session, False
+        return self._create_session(session_id), True
+
+    async def aget_or_create_session(self, session_id: str) -> tuple[Session, bool]:
+        """get_or_create_session 的异步版本：缓存未命中时在线程中访问存储后端，不阻塞事件循环"""
+        with self._lock:
+            if session_id in self._sessions:
+                return self._touch(session_id), False
+        return await asyncio.to_thread(self.get_or_create_session, session_id)
+
+    async def aset_session_messages(
+        self, session_id: str, messages: list[BaseMessage]
+    ) -> None:
+        """set_session_messages 的异步版本：在线程中写入存储后端，不阻塞事件循环"""
+        await asyncio.to_thread(self.set_session_messages, session_id, messages)
 
     def set_session_messages(
         self, session_id: str, messages: list[BaseMessage]
     ) -> None:
-        """更新会话消息（用于 agent 运行结束后统一保存）"""
-        session = self.get_session(session_id)
-        session.set_messages(messages)
+        """更新会话消息（用于 agent 运行结束后统一保存）
+
+        messages 以会话已有的消息为前缀，只有本轮新增的消息会写入存储后端。
+        """
+        with self._session_io(session_id):
+            # 运行期间会话可能已从内存中淘汰，此时重新加载或创建
+            session, _ = self._get_or_create_session(session_id)
+            start = min(session.stored_count, len(messages))
+            approx_bytes = session.estimate_bytes(messages, keep=start)
+            updated_at = datetime.now()
+            self.store.append(session_id, start, messages[start:], updated_at)
+
+            with self._lock:
+                # 写入期间会话可能已被淘汰，重新放回缓存
+                if self._sessions.get(session_id) is session:
+                    self._sessions.pop(session_id)
+                    self._total_bytes -= session.approx_bytes
+                session.set_messages(messages, approx_bytes, updated_at)
+                session.stored_count = len(messages)
+                self._cache(session)
+
+    def _touch(self, session_id: str) -> Session:
+        # 调用方已持有 self._lock
+        session = self._sessions[session_id]
+        session.last_accessed_at = datetime.now()
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def _remove(self, session_id: str):
+        # 调用方已持有 self._lock
+        session = self._sessions.pop(session_id)
+        self._total_bytes -= session.approx_bytes
+        self.evicted_count += 1
+
+    def _evict(self, keep: str | None = None):
+        """淘汰空闲超时的会话，再按 LRU 淘汰直到满足数量和内存上限"""
+        # 调用方已持有 self._lock
+        self.evict_idle()
+        while (
+            len(self._sessions) > self.max_sessions
+            or self._total_bytes > self.max_bytes
+        ):
+            session_id = next(iter(self._sessions))
+            if session_id == keep:
+                # 只剩当前会话时，即使超出上限也保留
+                break
+            logger.info(f'evict session {session_id} (lru)')
+            self._remove(session_id)
+
+    def evict_idle(self) -> int:
+        """清理空闲超过 TTL 的会话，返回清理的数量"""
+        now = datetime.now()
+        evicted = 0
+        with self._lock:
+            # 按最近访问顺序排列，遇到第一个未超时的会话即可停止
+            while self._sessions:
+                session_id, session = next(iter(self._sessions.items()))
+                idle = (now - session.last_accessed_at).total_seconds()
+                if idle <= self.idle_ttl_seconds:
+                    break
+                logger.info(f'evict session {session_id} (idle {idle:.0f}s)')
+                self._remove(session_id)
+                evicted += 1
+        return evicted
+
+    def get_session_bytes(self, session_id: str) -> int:
+        """获取单个会话的估算内存（字节）"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            return session.approx_bytes if session else 0
+
+    def memory_stats(self, top: int = 10) -> dict:
+        """会话内存统计：总量及占用最大的若干个会话"""
+        with self._lock:
+            largest = sorted(
+                self._sessions.values(), key=lambda s: s.approx_bytes, reverse=True
+            )[:top]
+            return {
+                "sessions": len(self._sessions),
+                "total_bytes": self._total_bytes,
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+                "evicted": self.evicted_count,
+                "largest": [
+                    {
+                        "session_id": s.session_id,
+                        "messages": len(s.messages),
+                        "bytes": s.approx_bytes,
+                    }
+                    for s in largest
+                ],
+            }
+
+    async def _sweep_forever(self, interval_seconds: float):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            self.evict_idle()
+
+    def start_sweeper(
+        self, interval_seconds: float = SESSION_SWEEP_INTERVAL_SECONDS
+    ) -> None:
+        """在当前事件循环中启动后台清理任务"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_forever(interval_seconds))
+
+    def close(self) -> None:
+        """关闭存储后端"""
+        self.store.close()
+
+    async def stop_sweeper(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
 
 
 # 全局会话管理器实例
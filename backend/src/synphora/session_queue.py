@@ -0,0 +1,150 @@
+import asyncio
+import os
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+
+from synphora.sse import RunFinishedEvent, RunFinishedReason, SseEvent
+
+# 每个会话最多排队等待的请求数（不包括正在运行的请求）
+SESSION_MAX_QUEUE_DEPTH = int(os.getenv('SYNPHORA_SESSION_MAX_QUEUE_DEPTH', '2'))
+# 为 true 时，同一会话的新请求会取消之前的运行，而不是排队等待
+SESSION_SUPERSEDE = os.getenv('SYNPHORA_SESSION_SUPERSEDE') == 'true'
+# 统计等待时间分位数时保留的最近样本数
+WAIT_SAMPLES = 1000
+
+
+class SessionBusyError(Exception):
+    """会话的等待队列已满"""
+
+
+class _SessionSlot:
+    """一个会话的运行队列：asyncio.Lock 按 FIFO 顺序唤醒等待者"""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        # 正在运行和排队等待的请求，按到达顺序排列，值为各自的取消信号
+        self.runs: list[asyncio.Event] = []
+
+    @property
+    def waiting(self) -> int:
+        return len(self.runs) - (1 if self.lock.locked() else 0)
+
+
+class SessionRunQueue:
+    """
+    同一会话的 /agent 请求串行执行。
+
+    请求按到达顺序依次运行，每个请求都基于上一个请求保存的会话历史；排队的请求超过
+    max_queue_depth 时直接拒绝。supersede 模式下新请求会取消同一会话中正在运行和排队的请求。
+    """
+
+    def __init__(
+        self,
+        max_queue_depth: int = SESSION_MAX_QUEUE_DEPTH,
+        supersede: bool = SESSION_SUPERSEDE,
+    ):
+        self.max_queue_depth = max_queue_depth
+        self.supersede = supersede
+        self._slots: dict[str, _SessionSlot] = {}
+
+        self.rejected_count = 0
+        self.superseded_count = 0
+        self._wait_count = 0
+        self._wait_total_seconds = 0.0
+        self._wait_max_seconds = 0.0
+        self._wait_samples: deque[float] = deque(maxlen=WAIT_SAMPLES)
+
+    def check(self, session_id: str) -> None:
+        """在开始流式响应之前检查队列是否已满，已满时抛出 SessionBusyError"""
+        if self.supersede:
+            return
+        slot = self._slots.get(session_id)
+        if slot is not None and slot.waiting >= self.max_queue_depth:
+            self.rejected_count += 1
+            raise SessionBusyError(
+                f'session {session_id} already has {slot.waiting} queued requests'
+            )
+
+    async def run(
+        self,
+        session_id: str,
+        make_events: Callable[[asyncio.Event], AsyncIterator[SseEvent]],
+    ) -> AsyncIterator[SseEvent]:
+        """
+        轮到当前请求时调用 make_events(superseded) 并转发其事件。
+        superseded 在当前请求被更新的请求取代时被设置，make_events 需要据此停止运行。
+        """
+        slot = self._slots.get(session_id)
+        if slot is None:
+            slot = self._slots[session_id] = _SessionSlot()
+
+        if self.supersede:
+            for superseded in slot.runs:
+                if not superseded.is_set():
+                    superseded.set()
+                    self.superseded_count += 1
+        elif slot.waiting >= self.max_queue_depth:
+            # check 之后、流式响应开始之前有其他请求进入了队列
+            self.rejected_count += 1
+            yield RunFinishedEvent.new(
+                reason=RunFinishedReason.SESSION_BUSY,
+                message='当前会话还有未完成的请求，请稍后再试。',
+            )
+            return
+
+        superseded = asyncio.Event()
+        slot.runs.append(superseded)
+        loop = asyncio.get_running_loop()
+        wait_start = loop.time()
+        try:
+            async with slot.lock:
+                self._record_wait(loop.time() - wait_start)
+                if superseded.is_set():
+                    yield RunFinishedEvent.new(
+                        reason=RunFinishedReason.SUPERSEDED,
+                        message='已被同一会话中更新的请求取代。',
+                    )
+                    return
+                async for event in make_events(superseded):
+                    yield event
+        finally:
+            slot.runs.remove(superseded)
+            if not slot.runs:
+                self._slots.pop(session_id, None)
+
+    def _record_wait(self, seconds: float):
+        self._wait_count += 1
+        self._wait_total_seconds += seconds
+        self._wait_max_seconds = max(self._wait_max_seconds, seconds)
+        self._wait_samples.append(seconds)
+
+    def stats(self) -> dict:
+        """等待时间等统计信息，单位为毫秒"""
+        samples = sorted(self._wait_samples)
+
+        def percentile(p: float) -> float:
+            if not samples:
+                return 0.0
+            return samples[min(int(len(samples) * p), len(samples) - 1)] * 1000
+
+        return {
+            "active_sessions": len(self._slots),
+            "waiting": sum(slot.waiting for slot in self._slots.values()),
+            "max_queue_depth": self.max_queue_depth,
+            "supersede": self.supersede,
+            "rejected": self.rejected_count,
+            "superseded": self.superseded_count,
+            "lock_wait": {
+                "count": self._wait_count,
+                "avg_ms": self._wait_total_seconds / self._wait_count * 1000
+                if self._wait_count
+                else 0.0,
+                "max_ms": self._wait_max_seconds * 1000,
+                "p50_ms": percentile(0.5),
+                "p95_ms": percentile(0.95),
+            },
+        }
+
+
+# 全局会话运行队列实例
+session_run_queue = SessionRunQueue()
@@ -0,0 +1,192 @@
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from pydantic import BaseModel
+
+# 会话存储后端：memory（仅内存，重启后丢失）或 sqlite
+SESSION_BACKEND = os.getenv('SYNPHORA_SESSION_BACKEND', 'memory')
+# sqlite 后端的数据库文件路径
+SESSION_DB_PATH = os.getenv('SYNPHORA_SESSION_DB_PATH', 'sessions.db')
+
+
+class StoredSession(BaseModel):
+    """从存储后端加载的会话"""
+
+    session_id: str
+    messages: list[BaseMessage]
+    created_at: datetime
+    updated_at: datetime
+
+
+def dump_message(message: BaseMessage) -> str:
+    """序列化一条消息，格式与 langchain 的 message_to_dict 一致"""
+    return json.dumps(message_to_dict(message), ensure_ascii=False, default=str)
+
+
+def load_messages(rows: list[str]) -> list[BaseMessage]:
+    return messages_from_dict([json.loads(row) for row in rows])
+
+
+class SessionStore(ABC):
+    """
+    会话持久化后端的接口。
+
+    SessionManager 在内存中缓存会话，只在缓存未命中时调用 load 加载历史，
+    每轮对话结束后调用 append 写入本轮新增的消息。
+    方法是同步阻塞的，异步路径中由 SessionManager 放到线程中调用。
+    """
+
+    @abstractmethod
+    def load(self, session_id: str) -> StoredSession | None:
+        """加载会话，不存在时返回 None"""
+
+    @abstractmethod
+    def create(self, session_id: str, created_at: datetime) -> None:
+        pass
+
+    @abstractmethod
+    def append(
+        self,
+        session_id: str,
+        start: int,
+        messages: list[BaseMessage],
+        updated_at: datetime,
+    ) -> None:
+        """从下标 start 开始写入消息，覆盖 start 之后已有的消息"""
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """不做持久化：会话只存在于 SessionManager 的内存缓存中"""
+
+    def load(self, session_id: str) -> StoredSession | None:
+        return None
+
+    def create(self, session_id: str, created_at: datetime) -> None:
+        pass
+
+    def append(
+        self,
+        session_id: str,
+        start: int,
+        messages: list[BaseMessage],
+        updated_at: datetime,
+    ) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    基于 SQLite（WAL 模式）的会话存储。
+
+    每条消息一行，以 (session_id, seq) 为主键，每轮对话只插入新增的消息，
+    写入开销与历史长度无关。
+    """
+
+    def __init__(self, db_path: str | Path = SESSION_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        # WAL 模式下 NORMAL 在进程崩溃时不会丢数据，只有断电可能丢失最后的事务
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS messages (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            ) WITHOUT ROWID;
+            """
+        )
+
+    def load(self, session_id: str) -> StoredSession | None:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT created_at, updated_at FROM sessions WHERE session_id = ?',
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            rows = self._conn.execute(
+                'SELECT data FROM messages WHERE session_id = ? ORDER BY seq',
+                (session_id,),
+            ).fetchall()
+        return StoredSession(
+            session_id=session_id,
+            messages=load_messages([data for (data,) in rows]),
+            created_at=datetime.fromisoformat(row[0]),
+            updated_at=datetime.fromisoformat(row[1]),
+        )
+
+    def create(self, session_id: str, created_at: datetime) -> None:
+        timestamp = created_at.isoformat()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR IGNORE INTO sessions VALUES (?, ?, ?)',
+                (session_id, timestamp, timestamp),
+            )
+
+    def append(
+        self,
+        session_id: str,
+        start: int,
+        messages: list[BaseMessage],
+        updated_at: datetime,
+    ) -> None:
+        rows = [
+            (session_id, start + i, dump_message(message))
+            for i, message in enumerate(messages)
+        ]
+        timestamp = updated_at.isoformat()
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.execute(
+                    'INSERT INTO sessions VALUES (?, ?, ?) '
+                    'ON CONFLICT(session_id) DO UPDATE SET updated_at = excluded.updated_at',
+                    (session_id, timestamp, timestamp),
+                )
+                self._conn.execute(
+                    'DELETE FROM messages WHERE session_id = ? AND seq >= ?',
+                    (session_id, start),
+                )
+                self._conn.executemany('INSERT INTO messages VALUES (?, ?, ?)', rows)
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_session_store(backend: str = SESSION_BACKEND) -> SessionStore:
+    """根据配置创建会话存储后端"""
+    if backend == 'memory':
+        return MemorySessionStore()
+    if backend == 'sqlite':
+        return SqliteSessionStore(SESSION_DB_PATH)
+    raise ValueError(f'Unknown session backend: {backend}')
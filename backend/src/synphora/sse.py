@@ -2,6 +2,8 @@ from enum import Enum
 
 from pydantic import BaseModel
 
+from synphora.models import ArtifactListDelta
+
 
 class EventType(Enum):
     RUN_STARTED = "RUN_STARTED"
@@ -31,13 +33,33 @@ class RunStartedEvent(SseEvent):
         return cls()
 
 
+class RunFinishedReason(str, Enum):
+    """运行提前结束的原因，正常完成时不携带"""
+
+    TIMEOUT = "timeout"
+    CLIENT_DISCONNECTED = "client_disconnected"
+    SUPERSEDED = "superseded"
+    SESSION_BUSY = "session_busy"
+
+
+class RunFinishedData(BaseModel):
+    reason: RunFinishedReason
+    message: str
+
+
 class RunFinishedEvent(SseEvent):
-    def __init__(self):
-        super().__init__(type=EventType.RUN_FINISHED)
+    data: RunFinishedData | None = None
+
+    def __init__(self, **kwargs):
+        super().__init__(type=EventType.RUN_FINISHED, **kwargs)
 
     @classmethod
-    def new(cls) -> "RunFinishedEvent":
-        return cls()
+    def new(
+        cls, reason: RunFinishedReason | None = None, message: str = ""
+    ) -> "RunFinishedEvent":
+        if reason is None:
+            return cls()
+        return cls(data=RunFinishedData(reason=reason, message=message))
 
 
 class TextMessageData(BaseModel):
@@ -57,12 +79,14 @@ class TextMessageEvent(SseEvent):
 
 
 class ArtifactListUpdatedEvent(SseEvent):
+    data: ArtifactListDelta | None = None
+
     def __init__(self, **kwargs):
         super().__init__(type=EventType.ARTIFACT_LIST_UPDATED, **kwargs)
 
     @classmethod
-    def new(cls) -> "ArtifactListUpdatedEvent":
-        return cls()
+    def new(cls, delta: ArtifactListDelta | None = None) -> "ArtifactListUpdatedEvent":
+        return cls(data=delta)
 
 
 class ArtifactContentStartData(BaseModel):
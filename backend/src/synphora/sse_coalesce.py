@@ -0,0 +1,131 @@
+import asyncio
+import os
+from collections import deque
+from collections.abc import AsyncIterator
+
+from synphora.sse import EventType, SseEvent, TextMessageEvent
+
+# 文本事件合并窗口（毫秒），0 表示不合并
+SSE_FLUSH_INTERVAL_MS = int(os.getenv('SYNPHORA_SSE_FLUSH_INTERVAL_MS', '30'))
+# 单帧文本的最大字符数，达到后立即发送
+SSE_FLUSH_MAX_CHARS = int(os.getenv('SYNPHORA_SSE_FLUSH_MAX_CHARS', '2048'))
+# 缓冲区中最多保存的（合并后的）事件数，达到后上游等待客户端读取
+SSE_BUFFER_MAX_EVENTS = int(os.getenv('SYNPHORA_SSE_BUFFER_MAX_EVENTS', '64'))
+
+
+class _TextRun:
+    """缓冲区中同一 message_id 的连续文本，追加分片时原地合并"""
+
+    __slots__ = ('message_id', 'parts', 'size')
+
+    def __init__(self, message_id: str):
+        self.message_id = message_id
+        self.parts: list[str] = []
+        self.size = 0
+
+    def to_event(self) -> TextMessageEvent:
+        return TextMessageEvent.new(
+            message_id=self.message_id, content="".join(self.parts)
+        )
+
+
+async def coalesce_sse_events(
+    events: AsyncIterator[SseEvent],
+    flush_interval_ms: int = SSE_FLUSH_INTERVAL_MS,
+    max_chars: int = SSE_FLUSH_MAX_CHARS,
+    max_events: int = SSE_BUFFER_MAX_EVENTS,
+) -> AsyncIterator[SseEvent]:
+    """
+    把同一 message_id 的连续 TEXT_MESSAGE 事件合并成一个事件。
+
+    上游事件由后台任务读入缓冲区，连续文本在缓冲区中原地合并，缓冲区中只有文本时最多等待
+    flush_interval_ms 再统一发送；出现其他类型的事件、文本累积达到 max_chars 或上游结束时立即发送。
+    缓冲区中的文本达到 max_chars 或事件数达到 max_events 时，后台任务等待客户端读取后再继续读取上游，
+    客户端读取缓慢时反压传递到上游。
+    """
+    if flush_interval_ms <= 0:
+        async for event in events:
+            yield event
+        return
+
+    flush_interval = flush_interval_ms / 1000
+    buffer: deque[SseEvent | _TextRun] = deque()
+    buffered_chars = 0
+    finished = False
+    error: BaseException | None = None
+    has_events = asyncio.Event()
+    # 需要立即发送：非文本事件、文本超过上限或上游结束
+    flush_now = asyncio.Event()
+    # 缓冲区被取走，后台任务可以继续读取上游
+    has_space = asyncio.Event()
+
+    def is_full() -> bool:
+        return buffered_chars >= max_chars or len(buffer) >= max_events
+
+    def add(event: SseEvent):
+        nonlocal buffered_chars
+        if event.type != EventType.TEXT_MESSAGE:
+            buffer.append(event)
+            flush_now.set()
+            return
+        run = buffer[-1] if buffer else None
+        if (
+            not isinstance(run, _TextRun)
+            or run.message_id != event.data.message_id
+            or run.size >= max_chars
+        ):
+            run = _TextRun(event.data.message_id)
+            buffer.append(run)
+        run.parts.append(event.data.content)
+        run.size += len(event.data.content)
+        buffered_chars += len(event.data.content)
+        if buffered_chars >= max_chars:
+            flush_now.set()
+
+    async def pump():
+        nonlocal finished, error
+        try:
+            async for event in events:
+                add(event)
+                has_events.set()
+                while is_full():
+                    has_space.clear()
+                    await has_space.wait()
+        except Exception as e:
+            error = e
+        finally:
+            finished = True
+            flush_now.set()
+            has_events.set()
+
+    pump_task = asyncio.create_task(pump())
+    try:
+        while True:
+            await has_events.wait()
+            if not flush_now.is_set():
+                try:
+                    await asyncio.wait_for(flush_now.wait(), flush_interval)
+                except TimeoutError:
+                    pass
+
+            has_events.clear()
+            flush_now.clear()
+            batch = list(buffer)
+            buffer.clear()
+            buffered_chars = 0
+            has_space.set()
+
+            for item in batch:
+                yield item.to_event() if isinstance(item, _TextRun) else item
+
+            if finished and not buffer:
+                break
+
+        if error is not None:
+            raise error
+    finally:
+        pump_task.cancel()
+        try:
+            await pump_task
+        except asyncio.CancelledError:
+            pass
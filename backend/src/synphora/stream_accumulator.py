@@ -0,0 +1,129 @@
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.messages.ai import add_usage
+from langchain_core.messages.tool import tool_call_chunk
+from langchain_core.messages.utils import message_chunk_to_message
+from langchain_core.utils._merge import merge_dicts
+
+# LangChain 自动生成的消息 ID 前缀，合并时优先保留供应商给出的 ID
+_LC_ID_PREFIXES = ("lc_", "run-")
+
+
+class _ToolCallBuffer:
+    """单个工具调用的分片缓冲区"""
+
+    def __init__(self, index: int | None):
+        self.index = index
+        self.id: str | None = None
+        self.name_parts: list[str] = []
+        self.args_parts: list[str] = []
+
+    def add(self, chunk: dict):
+        if chunk.get("id") and not self.id:
+            self.id = chunk["id"]
+        if chunk.get("name"):
+            self.name_parts.append(chunk["name"])
+        if chunk.get("args"):
+            self.args_parts.append(chunk["args"])
+
+    def to_chunk(self) -> dict:
+        return tool_call_chunk(
+            name="".join(self.name_parts) or None,
+            args="".join(self.args_parts) or None,
+            id=self.id,
+            index=self.index,
+        )
+
+
+class AIMessageAccumulator:
+    """
+    线性时间的流式分片累加器。
+
+    `chunk1 + chunk2 + ...` 每次相加都会重新拼接整个 content 字符串并重新合并工具调用分片，
+    总开销随 token 数平方增长。累加器把文本片段放进列表缓冲区，工具调用参数按 index 分桶累积，
+    最后一次性拼接得到完整的 AIMessage。
+
+    用法：
+    ```
+    accumulator = AIMessageAccumulator()
+    for chunk in llm.stream(messages):
+        accumulator.add(chunk)
+    ai_message = accumulator.build()
+    ```
+    """
+
+    def __init__(self):
+        self._content_parts: list[str] = []
+        # 非字符串 content（多模态内容块）无法用字符串缓冲区处理，退回 LangChain 的合并逻辑
+        self._fallback: AIMessageChunk | None = None
+        self._tool_calls: dict[int | str, _ToolCallBuffer] = {}
+        self._kwargs_parts: dict[str, list[str]] = {}
+        self._additional_kwargs: dict = {}
+        self._response_metadata: dict = {}
+        self._usage_metadata = None
+        self._id: str | None = None
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, chunk: AIMessageChunk):
+        """累积一个分片"""
+        self._count += 1
+
+        if self._fallback is not None:
+            self._fallback = self._fallback + chunk
+            return
+        if not isinstance(chunk.content, str):
+            self._fallback = self._build_chunk() + chunk
+            return
+
+        if chunk.content:
+            self._content_parts.append(chunk.content)
+
+        for tool_chunk in chunk.tool_call_chunks:
+            index = tool_chunk.get("index")
+            # 没有 index 的分片无法与其他分片合并，单独成为一个工具调用
+            key = index if index is not None else f"_{len(self._tool_calls)}"
+            buffer = self._tool_calls.get(key)
+            if buffer is None:
+                buffer = self._tool_calls[key] = _ToolCallBuffer(index)
+            buffer.add(tool_chunk)
+
+        for key, value in chunk.additional_kwargs.items():
+            # 原始 tool_calls 已由 tool_call_chunks 表示，无需重复合并
+            if key == "tool_calls":
+                continue
+            if isinstance(value, str):
+                self._kwargs_parts.setdefault(key, []).append(value)
+            else:
+                self._additional_kwargs = merge_dicts(
+                    self._additional_kwargs, {key: value}
+                )
+
+        if chunk.response_metadata:
+            self._response_metadata = merge_dicts(
+                self._response_metadata, chunk.response_metadata
+            )
+        if chunk.usage_metadata:
+            self._usage_metadata = add_usage(self._usage_metadata, chunk.usage_metadata)
+        if chunk.id and (self._id is None or self._id.startswith(_LC_ID_PREFIXES)):
+            self._id = chunk.id
+
+    def _build_chunk(self) -> AIMessageChunk:
+        additional_kwargs = dict(self._additional_kwargs)
+        for key, parts in self._kwargs_parts.items():
+            additional_kwargs[key] = "".join(parts)
+
+        return AIMessageChunk(
+            content="".join(self._content_parts),
+            additional_kwargs=additional_kwargs,
+            tool_call_chunks=[b.to_chunk() for b in self._tool_calls.values()],
+            response_metadata=self._response_metadata,
+            usage_metadata=self._usage_metadata,
+            id=self._id,
+        )
+
+    def build(self) -> AIMessage:
+        """一次性拼接所有分片，返回完整的 AIMessage（工具调用参数在此解析）"""
+        chunk = self._fallback if self._fallback is not None else self._build_chunk()
+        return message_chunk_to_message(chunk)
@@ -3,39 +3,45 @@ import json
 from langchain_core.tools import Tool, tool
 
 from synphora.artifact_manager import artifact_manager
-from synphora.course import CourseManager
-from synphora.langgraph_sse import write_sse_event
+from synphora.course import course_manager
+from synphora.course_search import course_search_index
 from synphora.models import ArtifactRole, ArtifactType
-from synphora.sse import ArtifactListUpdatedEvent
 
 
 class AlgorithmTeacherTool:
     """算法辅导员工具类"""
 
-    COURSE_MANAGER = CourseManager()
+    COURSE_MANAGER = course_manager
 
     @classmethod
     def get_tools(cls) -> list[Tool]:
         return [
             cls.list_articles,
             cls.read_article,
+            cls.get_article_outline,
+            cls.read_article_section,
+            cls.search_articles,
             cls.generate_mind_map,
             cls.report_solution_code,
         ]
 
     @staticmethod
     @tool
-    def list_articles(tag: str) -> str:
+    def list_articles(
+        tag: str = '', fields: list[str] | None = None, summary_max_chars: int = 0
+    ) -> str:
         """
         查询文章元信息列表。
         参数：
         - tag: 文章标签，可选取值为："链表", "二叉树", "动态规划"，如果为空，则查询所有文章。
+        - fields: 需要返回的字段，可选 "slug", "title", "tags", "summary"，为空时返回全部字段。artifact_id 总是返回。
+        - summary_max_chars: 摘要的最大字数，超过时截断；为 0 时返回完整摘要。
         返回内容为 JSON 格式，包括文章标题、slug、标签、摘要等。
         """
 
-        courses = AlgorithmTeacherTool.COURSE_MANAGER.list_courses()
-        data = [course.to_data() for course in courses]
-        result = json.dumps(data, ensure_ascii=False)
+        result = AlgorithmTeacherTool.COURSE_MANAGER.list_courses_json(
+            tag, fields, summary_max_chars
+        )
         # print(f'list_articles, result: {result}')
 
         return result
@@ -52,6 +58,49 @@ class AlgorithmTeacherTool:
 
         return content
 
+    @staticmethod
+    @tool
+    def get_article_outline(artifact_id: str) -> str:
+        """
+        根据 artifact_id 获取文章的章节目录，不包含正文。
+        返回内容为 JSON 格式，包括文章标题，以及每个章节的标题、章节路径（path）、字节数和子章节。
+        """
+
+        outline = AlgorithmTeacherTool.COURSE_MANAGER.get_course_outline(artifact_id)
+        return json.dumps(outline.to_data(), ensure_ascii=False)
+
+    @staticmethod
+    @tool
+    def read_article_section(artifact_id: str, section_path: str) -> str:
+        """
+        根据 artifact_id 和章节路径读取文章中的一个章节（包括它的子章节）。
+        section_path 使用 get_article_outline 返回的 path，或 search_articles 返回的 section，
+        例如 "动态规划的解题四步骤 > 步骤一：定义子问题"；只有一个同名章节时也可以只写章节标题。
+        """
+
+        manager = AlgorithmTeacherTool.COURSE_MANAGER
+        content = manager.read_course_section(artifact_id, section_path)
+        if content is None:
+            outline = manager.get_course_outline(artifact_id)
+            paths = [section.path for section in outline.iter_sections()]
+            return f'未找到章节「{section_path}」，可选的章节路径：{json.dumps(paths, ensure_ascii=False)}'
+        return content
+
+    @staticmethod
+    @tool
+    def search_articles(query: str, k: int = 5) -> str:
+        """
+        在所有文章中搜索与 query 相关的段落，按相关度从高到低返回最多 k 个段落（k 最大为 20）。
+        返回内容为 JSON 格式，包括段落所在文章的 artifact_id、文章标题、章节、相关度分数和段落内容。
+        只需要文章中的部分内容时，优先使用本工具，而不是读取整篇文章。
+        """
+
+        hits = course_search_index.search(query, k)
+        result = json.dumps([hit.to_data() for hit in hits], ensure_ascii=False)
+        # print(f'search_articles, query: {query}, hits: {len(hits)}')
+
+        return result
+
     @staticmethod
     @tool
     def generate_mind_map(markdown_content: str) -> str:
@@ -89,7 +138,6 @@ class AlgorithmTeacherTool:
             artifact_type=ArtifactType.MIND_MAP,
             role=ArtifactRole.ASSISTANT,
         )
-        write_sse_event(ArtifactListUpdatedEvent.new())
 
         data = {
             "artifactId": artifact.id,
@@ -126,7 +174,6 @@ class AlgorithmTeacherTool:
             artifact_type=ArtifactType.SOLUTION_CODE,
             role=ArtifactRole.ASSISTANT,
         )
-        write_sse_event(ArtifactListUpdatedEvent.new())
 
         data = {
             "artifactId": artifact.id,
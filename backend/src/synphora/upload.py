@@ -0,0 +1,189 @@
+import codecs
+import os
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+# 上传请求体的大小上限（字节）
+UPLOAD_MAX_BYTES = int(os.getenv('SYNPHORA_UPLOAD_MAX_BYTES', str(10 * 1024 * 1024)))
+# 上传文件的表单字段名
+UPLOAD_FIELD_NAME = 'file'
+
+
+class UploadError(Exception):
+    """上传请求无效"""
+
+    status_code = 400
+
+
+class UploadTooLargeError(UploadError):
+    """上传请求体超过大小上限"""
+
+    status_code = 413
+
+
+@dataclass
+class ReceivedUpload:
+    filename: str
+    # 已写入存储目录的临时文件，由调用方重命名为正式文件
+    path: Path
+    size: int
+
+
+class _UploadReceiver:
+    """
+    python-multipart 的回调：把 file 字段的数据写入临时文件，其他字段忽略。
+
+    解析回调是同步的，在事件循环中执行，不访问文件系统：数据先暂存在 pending 中，
+    由 receive_upload 在线程池中调用 flush 创建临时文件并写入，因此内存中最多只保存一个网络分片的数据。
+    """
+
+    def __init__(self, open_temp_file: Callable[[], Path]):
+        self.open_temp_file = open_temp_file
+        self.filename: str | None = None
+        self.path: Path | None = None
+        self.size = 0
+        self.pending: list[bytes] = []
+        self._file = None
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._header_field = b''
+        self._header_value = b''
+        self._disposition = b''
+        self._in_file_part = False
+
+    def callbacks(self) -> dict:
+        return {
+            'on_part_begin': self.on_part_begin,
+            'on_header_field': self.on_header_field,
+            'on_header_value': self.on_header_value,
+            'on_header_end': self.on_header_end,
+            'on_headers_finished': self.on_headers_finished,
+            'on_part_data': self.on_part_data,
+            'on_part_end': self.on_part_end,
+        }
+
+    def on_part_begin(self):
+        self._disposition = b''
+        self._in_file_part = False
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_field.lower() == b'content-disposition':
+            self._disposition = self._header_value
+        self._header_field = b''
+        self._header_value = b''
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        name = options.get(b'name', b'').decode('utf-8', 'replace')
+        filename = options.get(b'filename')
+        # 只接收第一个 file 字段
+        if name != UPLOAD_FIELD_NAME or filename is None or self.filename is not None:
+            return
+        # 临时文件在第一次 flush 时创建
+        self.filename = filename.decode('utf-8', 'replace')
+        self._in_file_part = True
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if not self._in_file_part:
+            return
+        chunk = data[start:end]
+        try:
+            # 只用于校验 UTF-8，写入文件的是原始字节
+            self._decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            raise UploadError(f'File is not valid UTF-8: {e}') from None
+        self.pending.append(chunk)
+        self.size += len(chunk)
+
+    def on_part_end(self):
+        if self._in_file_part:
+            try:
+                self._decoder.decode(b'', final=True)
+            except UnicodeDecodeError as e:
+                raise UploadError(f'File is not valid UTF-8: {e}') from None
+            self._in_file_part = False
+
+    def flush(self):
+        """在线程池中执行：创建临时文件（只在收到 file 字段后），写入暂存的数据"""
+        if self.filename is not None and self._file is None:
+            self.path = self.open_temp_file()
+            self._file = open(self.path, 'wb')
+        if self._file is not None and self.pending:
+            self._file.write(b''.join(self.pending))
+        self.pending = []
+
+    def close(self, discard: bool = False):
+        """在线程池中执行：关闭临时文件，discard 为 True 时删除临时文件"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if discard and self.path is not None:
+            self.path.unlink(missing_ok=True)
+
+
+async def receive_upload(
+    request: Request,
+    open_temp_file: Callable[[], Path],
+    max_bytes: int | None = None,
+) -> ReceivedUpload:
+    """
+    流式解析 multipart 上传请求，把 file 字段写入 open_temp_file() 返回的临时文件。
+
+    请求体超过 max_bytes 时立即抛出 UploadTooLargeError（声明的 Content-Length 超过上限时
+    不读取请求体）；文件不是合法的 UTF-8 或缺少 file 字段时抛出 UploadError。
+    max_bytes 默认为 UPLOAD_MAX_BYTES。
+    """
+    if max_bytes is None:
+        max_bytes = UPLOAD_MAX_BYTES
+    # 无法解析的 Content-Length 视为未知，只依靠读取请求体时的累计大小限制
+    try:
+        content_length = int(request.headers.get('content-length', ''))
+    except ValueError:
+        content_length = None
+    if content_length is not None and content_length > max_bytes:
+        raise UploadTooLargeError(f'Upload exceeds {max_bytes} bytes')
+
+    content_type, params = parse_options_header(request.headers.get('content-type'))
+    boundary = params.get(b'boundary')
+    if content_type != b'multipart/form-data' or not boundary:
+        raise UploadError('Expected multipart/form-data with a boundary')
+
+    receiver = _UploadReceiver(open_temp_file)
+    parser = MultipartParser(boundary, receiver.callbacks())
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_bytes:
+                raise UploadTooLargeError(f'Upload exceeds {max_bytes} bytes')
+            parser.write(chunk)
+            if receiver.pending:
+                await run_in_threadpool(receiver.flush)
+        parser.finalize()
+        # 空文件没有数据分片，在这里创建临时文件
+        await run_in_threadpool(receiver.flush)
+    except MultipartParseError as e:
+        await run_in_threadpool(receiver.close, True)
+        raise UploadError(f'Malformed multipart body: {e}') from None
+    except BaseException:
+        await run_in_threadpool(receiver.close, True)
+        raise
+
+    if not receiver.filename:
+        await run_in_threadpool(receiver.close, True)
+        raise UploadError('No file provided')
+    await run_in_threadpool(receiver.close)
+    return ReceivedUpload(
+        filename=receiver.filename, path=receiver.path, size=receiver.size
+    )
@@ -0,0 +1,126 @@
+"""
+工具并发执行与超时测试
+"""
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.graph import END, START, StateGraph
+
+from synphora.agent import ActNode, AgentState, ArtifactListNotifier
+from synphora.artifact_manager import artifact_manager
+from synphora.sse import EventType
+
+
+@tool
+def slow_echo(text: str) -> str:
+    """等待 0.3 秒后原样返回"""
+    time.sleep(0.3)
+    return text
+
+
+@tool
+def save_note(text: str) -> str:
+    """创建一个 artifact 并返回其 ID"""
+    return artifact_manager.create_artifact(title="笔记", content=text).id
+
+
+@tool
+def hang(text: str) -> str:
+    """长时间不返回"""
+    time.sleep(2)
+    return text
+
+
+def run_act_node(tool_calls, timeout: float = 1, notifier=None):
+    graph = StateGraph(AgentState)
+    graph.add_node("act", ActNode([slow_echo, save_note, hang], timeout=timeout))
+    graph.add_edge(START, "act")
+    graph.add_edge("act", END)
+    compiled = graph.compile()
+
+    state = {"messages": [AIMessage(content="", tool_calls=tool_calls)]}
+    if notifier is not None:
+        state["artifact_list_notifier"] = notifier
+
+    async def run():
+        events = []
+        final_state = None
+        async for kind, payload in compiled.astream(
+            state, stream_mode=["custom", "values"]
+        ):
+            if kind == "custom":
+                events.append((time.monotonic(), payload["event"]))
+            else:
+                final_state = payload
+        return events, final_state
+
+    return asyncio.run(run())
+
+
+def call(name: str, call_id: str, text: str = "x"):
+    return {"name": name, "args": {"text": text}, "id": call_id}
+
+
+class TestActNode:
+    def test_parallel_tool_calls(self):
+        start = time.monotonic()
+        events, state = run_act_node(
+            [call("slow_echo", "1", "a"), call("slow_echo", "2", "b")]
+        )
+        elapsed = time.monotonic() - start
+
+        results = [m for m in state["messages"] if isinstance(m, ToolMessage)]
+        assert [(m.tool_call_id, m.content) for m in results] == [("1", "a"), ("2", "b")]
+        # 两个调用并发执行，总耗时接近单个调用
+        assert elapsed < 0.55
+
+        types = [event.type for _, event in events]
+        # 两个调用都开始之后才有调用结束
+        assert types == [
+            EventType.TOOL_CALL_START,
+            EventType.TOOL_CALL_START,
+            EventType.TOOL_CALL_END,
+            EventType.TOOL_CALL_END,
+        ]
+
+    def test_tool_timeout(self):
+        start = time.monotonic()
+        events, state = run_act_node(
+            [call("slow_echo", "1"), call("hang", "2")], timeout=0.5
+        )
+        elapsed = time.monotonic() - start
+
+        results = {m.tool_call_id: m for m in state["messages"] if isinstance(m, ToolMessage)}
+        assert results["1"].content == "x"
+        assert results["2"].status == "error"
+        assert "超时" in results["2"].content
+        assert elapsed < 1.5
+
+        end_events = [e for _, e in events if e.type == EventType.TOOL_CALL_END]
+        assert [e.data.tool_call_id for e in end_events] == ["1", "2"]
+
+    def test_unknown_tool(self):
+        events, state = run_act_node([call("missing", "1")])
+
+        result = state["messages"][-1]
+        assert isinstance(result, ToolMessage)
+        assert result.status == "error"
+        assert len(events) == 2
+
+    def test_tool_artifact_updates_list_immediately(self):
+        notifier = ArtifactListNotifier(artifact_manager.get_list_version())
+        events, state = run_act_node([call("save_note", "1")], notifier=notifier)
+
+        artifact_id = state["messages"][-1].content
+        types = [event.type for _, event in events]
+        # 工具结束后立即发送增量，不等到本轮结束
+        assert types == [
+            EventType.TOOL_CALL_START,
+            EventType.TOOL_CALL_END,
+            EventType.ARTIFACT_LIST_UPDATED,
+        ]
+        assert [a.id for a in events[-1][1].data.added] == [artifact_id]
+        assert notifier.take_event() is None
+        artifact_manager.delete_artifact(artifact_id)
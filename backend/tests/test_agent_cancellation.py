@@ -0,0 +1,147 @@
+"""
+Agent 运行超时与取消测试
+"""
+import asyncio
+import time
+import uuid
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from synphora.agent import AgentRequest, generate_agent_response
+from synphora.artifact_manager import artifact_manager
+from synphora.llm import llm_client_registry
+from synphora.session_manager import session_manager
+from synphora.sse import EventType, RunFinishedReason
+
+
+class SlowFakeChatModel(BaseChatModel):
+    """按固定间隔输出 token 的假模型，记录实际输出了多少个 token"""
+
+    tokens: int = 100
+    interval: float = 0.02
+    emitted: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        message = AIMessage(content="x" * self.tokens)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        for _ in range(self.tokens):
+            await asyncio.sleep(self.interval)
+            self.emitted += 1
+            yield ChatGenerationChunk(message=AIMessageChunk(content="x"))
+
+
+def run_agent_with(model, monkeypatch, **kwargs):
+    monkeypatch.setattr(
+        llm_client_registry, "get_client_with_tools", lambda model_key, tools: model
+    )
+    request = AgentRequest(
+        message="什么是动态规划", model_key="fake", session_id=str(uuid.uuid4())
+    )
+
+    async def run():
+        events = [e async for e in generate_agent_response(request, **kwargs)]
+        emitted = model.emitted
+        # 等一会儿，确认模型流已被取消，没有继续输出
+        await asyncio.sleep(0.1)
+        assert model.emitted == emitted
+        return events
+
+    return request, asyncio.run(run())
+
+
+class TestAgentCancellation:
+    def test_completed(self, monkeypatch):
+        model = SlowFakeChatModel(tokens=5, interval=0)
+        request, events = run_agent_with(model, monkeypatch)
+
+        assert events[-1].type == EventType.RUN_FINISHED
+        assert events[-1].data is None
+        session = session_manager.get_session(request.session_id)
+        assert session.get_messages()[-1].content == "xxxxx"
+
+    def test_timeout(self, monkeypatch):
+        model = SlowFakeChatModel(tokens=100, interval=0.02)
+        start = time.monotonic()
+        request, events = run_agent_with(model, monkeypatch, timeout=0.3)
+
+        assert time.monotonic() - start < 1
+        assert model.emitted < 100
+        assert any(e.type == EventType.TEXT_MESSAGE for e in events)
+        assert events[-1].type == EventType.RUN_FINISHED
+        assert events[-1].data.reason == RunFinishedReason.TIMEOUT
+
+        # 中断的回答不保存，用户消息保留在会话中
+        messages = session_manager.get_session(request.session_id).get_messages()
+        assert isinstance(messages[-1], HumanMessage)
+
+    def test_client_disconnected(self, monkeypatch):
+        model = SlowFakeChatModel(tokens=100, interval=0.02)
+        disconnect_at = time.monotonic() + 0.2
+
+        async def is_disconnected():
+            return time.monotonic() >= disconnect_at
+
+        monkeypatch.setattr(
+            "synphora.agent.DISCONNECT_POLL_INTERVAL_SECONDS", 0.05
+        )
+        _, events = run_agent_with(model, monkeypatch, is_disconnected=is_disconnected)
+
+        assert model.emitted < 100
+        assert events[-1].type == EventType.RUN_FINISHED
+        assert events[-1].data.reason == RunFinishedReason.CLIENT_DISCONNECTED
+
+    def test_timeout_cancels_citation_tasks(self, monkeypatch):
+        class CitingModel(SlowFakeChatModel):
+            async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+                yield ChatGenerationChunk(
+                    message=AIMessageChunk(content="[课程](COURSE:c1)")
+                )
+                async for chunk in super()._astream(messages, stop, run_manager):
+                    yield chunk
+
+        cancelled = []
+
+        async def slow_process_citations(citations, notifier=None):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(citations)
+                raise
+
+        monkeypatch.setattr("synphora.agent.process_citations", slow_process_citations)
+        model = CitingModel(tokens=100, interval=0.02)
+        _, events = run_agent_with(model, monkeypatch, timeout=0.3)
+
+        assert events[-1].data.reason == RunFinishedReason.TIMEOUT
+        assert len(cancelled) == 1
+
+    def test_citation_updates_artifact_list_immediately(self, monkeypatch):
+        course_id = "15-two-dimensional-dynamic-programming"
+        artifact_manager.delete_artifact(course_id)
+
+        class CitingModel(SlowFakeChatModel):
+            async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+                yield ChatGenerationChunk(
+                    message=AIMessageChunk(content=f"[课程](COURSE:{course_id})")
+                )
+                async for chunk in super()._astream(messages, stop, run_manager):
+                    yield chunk
+
+        model = CitingModel(tokens=20, interval=0.02)
+        _, events = run_agent_with(model, monkeypatch)
+
+        # 引用的课程在回答过程中就通知前端，而不是等到本轮结束
+        types = [e.type for e in events]
+        updated = types.index(EventType.ARTIFACT_LIST_UPDATED)
+        assert EventType.TEXT_MESSAGE in types[updated:]
+        assert [a.id for a in events[updated].data.added] == [course_id]
+        assert types.count(EventType.ARTIFACT_LIST_UPDATED) == 1
+        artifact_manager.delete_artifact(course_id)
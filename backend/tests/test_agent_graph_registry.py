@@ -0,0 +1,48 @@
+"""
+代理图注册表测试
+"""
+from langchain_core.tools import tool
+
+from synphora import agent
+from synphora.agent import AgentGraphRegistry, NodeType
+
+
+@tool
+def echo(text: str) -> str:
+    """原样返回"""
+    return text
+
+
+def act_tool_names(graph) -> list[str]:
+    return list(graph.builder.nodes[NodeType.ACT].runnable.tools_by_name)
+
+
+class TestAgentGraphRegistry:
+    def test_get_graph_is_cached(self):
+        registry = AgentGraphRegistry()
+        graph = registry.get_graph()
+
+        assert registry.get_graph() is graph
+        assert act_tool_names(graph) == [t.name for t in agent.tools]
+
+    def test_warm_up_is_idempotent(self):
+        registry = AgentGraphRegistry()
+        registry.warm_up()
+        graph = registry.get_graph()
+        registry.warm_up()
+
+        assert registry.get_graph() is graph
+
+    def test_rebuild_swaps_graph_and_tools(self, monkeypatch):
+        # rebuild 会替换模块级的工具集，测试结束后恢复
+        monkeypatch.setattr(agent, "tools", agent.tools)
+        registry = AgentGraphRegistry()
+        old_graph = registry.get_graph()
+
+        graph = registry.rebuild([echo])
+
+        assert graph is not old_graph
+        assert registry.get_graph() is graph
+        assert registry.tools == [echo]
+        assert agent.tools == [echo]
+        assert act_tool_names(graph) == ["echo"]
@@ -5,6 +5,8 @@
 import pytest
 import io
 from fastapi.testclient import TestClient
+from synphora.artifact_manager import artifact_manager
+from synphora.models import ArtifactRole, ArtifactType
 from synphora.server import app
 
 
@@ -63,8 +65,10 @@ class TestArtifactCRUD:
         assert response.status_code == 200
         artifact3 = response.json()
         assert artifact3["title"] == "test.txt"
-        assert artifact3["content"] == file_content
+        assert "content" not in artifact3
         artifact3_id = artifact3["id"]
+        response = client.get(f"/artifacts/{artifact3_id}")
+        assert response.json()["content"] == file_content
         print(f"✓ 4. 上传文件创建第三个 artifact 成功，ID: {artifact3_id}")
         
         # 5. 获取所有 artifacts，应该有3个
@@ -76,6 +80,8 @@ class TestArtifactCRUD:
         assert artifact1_id in ids
         assert artifact2_id in ids
         assert artifact3_id in ids
+        # 列表只返回元数据，内容按需获取
+        assert all("content" not in a for a in artifacts)
         print("✓ 5. 获取所有 artifacts 成功，共3个")
         
         # 6. 根据ID获取特定 artifact
@@ -133,6 +139,65 @@ class TestArtifactCRUD:
         
         print("\n🎉 所有 CRUD 操作测试通过！")
 
+    def test_artifact_query_pagination(self, client):
+        """测试元数据分页查询"""
+        created_ids = []
+        for i in range(5):
+            artifact = artifact_manager.create_artifact(
+                title=f"思维导图{i}",
+                content="# 思维导图",
+                artifact_type=ArtifactType.MIND_MAP,
+                role=ArtifactRole.ASSISTANT,
+            )
+            created_ids.append(artifact.id)
+        response = client.post("/artifacts", json={"title": "用户文档", "content": "内容"})
+        created_ids.append(response.json()["id"])
+
+        # 按类型过滤，分页遍历，只返回元数据
+        page_ids = []
+        cursor = None
+        while True:
+            params = {"type": "mind_map", "order": "asc", "limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/artifacts/query", params=params)
+            assert response.status_code == 200
+            page = response.json()
+            assert len(page["artifacts"]) <= 2
+            for artifact in page["artifacts"]:
+                assert "content" not in artifact
+                assert artifact["type"] == "mind_map"
+            page_ids.extend(a["id"] for a in page["artifacts"])
+            cursor = page.get("next_cursor")
+            if not cursor:
+                break
+        assert page_ids == created_ids[:5]
+        print("✓ 按类型分页查询成功")
+
+        # 按角色过滤
+        response = client.get("/artifacts/query", params={"role": "user"})
+        assert [a["id"] for a in response.json()["artifacts"]] == [created_ids[5]]
+        print("✓ 按角色查询成功")
+
+        # 非法游标
+        response = client.get("/artifacts/query", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+        print("✓ 非法游标返回400")
+
+        for artifact_id in created_ids:
+            client.delete(f"/artifacts/{artifact_id}")
+
+    def test_original_artifact_skips_missing_content(self):
+        """最早的 OTHER artifact 内容文件丢失时，返回下一个可读取的 artifact"""
+        first = artifact_manager.create_artifact(title="原文1", content="内容1")
+        second = artifact_manager.create_artifact(title="原文2", content="内容2")
+        artifact_manager.get_artifact_content_path(first.id).unlink()
+        try:
+            assert artifact_manager.get_original_artifact().id == second.id
+        finally:
+            artifact_manager.delete_artifact(first.id)
+            artifact_manager.delete_artifact(second.id)
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "-s"])
\ No newline at end of file
@@ -0,0 +1,39 @@
+"""
+artifact 内容流式读取测试
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from synphora.artifact_manager import artifact_manager
+from synphora.server import app
+
+
+class TestArtifactContent:
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_stream_and_range(self, client):
+        content = "动态规划" * 1000
+        artifact = artifact_manager.create_artifact(title="内容", content=content)
+        data = content.encode("utf-8")
+
+        response = client.get(f"/artifacts/{artifact.id}/content")
+        assert response.status_code == 200
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.content == data
+
+        response = client.get(
+            f"/artifacts/{artifact.id}/content", headers={"Range": "bytes=12-23"}
+        )
+        assert response.status_code == 206
+        assert response.headers["content-range"] == f"bytes 12-23/{len(data)}"
+        assert response.content.decode("utf-8") == "动态规划"
+
+        response = client.get(
+            f"/artifacts/{artifact.id}/content", headers={"Range": f"bytes={len(data)}-"}
+        )
+        assert response.status_code == 416
+
+        artifact_manager.delete_artifact(artifact.id)
+        assert client.get(f"/artifacts/{artifact.id}/content").status_code == 404
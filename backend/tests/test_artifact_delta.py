@@ -0,0 +1,89 @@
+"""
+artifact 列表增量测试
+"""
+from synphora import agent, file_storage
+from synphora.agent import ArtifactListNotifier
+from synphora.artifact_manager import artifact_manager
+from synphora.file_storage import FileStorage
+from synphora.sse import EventType
+
+
+class TestArtifactListDelta:
+    def setup_method(self):
+        self.storage = FileStorage()
+
+    def teardown_method(self):
+        self.storage.cleanup_temp_storage()
+
+    def test_delta_collapses_changes(self):
+        kept = self.storage.create_artifact(title="保留", content="内容")
+        removed = self.storage.create_artifact(title="删除", content="内容")
+        base = self.storage.version
+
+        added = self.storage.create_artifact(title="新建", content="内容")
+        self.storage.update_artifact(added.id, title="新建（修改）")
+        self.storage.update_artifact(kept.id, content="新内容")
+        self.storage.delete_artifact(removed.id)
+        temporary = self.storage.create_artifact(title="临时", content="内容")
+        self.storage.delete_artifact(temporary.id)
+
+        delta = self.storage.get_list_delta(base)
+        assert (delta.base_version, delta.version) == (base, self.storage.version)
+        assert [(a.id, a.title) for a in delta.added] == [(added.id, "新建（修改）")]
+        assert [a.id for a in delta.updated] == [kept.id]
+        assert delta.removed == [removed.id]
+        assert not delta.resync
+
+    def test_versions_are_monotonic(self):
+        versions = [self.storage.version]
+        artifact = self.storage.create_artifact(title="文档", content="内容")
+        versions.append(self.storage.version)
+        self.storage.create_artifact_with_id(artifact.id, title="文档", content="内容")
+        versions.append(self.storage.version)
+        assert versions == sorted(set(versions))
+        # 用已有 ID 重新创建算作更新
+        delta = self.storage.get_list_delta(versions[1])
+        assert [a.id for a in delta.updated] == [artifact.id]
+
+    def test_resync_when_log_is_too_short(self):
+        base = self.storage.version
+        self.storage._changes = file_storage.deque(maxlen=2)
+        for i in range(3):
+            self.storage.create_artifact(title=f"文档 {i}", content="内容")
+        assert self.storage.get_list_delta(base).resync
+        assert not self.storage.get_list_delta(base + 1).resync
+
+        self.storage.clear_all()
+        assert self.storage.get_list_delta(base + 1).resync
+
+
+class TestArtifactListNotifier:
+    def test_flush_sends_chained_deltas(self, monkeypatch):
+        sent = []
+        monkeypatch.setattr(agent, "write_sse_event", sent.append)
+        base = artifact_manager.get_list_version()
+        notifier = ArtifactListNotifier(base)
+        notifier.flush()
+        assert sent == []
+
+        # 每次创建 artifact 后立即通知，下一个增量从上一个增量的版本开始
+        first = artifact_manager.create_artifact(title="思维导图", content="内容")
+        notifier.flush()
+        second = artifact_manager.create_artifact(title="题解代码", content="内容")
+        notifier.flush()
+        notifier.flush()
+
+        assert [e.type for e in sent] == [EventType.ARTIFACT_LIST_UPDATED] * 2
+        assert sent[0].data.base_version == base
+        assert [a.id for a in sent[0].data.added] == [first.id]
+        assert sent[1].data.base_version == sent[0].data.version
+        assert [a.id for a in sent[1].data.added] == [second.id]
+
+        # 结束时只剩下还没有通知的变化
+        artifact_manager.delete_artifact(first.id)
+        event = notifier.take_event()
+        assert event.data.base_version == sent[1].data.version
+        assert event.data.removed == [first.id]
+        assert notifier.take_event() is None
+
+        artifact_manager.delete_artifact(second.id)
@@ -0,0 +1,62 @@
+"""
+artifact 接口的 ETag 和条件请求测试
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from synphora.artifact_manager import artifact_manager
+from synphora.server import app
+
+
+class TestArtifactEtag:
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def test_list_not_modified_until_change(self, client):
+        response = client.get("/artifacts")
+        etag = response.headers["etag"]
+
+        response = client.get("/artifacts", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+        artifact = artifact_manager.create_artifact(title="新文档", content="内容")
+        response = client.get("/artifacts", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+        artifact_manager.delete_artifact(artifact.id)
+
+    def test_artifact_not_modified_until_update(self, client):
+        artifact = artifact_manager.create_artifact(title="文档", content="内容")
+        other = artifact_manager.create_artifact(title="其他文档", content="内容")
+
+        etag = client.get(f"/artifacts/{artifact.id}").headers["etag"]
+        response = client.get(
+            f"/artifacts/{artifact.id}", headers={"If-None-Match": f'"other", W/{etag}'}
+        )
+        assert response.status_code == 304
+
+        # 其他 artifact 的修改不影响这个 artifact 的 ETag
+        artifact_manager.update_artifact(other.id, content="新内容")
+        response = client.get(f"/artifacts/{artifact.id}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        artifact_manager.update_artifact(artifact.id, content="新内容")
+        response = client.get(f"/artifacts/{artifact.id}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["content"] == "新内容"
+
+        artifact_manager.delete_artifact(artifact.id)
+        artifact_manager.delete_artifact(other.id)
+
+    def test_missing_content_is_not_found_even_with_matching_etag(self, client):
+        artifact = artifact_manager.create_artifact(title="文档", content="内容")
+        etag = client.get(f"/artifacts/{artifact.id}").headers["etag"]
+
+        artifact_manager.get_artifact_content_path(artifact.id).unlink()
+        response = client.get(f"/artifacts/{artifact.id}", headers={"If-None-Match": etag})
+        assert response.status_code == 404
+
+        artifact_manager.delete_artifact(artifact.id)
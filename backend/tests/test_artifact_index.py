@@ -0,0 +1,88 @@
+"""
+artifact 元数据索引测试
+"""
+from synphora.artifact_index import ArtifactIndex
+from synphora.models import ArtifactOrderBy, ArtifactRole, ArtifactType
+
+COMBINATIONS = [
+    (ArtifactType.MIND_MAP, ArtifactRole.ASSISTANT),
+    (ArtifactType.MIND_MAP, ArtifactRole.USER),
+    (ArtifactType.COURSE, ArtifactRole.ASSISTANT),
+]
+
+
+def make_index(n: int) -> ArtifactIndex:
+    index = ArtifactIndex()
+    for i in range(n):
+        artifact_type, role = COMBINATIONS[i % len(COMBINATIONS)]
+        created_at = f"2025-09-22T10:00:{i:02d}"
+        index.put(
+            {
+                "id": f"a{i:02d}",
+                "type": artifact_type.value,
+                "role": role.value,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+        )
+    return index
+
+
+def query_all(index: ArtifactIndex, limit: int, **kwargs) -> list[list[str]]:
+    pages = []
+    cursor = None
+    while True:
+        items, cursor = index.query(limit=limit, cursor=cursor, **kwargs)
+        pages.append([item["id"] for item in items])
+        if cursor is None:
+            return pages
+
+
+class TestArtifactIndex:
+    def test_type_and_role_pagination(self):
+        index = make_index(30)
+        pages = query_all(
+            index,
+            limit=4,
+            artifact_type=ArtifactType.MIND_MAP,
+            role=ArtifactRole.ASSISTANT,
+        )
+
+        # 组合条件直接遍历 (type, role) 分区，不再在 type 分区中逐条过滤 role
+        partition = (ArtifactOrderBy.CREATED_AT, "type", "mind_map", "role", "assistant")
+        assert len(index._indexes[partition]) == 10
+
+        expected = [f"a{i:02d}" for i in range(27, -1, -3)]
+        assert pages == [expected[0:4], expected[4:8], expected[8:10]]
+
+        ascending = query_all(
+            index,
+            limit=4,
+            artifact_type=ArtifactType.MIND_MAP,
+            role=ArtifactRole.ASSISTANT,
+            order_by=ArtifactOrderBy.UPDATED_AT,
+            descending=False,
+        )
+        assert sum(ascending, []) == expected[::-1]
+
+    def test_type_and_role_partition_follows_updates(self):
+        index = make_index(3)
+        index.put(
+            {
+                "id": "a00",
+                "type": ArtifactType.MIND_MAP.value,
+                "role": ArtifactRole.USER.value,
+                "created_at": "2025-09-22T10:00:00",
+                "updated_at": "2025-09-22T10:01:00",
+            }
+        )
+
+        def ids(artifact_type, role):
+            items, _ = index.query(artifact_type=artifact_type, role=role)
+            return [item["id"] for item in items]
+
+        assert ids(ArtifactType.MIND_MAP, ArtifactRole.ASSISTANT) == []
+        assert ids(ArtifactType.MIND_MAP, ArtifactRole.USER) == ["a01", "a00"]
+        index.remove("a01")
+        assert ids(ArtifactType.MIND_MAP, ArtifactRole.USER) == ["a00"]
+        assert ids(ArtifactType.COURSE, ArtifactRole.USER) == []
@@ -0,0 +1,70 @@
+"""
+流式引用扫描器测试
+"""
+from synphora.citation import CitationType, StreamingCitationScanner
+
+MARKER = "[14 打家劫舍：动态规划的解题四步骤](COURSE:14-dynamic-programming-basics)"
+
+
+def feed_all(scanner, chunks):
+    citations = []
+    for chunk in chunks:
+        citations.extend(scanner.feed(chunk))
+    return citations
+
+
+class TestStreamingCitationScanner:
+    def test_marker_in_single_chunk(self):
+        scanner = StreamingCitationScanner()
+        citations = scanner.feed(f"请先阅读 {MARKER} 这篇文章。")
+
+        assert len(citations) == 1
+        assert citations[0].type == CitationType.COURSE
+        assert citations[0].artifactId == "14-dynamic-programming-basics"
+        assert citations[0].title == "14 打家劫舍：动态规划的解题四步骤"
+
+    def test_marker_split_across_chunks(self):
+        scanner = StreamingCitationScanner()
+        text = f"请先阅读 {MARKER} 这篇文章。"
+        chunks = [text[i : i + 3] for i in range(0, len(text), 3)]
+
+        emitted_at = None
+        citations = []
+        for i, chunk in enumerate(chunks):
+            new_citations = scanner.feed(chunk)
+            if new_citations and emitted_at is None:
+                emitted_at = i
+            citations.extend(new_citations)
+
+        assert [c.artifactId for c in citations] == ["14-dynamic-programming-basics"]
+        # 标记闭合的分片就应当触发，而不是等到消息结束
+        marker_end = text.index(MARKER) + len(MARKER)
+        assert emitted_at == (marker_end - 1) // 3
+
+    def test_duplicate_citations_reported_once(self):
+        scanner = StreamingCitationScanner()
+        citations = feed_all(scanner, [MARKER, "\n再看一次 ", MARKER])
+
+        assert len(citations) == 1
+
+    def test_multiple_markers_in_one_line(self):
+        scanner = StreamingCitationScanner()
+        citations = scanner.feed(
+            f"{MARKER} 和 [思维导图](MIND_MAP:mindmap-1) 以及 "
+            "[题解](SOLUTION_CODE:solution-code-1)"
+        )
+
+        assert [c.type for c in citations] == [
+            CitationType.COURSE,
+            CitationType.MIND_MAP,
+            CitationType.SOLUTION_CODE,
+        ]
+
+    def test_ignores_non_citation_brackets(self):
+        scanner = StreamingCitationScanner()
+        citations = feed_all(
+            scanner,
+            ["dp[i][j] = dp[i - 1]", "[j - 1] + 1\n", "[链接](https://leetcode.cn)"],
+        )
+
+        assert citations == []
@@ -0,0 +1,85 @@
+"""
+课程内容缓存测试
+"""
+import os
+
+from synphora.course import Course, CourseManager
+
+
+def make_manager(tmp_path, contents: dict[str, str], **kwargs) -> CourseManager:
+    courses = []
+    files = {}
+    for artifact_id, content in contents.items():
+        path = tmp_path / f"{artifact_id}.md"
+        path.write_bytes(content.encode("utf-8"))
+        courses.append(
+            Course(artifact_id=artifact_id, slug=artifact_id, title=artifact_id, tags=[], summary="")
+        )
+        files[artifact_id] = path
+    manager = CourseManager(**kwargs)
+    manager.set_courses(courses, files=files)
+    return manager
+
+
+class TestCourseCache:
+    def test_lru_byte_budget(self, tmp_path):
+        manager = make_manager(
+            tmp_path, {"a": "a" * 100, "b": "b" * 100, "c": "c" * 100}, max_cache_bytes=250
+        )
+        manager.read_course_content("a")
+        manager.read_course_content("b")
+        # 访问 a 后，b 成为最久未使用的课程
+        assert manager.read_course_content("a") == "a" * 100
+        manager.read_course_content("c")
+
+        stats = manager.cache_stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 3, 1)
+        assert (stats["entries"], stats["bytes"]) == (2, 200)
+
+        assert manager.read_course_content("b") == "b" * 100
+        stats = manager.cache_stats()
+        assert (stats["misses"], stats["evictions"]) == (4, 2)
+        assert stats["bytes"] <= 250
+
+    def test_larger_than_budget_not_cached(self, tmp_path):
+        manager = make_manager(tmp_path, {"big": "x" * 300}, max_cache_bytes=250)
+        assert manager.read_course_content("big") == "x" * 300
+        assert manager.read_course_content("big") == "x" * 300
+
+        stats = manager.cache_stats()
+        assert (stats["hits"], stats["misses"], stats["entries"], stats["bytes"]) == (0, 2, 0, 0)
+
+    def test_invalidate_on_size_change(self, tmp_path):
+        manager = make_manager(tmp_path, {"a": "# A\n\n旧内容\n"})
+        assert manager.read_course_content("a") == "# A\n\n旧内容\n"
+
+        (tmp_path / "a.md").write_text("# A\n\n修改后的内容\n", encoding="utf-8")
+        assert manager.read_course_content("a") == "# A\n\n修改后的内容\n"
+        assert manager.read_course_content("a") == "# A\n\n修改后的内容\n"
+
+        stats = manager.cache_stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+
+    def test_invalidate_on_mtime_change(self, tmp_path):
+        manager = make_manager(tmp_path, {"a": "第一版"})
+        path = tmp_path / "a.md"
+        manager.read_course_content("a")
+        mtime_ns = path.stat().st_mtime_ns
+
+        # 大小不变，只有 mtime 变化
+        path.write_text("第二版", encoding="utf-8")
+        os.utime(path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+        assert manager.read_course_content("a") == "第二版"
+        assert manager.cache_stats()["misses"] == 2
+
+    def test_mmap_read(self, tmp_path):
+        contents = {"crlf": "# 标题\r\n\r\n正文\r\n", "empty": ""}
+        mmap_manager = make_manager(tmp_path, contents, use_mmap=True)
+        plain_manager = make_manager(tmp_path, contents)
+
+        for artifact_id in contents:
+            content = mmap_manager.read_course_content(artifact_id)
+            assert content == plain_manager.read_course_content(artifact_id)
+        assert mmap_manager.read_course_content("crlf") == "# 标题\n\n正文\n"
+        assert mmap_manager.read_course_content("empty") == ""
+        assert mmap_manager.cache_stats()["hits"] == 2
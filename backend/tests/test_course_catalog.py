@@ -0,0 +1,86 @@
+"""
+课程目录发现测试
+"""
+import json
+import os
+
+from synphora.course import CourseManager
+from synphora.course_catalog import CourseCatalog
+
+
+def write_course(data_dir, slug: str, title: str, tags: list[str] | None = None):
+    course_dir = data_dir / "collection" / slug
+    course_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {"title": title, "tags": tags or [], "summary": f"{title} 摘要"}
+    (course_dir / "course.json").write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    (course_dir / f"{slug}.md").write_text(f"# {title}\n\n正文\n", encoding="utf-8")
+
+
+class TestCourseCatalog:
+    def test_discover_courses(self, tmp_path):
+        write_course(tmp_path, "a", "文章 A", ["链表"])
+        write_course(tmp_path, "b", "文章 B")
+        manager = CourseManager(catalog=CourseCatalog(tmp_path, index_path=None))
+
+        assert [c.artifact_id for c in manager.list_courses()] == ["a", "b"]
+        assert [c.artifact_id for c in manager.list_courses("链表")] == ["a"]
+        assert manager.read_course_content("b") == "# 文章 B\n\n正文\n"
+
+    def test_incremental_scan(self, tmp_path):
+        write_course(tmp_path, "a", "文章 A")
+        write_course(tmp_path, "b", "文章 B")
+        catalog = CourseCatalog(tmp_path, index_path=None)
+        result = catalog.scan()
+        assert result.added == ["a", "b"]
+
+        assert not catalog.scan().changed
+
+        write_course(tmp_path, "b", "文章 B（修订）")
+        write_course(tmp_path, "c", "文章 C")
+        manifest = tmp_path / "collection" / "b" / "course.json"
+        os.utime(manifest, ns=(0, 1))
+        (tmp_path / "collection" / "a" / "course.json").unlink()
+        result = catalog.scan()
+        assert (result.added, result.updated, result.removed) == (["c"], ["b"], ["a"])
+
+    def test_index_reused_at_startup(self, tmp_path):
+        data_dir = tmp_path / "data"
+        index_path = tmp_path / "index.json"
+        write_course(data_dir, "a", "文章 A")
+        CourseCatalog(data_dir, index_path).scan()
+        assert index_path.exists()
+
+        # 从索引加载后，未变化的清单不会被重新解析
+        catalog = CourseCatalog(data_dir, index_path)
+        assert [course.title for course, _ in catalog.courses()] == ["文章 A"]
+        assert not catalog.scan().changed
+
+    def test_rescan_picks_up_new_course(self, tmp_path):
+        write_course(tmp_path, "a", "文章 A")
+        manager = CourseManager(catalog=CourseCatalog(tmp_path, index_path=None), rescan_interval=0)
+        manager.list_courses()
+        version = manager.catalog_version
+
+        write_course(tmp_path, "b", "文章 B")
+        assert manager.get_course("b").title == "文章 B"
+        assert manager.catalog_version == version + 1
+
+    def test_no_filesystem_access_until_first_use(self, tmp_path):
+        data_dir = tmp_path / "data"
+        index_path = tmp_path / "cache" / "course-index.json"
+        write_course(data_dir, "a", "文章 A")
+        manager = CourseManager(catalog=CourseCatalog(data_dir, index_path))
+        assert not index_path.exists()
+
+        assert [c.artifact_id for c in manager.list_courses()] == ["a"]
+        # 索引写入缓存目录，缓存目录不存在时自动创建
+        assert index_path.exists()
+
+    def test_index_write_failure_is_ignored(self, tmp_path):
+        write_course(tmp_path / "data", "a", "文章 A")
+        # 索引文件的父路径是一个普通文件，无法写入
+        (tmp_path / "readonly").write_text("")
+        catalog = CourseCatalog(tmp_path / "data", tmp_path / "readonly" / "index.json")
+
+        assert catalog.scan().added == ["a"]
+        assert [course.title for course, _ in catalog.courses()] == ["文章 A"]
@@ -0,0 +1,47 @@
+"""
+课程列表（标签索引和 JSON 缓存）测试
+"""
+import json
+
+from synphora.course import Course, CourseManager
+
+
+def make_course(artifact_id: str, tags: list[str]) -> Course:
+    return Course(
+        artifact_id=artifact_id,
+        slug=artifact_id,
+        title=f"文章 {artifact_id}",
+        tags=tags,
+        summary="这是一段很长的文章摘要",
+    )
+
+
+class TestCourseList:
+    def setup_method(self):
+        self.manager = CourseManager(
+            courses=[
+                make_course("a", ["链表"]),
+                make_course("b", ["动态规划"]),
+                make_course("c", ["动态规划", "二叉树"]),
+            ]
+        )
+
+    def test_filter_by_tag(self):
+        assert [c.artifact_id for c in self.manager.list_courses("动态规划")] == ["b", "c"]
+        assert [c.artifact_id for c in self.manager.list_courses(" 二叉树 ")] == ["c"]
+        assert self.manager.list_courses("图") == []
+        assert len(self.manager.list_courses("")) == 3
+
+    def test_projection_and_truncation(self):
+        data = json.loads(
+            self.manager.list_courses_json("链表", fields=["title", "summary"], summary_max_chars=4)
+        )
+        assert data == [{"artifact_id": "a", "title": "文章 a", "summary": "这是一段…"}]
+
+    def test_json_cached_until_catalog_changes(self):
+        first = self.manager.list_courses_json("动态规划")
+        assert self.manager.list_courses_json("动态规划") is first
+
+        self.manager.set_courses([make_course("d", ["动态规划"])])
+        data = json.loads(self.manager.list_courses_json("动态规划"))
+        assert [item["artifact_id"] for item in data] == ["d"]
@@ -0,0 +1,61 @@
+"""
+课程章节目录测试
+"""
+from synphora.course import course_manager
+from synphora.course_outline import parse_outline
+
+MARKDOWN = """# 文章标题
+
+引言
+
+## 第一节
+
+第一节内容
+
+### 小节 A
+
+```python
+# 代码中的注释不是标题
+```
+
+## 第二节
+
+第二节内容
+"""
+
+
+class TestCourseOutline:
+    def test_parse_outline_byte_offsets(self):
+        data = MARKDOWN.encode('utf-8')
+        outline = parse_outline(data)
+
+        assert outline.title == "文章标题"
+        assert [s.path for s in outline.iter_sections()] == [
+            "第一节",
+            "第一节 > 小节 A",
+            "第二节",
+        ]
+        first, second = outline.sections
+        assert data[first.start : first.end].decode('utf-8').startswith("## 第一节")
+        assert data[first.start : first.end].decode('utf-8').endswith("```\n\n")
+        assert second.end == len(data)
+        # 代码块中的 # 不会被当作标题
+        assert first.children[0].children == []
+
+    def test_find_section(self):
+        outline = parse_outline(MARKDOWN.encode('utf-8'))
+
+        assert outline.find_section("第一节 > 小节 A").title == "小节 A"
+        assert outline.find_section("小节 A").path == "第一节 > 小节 A"
+        assert outline.find_section("不存在") is None
+
+    def test_read_course_section(self):
+        artifact_id = course_manager.list_courses()[0].artifact_id
+        outline = course_manager.get_course_outline(artifact_id)
+        section = next(outline.iter_sections())
+
+        content = course_manager.read_course_section(artifact_id, section.path)
+
+        assert content.startswith(f"{'#' * section.level} {section.title}")
+        assert content in course_manager.read_course_content(artifact_id)
+        assert course_manager.read_course_section(artifact_id, "不存在的章节") is None
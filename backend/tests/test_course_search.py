@@ -0,0 +1,103 @@
+"""
+课程段落搜索测试
+"""
+from synphora.course import Course, CourseManager
+from synphora.course_search import CourseSearchIndex, split_passages, tokenize
+from synphora.tool import AlgorithmTeacherTool
+
+
+class InMemoryCourses:
+    """内容保存在内存中的课程服务，用于测试索引的增量更新"""
+
+    def __init__(self, contents: dict[str, str]):
+        self.contents = contents
+        self.reads: list[str] = []
+
+    def list_courses(self) -> list[Course]:
+        return [self.get_course(artifact_id) for artifact_id in self.contents]
+
+    def get_course(self, artifact_id: str) -> Course:
+        return Course(
+            artifact_id=artifact_id,
+            slug=artifact_id,
+            title=f"文章 {artifact_id}",
+            tags=[],
+            summary="",
+        )
+
+    def get_course_fingerprint(self, artifact_id: str) -> tuple[int, int]:
+        content = self.contents[artifact_id]
+        return hash(content), len(content)
+
+    def read_course_content(self, artifact_id: str, cache: bool = True) -> str:
+        self.reads.append(artifact_id)
+        return self.contents[artifact_id]
+
+
+class TestCourseSearch:
+    def test_tokenize(self):
+        assert tokenize("动态规划 DP数组，子") == ["动态", "态规", "规划", "dp", "数组", "子"]
+
+    def test_split_passages(self):
+        content = "# 标题\n\n引言\n\n## 第一节\n\n内容一\n\n```python\n# 注释\n```\n\n### 小节\n\n内容二\n"
+        passages = split_passages("a", content)
+
+        assert [(p.section, p.content) for p in passages] == [
+            ("", "引言"),
+            ("第一节", "内容一\n\n```python\n# 注释\n```"),
+            ("第一节 > 小节", "内容二"),
+        ]
+
+    def test_search_corpus(self):
+        index = CourseSearchIndex()
+        hits = index.search("最长公共子序列", k=3)
+
+        assert len(hits) == 3
+        assert hits[0].artifact_id == "15-two-dimensional-dynamic-programming"
+        assert hits[0].title == "15 最长公共子序列：二维动态规划的解法"
+        assert hits[0].score >= hits[1].score >= hits[2].score
+        assert "data" not in hits[0].to_data()
+
+    def test_incremental_refresh(self):
+        courses = InMemoryCourses({"a": "# A\n\n二叉树的遍历", "b": "# B\n\n链表反转"})
+        index = CourseSearchIndex(courses)
+
+        assert index.refresh(force=True) == 2
+        assert [h.artifact_id for h in index.search("链表")] == ["b"]
+
+        # 内容没有变化的课程不重新读取
+        courses.reads.clear()
+        assert index.refresh(force=True) == 0
+        assert courses.reads == []
+
+        courses.contents["b"] = "# B\n\n动态规划"
+        del courses.contents["a"]
+        assert index.refresh(force=True) == 1
+
+        assert index.search("链表") == []
+        assert index.search("二叉树") == []
+        assert [h.artifact_id for h in index.search("动态规划")] == ["b"]
+        assert index.stats()["courses"] == 1
+
+    def test_section_round_trip_without_h1(self, tmp_path, monkeypatch):
+        # 没有一级标题时，二级标题就是章节路径的第一级
+        content = "## 链表\n\n链表简介\n\n### 反转链表\n\n用三个指针反转链表\n\n## 二叉树\n\n二叉树简介\n"
+        path = tmp_path / "a.md"
+        path.write_text(content, encoding="utf-8")
+        course = Course(artifact_id="a", slug="a", title="文章 a", tags=[], summary="")
+        manager = CourseManager(courses=[course])
+        manager.set_courses([course], files={"a": path})
+        monkeypatch.setattr(AlgorithmTeacherTool, "COURSE_MANAGER", manager)
+
+        hit = CourseSearchIndex(manager).search("三个指针", k=1)[0]
+        assert hit.section == "链表 > 反转链表"
+        assert [s.path for s in manager.get_course_outline("a").iter_sections()] == [
+            "链表",
+            "链表 > 反转链表",
+            "二叉树",
+        ]
+
+        section = AlgorithmTeacherTool.read_article_section.invoke(
+            {"artifact_id": "a", "section_path": hit.section}
+        )
+        assert section == "### 反转链表\n\n用三个指针反转链表\n\n"
@@ -0,0 +1,106 @@
+"""
+对话历史压缩测试
+"""
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from synphora.history_compaction import (
+    _parse_budgets,
+    compact_history,
+    estimate_message_tokens,
+    estimate_tokens,
+    get_token_budget,
+)
+
+ARTICLE = "动态规划文章内容。" * 300
+
+
+def make_turn(i: int, artifact_id: str = "c1"):
+    call_id = f"call-{i}"
+    return [
+        HumanMessage(content=f"问题 {i}"),
+        AIMessage(
+            content="",
+            tool_calls=[
+                {"name": "read_article", "args": {"artifact_id": artifact_id}, "id": call_id}
+            ],
+        ),
+        ToolMessage(content=ARTICLE, tool_call_id=call_id, name="read_article"),
+        AIMessage(content=f"回答 {i}"),
+    ]
+
+
+def make_history(turns: int):
+    messages = [SystemMessage(content="你是算法老师")]
+    for i in range(turns):
+        messages.extend(make_turn(i, artifact_id=f"c{i}"))
+    return messages
+
+
+class TestHistoryCompaction:
+    def test_within_budget_unchanged(self):
+        messages = make_history(2)
+        result = compact_history(messages, budget=100_000)
+
+        assert result.messages is messages
+        assert result.tokens_saved == 0
+
+    def test_stub_stale_tool_outputs(self):
+        messages = make_history(4)
+        article_tokens = estimate_tokens(ARTICLE)
+        result = compact_history(messages, budget=article_tokens * 3)
+
+        tool_outputs = [m.content for m in result.messages if isinstance(m, ToolMessage)]
+        # 较早两轮的文章被替换，最近两轮原样保留
+        assert tool_outputs[0].startswith("[已省略 read_article")
+        assert tool_outputs[1].startswith("[已省略 read_article")
+        assert tool_outputs[2:] == [ARTICLE, ARTICLE]
+        assert result.stubbed_tool_outputs == 2
+        assert result.summarized_turns == 0
+        assert result.tokens_saved > 0
+        # 原列表不被修改
+        assert messages[3].content == ARTICLE
+
+    def test_stub_repeated_read_in_recent_turns(self):
+        messages = [SystemMessage(content="你是算法老师")]
+        messages += make_turn(0, "c1") + make_turn(1, "c1")
+        result = compact_history(messages, budget=estimate_tokens(ARTICLE) + 100)
+
+        tool_outputs = [m.content for m in result.messages if isinstance(m, ToolMessage)]
+        assert tool_outputs[0].startswith("[已省略")
+        assert tool_outputs[1] == ARTICLE
+
+    def test_summarize_older_turns(self):
+        messages = make_history(6)
+        # 预算只比最近两轮多一点，替换工具输出之后仍然放不下较早的轮次
+        recent = sum(estimate_message_tokens(m) for m in [messages[0]] + messages[-8:])
+        budget = recent + 150
+        result = compact_history(messages, budget=budget)
+
+        assert result.summarized_turns > 0
+        system = result.messages[0]
+        assert isinstance(system, SystemMessage)
+        assert system.content.startswith("你是算法老师")
+        assert "- 用户：问题 0" in system.content
+        assert "助手：回答 0" in system.content
+        # 最近两轮原样保留，工具调用和结果仍然成对出现
+        assert result.messages[-8:] == messages[-8:]
+        assert result.tokens_after <= budget
+
+    def test_budget_per_model(self, monkeypatch):
+        monkeypatch.setattr(
+            "synphora.history_compaction.HISTORY_TOKEN_BUDGETS", {"kimi": 100000}
+        )
+        monkeypatch.setattr("synphora.history_compaction.HISTORY_TOKEN_BUDGET", 5000)
+
+        assert get_token_budget("moonshot/kimi-k2") == 100000
+        assert get_token_budget("deepseek/deepseek-chat") == 5000
+        assert get_token_budget(None) == 5000
+
+    def test_malformed_budgets_skipped(self, monkeypatch):
+        budgets = _parse_budgets("gpt-4o=abc, kimi=100000,=5,gemini,deepseek=-1,")
+        assert budgets == {"kimi": 100000}
+
+        monkeypatch.setattr("synphora.history_compaction.HISTORY_TOKEN_BUDGETS", budgets)
+        monkeypatch.setattr("synphora.history_compaction.HISTORY_TOKEN_BUDGET", 5000)
+        assert get_token_budget("gpt-4o") == 5000
+        assert get_token_budget("kimi-k2") == 100000
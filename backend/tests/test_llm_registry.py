@@ -0,0 +1,80 @@
+"""
+LLM 客户端注册表测试
+"""
+import asyncio
+
+import pytest
+from langchain_core.tools import tool
+
+from synphora.llm import LlmClientRegistry, _get_llm_config
+
+
+@tool
+def first_tool(text: str) -> str:
+    """第一个工具"""
+    return text
+
+
+@tool
+def second_tool(text: str) -> str:
+    """第二个工具"""
+    return text
+
+
+@pytest.fixture(autouse=True)
+def llm_env(monkeypatch):
+    # 默认供应商和 Kimi 使用同一个 base_url、不同的模型，Gemini 使用另一个 base_url
+    for prefix, base_url, model in [
+        ("", "http://llm.test/v1", "default-model"),
+        ("KIMI_", "http://llm.test/v1", "kimi-model"),
+        ("GEMINI_", "http://gemini.test/v1", "gemini-model"),
+    ]:
+        monkeypatch.setenv(f"{prefix}LLM_BASE_URL", base_url)
+        monkeypatch.setenv(f"{prefix}LLM_API_KEY", "test-key")
+        monkeypatch.setenv(f"{prefix}LLM_MODEL", model)
+    _get_llm_config.cache_clear()
+    yield
+    _get_llm_config.cache_clear()
+
+
+class TestLlmClientRegistry:
+    def test_http_clients_shared_per_base_url(self):
+        registry = LlmClientRegistry()
+        default = registry.get_client()
+        kimi = registry.get_client("kimi")
+        gemini = registry.get_client("gemini")
+
+        assert registry.get_client() is default
+        assert default is not kimi
+        assert default.http_client is kimi.http_client
+        assert default.http_async_client is kimi.http_async_client
+        assert gemini.http_client is not default.http_client
+        assert len(registry._http_clients) == 2
+        asyncio.run(registry.aclose())
+
+    def test_bind_tools_cache(self):
+        registry = LlmClientRegistry()
+        bound = registry.get_client_with_tools("", [first_tool, second_tool])
+
+        assert registry.get_client_with_tools("", [first_tool, second_tool]) is bound
+        assert registry.get_client_with_tools("", [first_tool]) is not bound
+        assert registry.get_client_with_tools("kimi", [first_tool, second_tool]) is not bound
+        assert registry.get_client_with_tools("", []) is registry.get_client()
+        assert len(registry._bound) == 3
+        asyncio.run(registry.aclose())
+
+    def test_aclose_closes_pooled_clients(self):
+        registry = LlmClientRegistry()
+        registry.get_client()
+        registry.get_client("gemini")
+        http_clients = list(registry._http_clients.values())
+        http_async_clients = list(registry._http_async_clients.values())
+
+        asyncio.run(registry.aclose())
+
+        assert all(client.is_closed for client in http_clients)
+        assert all(client.is_closed for client in http_async_clients)
+        assert registry._clients == {} and registry._bound == {}
+        # 关闭后再次获取时重新创建连接池
+        assert not registry.get_client().http_client.is_closed
+        asyncio.run(registry.aclose())
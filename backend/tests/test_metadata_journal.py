@@ -0,0 +1,95 @@
+"""
+元数据日志存储测试
+"""
+import json
+
+from synphora.file_storage import MetadataJournal
+
+
+def make_metadata(artifact_id: str, title: str) -> dict:
+    return {
+        "id": artifact_id,
+        "role": "user",
+        "type": "other",
+        "title": title,
+        "description": None,
+        "created_at": "2025-09-22T11:15:12.184144",
+        "updated_at": "2025-09-22T11:15:12.184144",
+    }
+
+
+class TestMetadataJournal:
+    def test_replay_on_reload(self, tmp_path):
+        journal = MetadataJournal(tmp_path)
+        journal.put("a", make_metadata("a", "文档A"))
+        journal.put("b", make_metadata("b", "文档B"))
+        journal.put("a", make_metadata("a", "文档A v2"))
+        journal.delete("b")
+        journal.close()
+
+        # 写入只追加日志，不重写快照
+        assert not (tmp_path / "metadata.json").exists()
+
+        reloaded = MetadataJournal(tmp_path)
+        assert list(reloaded.metadata) == ["a"]
+        assert reloaded.metadata["a"]["title"] == "文档A v2"
+
+    def test_clear(self, tmp_path):
+        journal = MetadataJournal(tmp_path)
+        journal.put("a", make_metadata("a", "文档A"))
+        journal.clear()
+        journal.put("b", make_metadata("b", "文档B"))
+        journal.close()
+
+        assert list(MetadataJournal(tmp_path).metadata) == ["b"]
+
+    def test_torn_tail_is_truncated(self, tmp_path):
+        journal = MetadataJournal(tmp_path)
+        journal.put("a", make_metadata("a", "文档A"))
+        journal.close()
+
+        # 模拟写入过程中崩溃：最后一行只写了一半
+        with open(tmp_path / "metadata.journal", "a", encoding="utf-8") as f:
+            f.write('{"op":"put","id":"b","metad')
+
+        reloaded = MetadataJournal(tmp_path)
+        assert list(reloaded.metadata) == ["a"]
+
+        # 截断后继续追加的日志可以被正常回放
+        reloaded.put("c", make_metadata("c", "文档C"))
+        reloaded.close()
+        assert list(MetadataJournal(tmp_path).metadata) == ["a", "c"]
+
+    def test_compaction_writes_snapshot(self, tmp_path):
+        journal = MetadataJournal(tmp_path, compact_threshold=10)
+        for i in range(25):
+            journal.put(f"id-{i}", make_metadata(f"id-{i}", f"文档{i}"))
+        journal.close()
+        journal.compact()
+
+        with open(tmp_path / "metadata.json", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        assert len(snapshot) == 25
+        assert not (tmp_path / "metadata.journal.compacting").exists()
+        assert len(MetadataJournal(tmp_path).metadata) == 25
+
+    def test_recover_from_interrupted_compaction(self, tmp_path):
+        journal = MetadataJournal(tmp_path)
+        journal.put("a", make_metadata("a", "文档A"))
+        journal.put("b", make_metadata("b", "文档B"))
+        journal.close()
+
+        # 模拟压缩时日志已轮转、快照尚未写入就崩溃
+        (tmp_path / "metadata.journal").rename(
+            tmp_path / "metadata.journal.compacting"
+        )
+        journal = MetadataJournal(tmp_path)
+        journal.delete("a")
+        journal.close()
+
+        reloaded = MetadataJournal(tmp_path)
+        assert list(reloaded.metadata) == ["b"]
+
+        reloaded.compact()
+        reloaded.close()
+        assert list(MetadataJournal(tmp_path).metadata) == ["b"]
@@ -0,0 +1,38 @@
+"""
+Prompt 模板渲染测试
+"""
+import time
+
+from synphora.prompt import AgentPrompts
+from synphora.prompt.renderer import PromptRenderer
+
+
+class TestPromptRenderer:
+    def test_static_template_rendered_once(self):
+        prompts = AgentPrompts()
+        first = prompts.system()
+        assert first
+        # 不含变量的模板直接返回缓存的渲染结果
+        assert prompts.system() is first
+
+    def test_template_with_variables(self):
+        prompt = AgentPrompts().user(user_message="什么是动态规划")
+        assert "用户请求：什么是动态规划" in prompt
+
+    def test_reload_on_change(self, tmp_path):
+        template = tmp_path / "greeting.md"
+        template.write_text("你好", encoding="utf-8")
+        renderer = PromptRenderer(tmp_path, watch=False)
+        renderer.start_watching(interval=0.01)
+        try:
+            assert renderer.render("greeting") == "你好"
+
+            template.write_text("你好，{{ name }}", encoding="utf-8")
+            deadline = time.monotonic() + 2
+            while renderer.render("greeting", name="小明") == "你好":
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+
+            assert renderer.render("greeting", name="小明") == "你好，小明"
+        finally:
+            renderer.stop_watching()
@@ -0,0 +1,184 @@
+"""
+会话管理器淘汰策略测试
+"""
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from synphora.session_manager import SessionManager, estimate_messages_bytes
+from synphora.session_store import MemorySessionStore, SqliteSessionStore
+
+
+def make_messages(n: int, size: int = 100):
+    messages = []
+    for _ in range(n):
+        messages.append(HumanMessage(content="问" * size))
+        messages.append(AIMessage(content="答" * size))
+    return messages
+
+
+class TestSessionManager:
+    def test_lru_eviction_by_count(self):
+        manager = SessionManager(max_sessions=2)
+        manager.get_or_create_session("a")
+        manager.get_or_create_session("b")
+        # 访问 a 后，b 成为最久未访问的会话
+        manager.get_or_create_session("a")
+        manager.get_or_create_session("c")
+
+        assert manager.memory_stats()["sessions"] == 2
+        assert manager.get_or_create_session("a")[1] is False
+        assert manager.get_or_create_session("b")[1] is True
+
+    def test_eviction_by_bytes(self):
+        messages = make_messages(5)
+        one = estimate_messages_bytes(messages)
+        manager = SessionManager(max_bytes=one * 2)
+        for session_id in ["a", "b", "c"]:
+            manager.set_session_messages(session_id, list(messages))
+
+        stats = manager.memory_stats()
+        assert stats["sessions"] == 2
+        assert stats["total_bytes"] == one * 2
+        assert manager.get_session_bytes("a") == 0
+        assert manager.get_session_bytes("c") == one
+
+    def test_idle_ttl(self):
+        manager = SessionManager(idle_ttl_seconds=60)
+        session, _ = manager.get_or_create_session("old")
+        session.last_accessed_at = datetime.now() - timedelta(seconds=120)
+        manager.get_or_create_session("new")
+
+        assert manager.evict_idle() == 0  # 创建 new 时已经清理
+        assert manager.memory_stats()["sessions"] == 1
+        assert manager.memory_stats()["evicted"] == 1
+
+    def test_set_messages_after_eviction(self):
+        manager = SessionManager(max_sessions=1)
+        manager.get_or_create_session("a")
+        manager.get_or_create_session("b")
+        # a 在运行期间被淘汰，保存消息时重新创建
+        manager.set_session_messages("a", make_messages(1))
+
+        assert len(manager.get_session("a").get_messages()) == 2
+
+    def test_slow_store_does_not_block_other_sessions(self):
+        release = threading.Event()
+
+        class SlowStore(MemorySessionStore):
+            def append(self, session_id, start, messages, updated_at):
+                if session_id == "slow":
+                    release.wait(timeout=5)
+
+            def load(self, session_id):
+                if session_id == "slow-load":
+                    release.wait(timeout=5)
+                return None
+
+        manager = SessionManager(store=SlowStore())
+        manager.get_or_create_session("slow")
+
+        async def run():
+            slow_tasks = [
+                asyncio.create_task(
+                    manager.aset_session_messages("slow", make_messages(1))
+                ),
+                asyncio.create_task(manager.aget_or_create_session("slow-load")),
+            ]
+            await asyncio.sleep(0.05)
+
+            # 另一个会话的访问和事件循环中的统计、清理都不等待慢速的存储后端
+            session, is_created = await asyncio.wait_for(
+                manager.aget_or_create_session("fast"), timeout=1
+            )
+            assert is_created
+            await asyncio.wait_for(
+                manager.aset_session_messages("fast", make_messages(1)), timeout=1
+            )
+            assert manager.memory_stats()["sessions"] == 2
+            assert manager.evict_idle() == 0
+            assert not any(task.done() for task in slow_tasks)
+
+            release.set()
+            await asyncio.gather(*slow_tasks)
+
+        asyncio.run(run())
+        assert len(manager.get_session("slow").get_messages()) == 2
+        assert manager._io_locks == {}
+
+
+class TestSqliteSessionStore:
+    def test_persist_across_restart(self, tmp_path):
+        db_path = tmp_path / "sessions.db"
+        manager = SessionManager(store=SqliteSessionStore(db_path))
+        session, is_created = manager.get_or_create_session("s1")
+        assert is_created
+
+        first = make_messages(2)
+        manager.set_session_messages("s1", first)
+        second = first + [
+            AIMessage(
+                content="",
+                tool_calls=[{"name": "read_article", "args": {"artifact_id": "c1"}, "id": "t1"}],
+            )
+        ]
+        manager.set_session_messages("s1", second)
+        manager.close()
+
+        # 模拟重启：新的管理器从数据库加载历史
+        restarted = SessionManager(store=SqliteSessionStore(db_path))
+        session, is_created = restarted.get_or_create_session("s1")
+        assert not is_created
+        assert session.get_messages() == second
+        assert session.stored_count == len(second)
+        restarted.close()
+
+    def test_append_only_new_messages(self, tmp_path):
+        store = SqliteSessionStore(tmp_path / "sessions.db")
+        manager = SessionManager(store=store)
+        manager.get_or_create_session("s1")
+        messages = make_messages(3)
+        manager.set_session_messages("s1", messages[:2])
+
+        appended = []
+        original_append = store.append
+
+        def spy(session_id, start, new_messages, updated_at):
+            appended.append((start, len(new_messages)))
+            original_append(session_id, start, new_messages, updated_at)
+
+        store.append = spy
+        manager.set_session_messages("s1", messages)
+
+        assert appended == [(2, 4)]
+        manager.close()
+
+    def test_async_access_runs_off_event_loop(self, tmp_path):
+        store = SqliteSessionStore(tmp_path / "sessions.db")
+        manager = SessionManager(store=store)
+        threads = []
+        original_load = store.load
+        original_append = store.append
+
+        def spy_load(session_id):
+            threads.append(threading.current_thread())
+            return original_load(session_id)
+
+        def spy_append(*args):
+            threads.append(threading.current_thread())
+            original_append(*args)
+
+        store.load = spy_load
+        store.append = spy_append
+
+        async def run():
+            session, is_created = await manager.aget_or_create_session("s1")
+            await manager.aset_session_messages("s1", make_messages(1))
+            return is_created
+
+        assert asyncio.run(run())
+        assert threads and threading.main_thread() not in threads
+        assert len(manager.get_session("s1").get_messages()) == 2
+        manager.close()
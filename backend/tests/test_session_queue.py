@@ -0,0 +1,109 @@
+"""
+会话请求串行化测试
+"""
+import asyncio
+
+import pytest
+
+from synphora.session_queue import SessionBusyError, SessionRunQueue
+from synphora.sse import EventType, RunFinishedReason, TextMessageEvent
+
+
+def make_run(name: str, log: list, duration: float = 0.05, stoppable: bool = True):
+    def make_events(superseded: asyncio.Event):
+        async def events():
+            log.append(f'{name} start')
+            stop = superseded if stoppable else asyncio.Event()
+            try:
+                await asyncio.wait_for(stop.wait(), duration)
+                log.append(f'{name} superseded')
+                return
+            except TimeoutError:
+                pass
+            log.append(f'{name} end')
+            yield TextMessageEvent.new(message_id=name, content=name)
+
+        return events()
+
+    return make_events
+
+
+async def collect(queue: SessionRunQueue, session_id: str, make_events):
+    return [event async for event in queue.run(session_id, make_events)]
+
+
+class TestSessionRunQueue:
+    def test_fifo(self):
+        queue = SessionRunQueue(max_queue_depth=5)
+        log = []
+
+        async def run():
+            tasks = []
+            for name in ["a", "b", "c"]:
+                tasks.append(asyncio.create_task(collect(queue, "s", make_run(name, log))))
+                await asyncio.sleep(0)
+            return await asyncio.gather(*tasks)
+
+        results = asyncio.run(run())
+
+        assert log == ["a start", "a end", "b start", "b end", "c start", "c end"]
+        assert [r[0].data.content for r in results] == ["a", "b", "c"]
+        stats = queue.stats()
+        assert stats["lock_wait"]["count"] == 3
+        assert stats["lock_wait"]["max_ms"] >= 80
+        assert stats["active_sessions"] == 0
+
+    def test_reject_when_queue_full(self):
+        queue = SessionRunQueue(max_queue_depth=1)
+        log = []
+
+        async def run():
+            running = asyncio.create_task(collect(queue, "s", make_run("a", log)))
+            await asyncio.sleep(0.01)
+            waiting = asyncio.create_task(collect(queue, "s", make_run("b", log)))
+            await asyncio.sleep(0.01)
+
+            with pytest.raises(SessionBusyError):
+                queue.check("s")
+            # 其他会话不受影响
+            queue.check("other")
+            await asyncio.gather(running, waiting)
+
+        asyncio.run(run())
+        assert queue.stats()["rejected"] == 1
+
+    def test_supersede(self):
+        queue = SessionRunQueue(supersede=True)
+        log = []
+
+        async def run():
+            old = asyncio.create_task(collect(queue, "s", make_run("a", log, 1)))
+            await asyncio.sleep(0.01)
+            new = asyncio.create_task(collect(queue, "s", make_run("b", log)))
+            return await asyncio.gather(old, new)
+
+        old_events, new_events = asyncio.run(run())
+
+        assert log == ["a start", "a superseded", "b start", "b end"]
+        assert old_events == []
+        assert new_events[0].data.content == "b"
+        assert queue.stats()["superseded"] == 1
+
+    def test_superseded_while_waiting(self):
+        queue = SessionRunQueue(supersede=True)
+        log = []
+
+        async def run():
+            # a 收到取代信号后仍需要一段时间才能停止
+            tasks = [asyncio.create_task(collect(queue, "s", make_run("a", log, 0.1, False)))]
+            for name in ["b", "c"]:
+                await asyncio.sleep(0.01)
+                tasks.append(asyncio.create_task(collect(queue, "s", make_run(name, log))))
+            return await asyncio.gather(*tasks)
+
+        _, waiting_events, _ = asyncio.run(run())
+
+        # b 还在排队就被 c 取代，不会开始运行
+        assert log == ["a start", "a end", "c start", "c end"]
+        assert waiting_events[0].type == EventType.RUN_FINISHED
+        assert waiting_events[0].data.reason == RunFinishedReason.SUPERSEDED
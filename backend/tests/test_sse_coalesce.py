@@ -0,0 +1,116 @@
+"""
+SSE 文本事件合并测试
+"""
+import asyncio
+
+from synphora.sse import ArtifactListUpdatedEvent, EventType, TextMessageEvent
+from synphora.sse_coalesce import coalesce_sse_events
+
+
+async def make_events(events, delay: float = 0):
+    for event in events:
+        if delay:
+            await asyncio.sleep(delay)
+        yield event
+
+
+def collect(events, **kwargs):
+    async def run():
+        return [event async for event in coalesce_sse_events(events, **kwargs)]
+
+    return asyncio.run(run())
+
+
+def text(message_id: str, content: str) -> TextMessageEvent:
+    return TextMessageEvent.new(message_id=message_id, content=content)
+
+
+class TestCoalesceSseEvents:
+    def test_merge_consecutive_text(self):
+        events = [text("m1", c) for c in "动态规划"]
+        result = collect(make_events(events), flush_interval_ms=1000)
+
+        assert len(result) == 1
+        assert result[0].data.message_id == "m1"
+        assert result[0].data.content == "动态规划"
+
+    def test_flush_before_other_events(self):
+        events = [
+            text("m1", "a"),
+            text("m1", "b"),
+            ArtifactListUpdatedEvent.new(),
+            text("m1", "c"),
+            text("m2", "d"),
+        ]
+        result = collect(make_events(events), flush_interval_ms=1000)
+
+        assert [e.type for e in result] == [
+            EventType.TEXT_MESSAGE,
+            EventType.ARTIFACT_LIST_UPDATED,
+            EventType.TEXT_MESSAGE,
+            EventType.TEXT_MESSAGE,
+        ]
+        assert [e.data.content for e in result if e.type == EventType.TEXT_MESSAGE] == [
+            "ab",
+            "c",
+            "d",
+        ]
+
+    def test_flush_on_size(self):
+        events = [text("m1", "xx") for _ in range(10)]
+        result = collect(make_events(events), flush_interval_ms=1000, max_chars=6)
+
+        assert [e.data.content for e in result] == ["xxxxxx", "xxxxxx", "xxxxxx", "xx"]
+
+    def test_flush_on_time_window(self):
+        # 上游每 30ms 产生一个分片，10ms 的窗口不应该把它们合并
+        events = [text("m1", c) for c in "abc"]
+        result = collect(make_events(events, delay=0.03), flush_interval_ms=10)
+
+        assert [e.data.content for e in result] == ["a", "b", "c"]
+
+    def test_disabled(self):
+        events = [text("m1", c) for c in "abc"]
+        result = collect(make_events(events), flush_interval_ms=0)
+
+        assert len(result) == 3
+
+    def test_backpressure_bounds_buffer(self):
+        # 客户端不读取时，上游最多领先缓冲区上限，不会无限读取
+        produced = 0
+
+        async def upstream():
+            nonlocal produced
+            for i in range(1000):
+                produced += 1
+                yield ArtifactListUpdatedEvent.new() if i % 2 else text("m1", "x")
+
+        async def run():
+            stream = coalesce_sse_events(
+                upstream(), flush_interval_ms=1000, max_events=8
+            )
+            await anext(stream)
+            await asyncio.sleep(0.05)
+            count = produced
+            await stream.aclose()
+            return count
+
+        assert asyncio.run(run()) <= 8 * 2 + 2
+
+    def test_close_awaits_upstream(self):
+        closed = asyncio.Event()
+
+        async def upstream():
+            try:
+                yield text("m1", "a")
+                await asyncio.sleep(10)
+            finally:
+                closed.set()
+
+        async def run():
+            stream = coalesce_sse_events(upstream(), flush_interval_ms=10)
+            await anext(stream)
+            await stream.aclose()
+            return closed.is_set()
+
+        assert asyncio.run(run())
@@ -0,0 +1,104 @@
+"""
+流式分片累加器测试
+与 LangChain 的 `chunk + chunk` 归并结果对比
+"""
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from synphora.stream_accumulator import AIMessageAccumulator
+
+
+def fold_chunks(chunks):
+    final_message = chunks[0]
+    for chunk in chunks[1:]:
+        final_message = final_message + chunk
+    return final_message
+
+
+def accumulate(chunks):
+    accumulator = AIMessageAccumulator()
+    for chunk in chunks:
+        accumulator.add(chunk)
+    return accumulator.build()
+
+
+def make_text_chunks(text: str):
+    return [AIMessageChunk(content=ch, id="run-1") for ch in text]
+
+
+def make_tool_call_chunks():
+    """两个工具调用交错到达，参数被切成很多片段"""
+    args_a = '{"artifact_id": "14-dynamic-programming-basics"}'
+    args_b = '{"artifact_id": "15-two-dimensional-dynamic-programming"}'
+    chunks = [
+        AIMessageChunk(
+            content="",
+            tool_call_chunks=[
+                {"name": "read_article", "args": "", "id": "call_a", "index": 0}
+            ],
+        ),
+        AIMessageChunk(
+            content="",
+            tool_call_chunks=[
+                {"name": "read_article", "args": "", "id": "call_b", "index": 1}
+            ],
+        ),
+    ]
+    for i in range(max(len(args_a), len(args_b))):
+        tool_call_chunks = []
+        if i < len(args_a):
+            tool_call_chunks.append(
+                {"name": None, "args": args_a[i], "id": None, "index": 0}
+            )
+        if i < len(args_b):
+            tool_call_chunks.append(
+                {"name": None, "args": args_b[i], "id": None, "index": 1}
+            )
+        chunks.append(AIMessageChunk(content="", tool_call_chunks=tool_call_chunks))
+    return chunks
+
+
+class TestAIMessageAccumulator:
+    def test_text_matches_fold(self):
+        chunks = make_text_chunks("动态规划的解题四步骤" * 50)
+
+        accumulator = AIMessageAccumulator()
+        for chunk in chunks:
+            accumulator.add(chunk)
+        message = accumulator.build()
+
+        assert isinstance(message, AIMessage)
+        assert message.content == fold_chunks(chunks).content
+        assert message.id == "run-1"
+        assert len(accumulator) == len(chunks)
+
+    def test_tool_calls_merged_by_index(self):
+        chunks = make_text_chunks("我来读一下文章") + make_tool_call_chunks()
+
+        message = accumulate(chunks)
+        expected = fold_chunks(chunks)
+
+        assert message.content == expected.content
+        assert message.tool_calls == expected.tool_calls
+        assert [tc["args"]["artifact_id"] for tc in message.tool_calls] == [
+            "14-dynamic-programming-basics",
+            "15-two-dimensional-dynamic-programming",
+        ]
+
+    def test_usage_and_metadata(self):
+        chunks = make_text_chunks("hi")
+        chunks.append(
+            AIMessageChunk(
+                content="",
+                response_metadata={"finish_reason": "stop"},
+                usage_metadata={
+                    "input_tokens": 3,
+                    "output_tokens": 2,
+                    "total_tokens": 5,
+                },
+            )
+        )
+
+        message = accumulate(chunks)
+
+        assert message.response_metadata["finish_reason"] == "stop"
+        assert message.usage_metadata["total_tokens"] == 5
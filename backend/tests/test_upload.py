@@ -0,0 +1,121 @@
+"""
+流式上传测试
+"""
+import asyncio
+import io
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from synphora import upload
+from synphora.artifact_manager import artifact_manager
+from synphora.server import app
+
+
+def make_request(body: bytes, content_length: bytes | None = None) -> Request:
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    if content_length is None:
+        content_length = str(len(body)).encode()
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "headers": [
+            (b"content-type", b"multipart/form-data; boundary=b"),
+            (b"content-length", content_length),
+        ],
+    }
+    return Request(scope, receive)
+
+
+def multipart_body(content: bytes) -> bytes:
+    return (
+        b"--b\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="a.txt"\r\n'
+        b"\r\n" + content + b"\r\n--b--\r\n"
+    )
+
+
+class TestUpload:
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def temp_files(self) -> list:
+        return list(artifact_manager._storage.storage_path.glob(".upload-*"))
+
+    def test_upload_streams_to_storage(self, client):
+        content = "第一行\n" * 10000
+        response = client.post(
+            "/artifacts/upload",
+            files={"file": ("big.md", io.BytesIO(content.encode("utf-8")), "text/markdown")},
+        )
+        assert response.status_code == 200
+        artifact_id = response.json()["id"]
+
+        assert artifact_manager.get_artifact(artifact_id).content == content
+        assert self.temp_files() == []
+        artifact_manager.delete_artifact(artifact_id)
+
+    def test_upload_too_large(self, client, monkeypatch):
+        monkeypatch.setattr(upload, "UPLOAD_MAX_BYTES", 1024)
+        response = client.post(
+            "/artifacts/upload",
+            files={"file": ("big.txt", io.BytesIO(b"a" * 4096), "text/plain")},
+        )
+        assert response.status_code == 413
+        assert self.temp_files() == []
+
+    def test_upload_invalid_utf8(self, client):
+        response = client.post(
+            "/artifacts/upload",
+            files={"file": ("bad.txt", io.BytesIO(b"ok \xff\xfe"), "text/plain")},
+        )
+        assert response.status_code == 400
+        assert self.temp_files() == []
+
+    def test_upload_without_file(self, client):
+        response = client.post("/artifacts/upload", data={"other": "value"})
+        assert response.status_code == 400
+
+    def test_malformed_content_length_uses_stream_limit(self, tmp_path):
+        body = multipart_body(b"a" * 4096)
+
+        def open_temp_file():
+            return tmp_path / "upload.tmp"
+
+        received = asyncio.run(
+            upload.receive_upload(
+                make_request(body, b"abc"), open_temp_file, max_bytes=8192
+            )
+        )
+        assert received.size == 4096
+
+        with pytest.raises(upload.UploadTooLargeError):
+            asyncio.run(
+                upload.receive_upload(
+                    make_request(body, b"abc"), open_temp_file, max_bytes=1024
+                )
+            )
+
+    def test_temp_file_opened_off_event_loop(self, tmp_path):
+        threads = []
+
+        def open_temp_file():
+            threads.append(threading.current_thread())
+            return tmp_path / "upload.tmp"
+
+        # 空文件没有数据分片，同样在线程池中创建临时文件
+        for content in [b"hello", b""]:
+            received = asyncio.run(
+                upload.receive_upload(
+                    make_request(multipart_body(content)), open_temp_file
+                )
+            )
+            assert received.path.read_bytes() == content
+
+        assert len(threads) == 2
+        assert threading.main_thread() not in threads
@@ -0,0 +1,79 @@
+"""
+虚拟 artifact（引用课程文件，不复制内容）测试
+"""
+from synphora.agent import _save_course_artifact
+from synphora.artifact_manager import artifact_manager
+from synphora.course import course_manager
+from synphora.file_storage import FileStorage
+from synphora.models import ArtifactType
+
+
+class TestVirtualArtifact:
+    def setup_method(self):
+        self.storage = FileStorage()
+
+    def teardown_method(self):
+        self.storage.cleanup_temp_storage()
+
+    def test_content_is_read_from_source(self, tmp_path):
+        source = tmp_path / "course.md"
+        source.write_text("# 课程\n\n正文\n", encoding="utf-8")
+
+        self.storage.create_virtual_artifact(
+            "course-1", title="课程", source_path=source, artifact_type=ArtifactType.COURSE
+        )
+
+        assert self.storage.get_artifact("course-1").content == "# 课程\n\n正文\n"
+        assert self.storage.get_artifact_content_path("course-1") == source
+        assert not (self.storage.storage_path / "course-1.txt").exists()
+
+    def test_recreate_is_idempotent(self, tmp_path):
+        source = tmp_path / "course.md"
+        source.write_text("正文", encoding="utf-8")
+        self.storage.create_virtual_artifact("course-1", title="课程", source_path=source)
+        version = self.storage.version
+        journal_size = self.storage._journal.journal_file.stat().st_size
+
+        metadata = self.storage.create_virtual_artifact("course-1", title="课程", source_path=source)
+
+        assert metadata.id == "course-1"
+        assert self.storage.version == version
+        assert self.storage._journal.journal_file.stat().st_size == journal_size
+
+    def test_update_and_delete_never_touch_source(self, tmp_path):
+        source = tmp_path / "course.md"
+        source.write_text("原始正文", encoding="utf-8")
+        self.storage.create_virtual_artifact("course-1", title="课程", source_path=source)
+
+        self.storage.update_artifact("course-1", content="修改后的正文")
+        assert self.storage.get_artifact("course-1").content == "修改后的正文"
+        assert source.read_text(encoding="utf-8") == "原始正文"
+
+        self.storage.create_virtual_artifact("course-2", title="课程", source_path=source)
+        self.storage.delete_artifact("course-2")
+        self.storage.clear_all()
+        assert source.exists()
+
+    def test_source_change_changes_etag(self, tmp_path):
+        source = tmp_path / "course.md"
+        source.write_text("正文", encoding="utf-8")
+        self.storage.create_virtual_artifact("course-1", title="课程", source_path=source)
+        etag = self.storage.get_artifact_etag("course-1")
+
+        source.write_text("修改后的正文", encoding="utf-8")
+        assert self.storage.get_artifact_etag("course-1") != etag
+
+
+class TestCourseCitation:
+    def test_citing_course_again_does_not_write(self):
+        artifact_id = course_manager.list_courses()[0].artifact_id
+        _save_course_artifact(artifact_id)
+        version = artifact_manager.get_list_version()
+
+        _save_course_artifact(artifact_id)
+
+        assert artifact_manager.get_list_version() == version
+        artifact = artifact_manager.get_artifact(artifact_id)
+        assert artifact.content == course_manager.read_course_content(artifact_id)
+        artifact_manager.delete_artifact(artifact_id)
+        assert course_manager.get_course_file_path(artifact_id).exists()
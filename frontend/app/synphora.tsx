@@ -1,12 +1,17 @@
 "use client";
 
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import useSWR from "swr";
 
 import { ArtifactDetail, ArtifactList } from "@/components/artifact";
 import { Chatbot } from "@/components/chatbot";
 import { ArtifactContext } from "@/app/artifact-context";
-import { fetchArtifacts } from "@/lib/api";
+import {
+  fetchArtifact,
+  fetchArtifacts,
+  getArtifactListVersion,
+  setArtifactListVersion,
+} from "@/lib/api";
 import { isSynphoraPageTest } from "@/lib/env";
 import {
   getSynphoraInitialArtifactStatus,
@@ -14,6 +19,7 @@ import {
 } from "@/lib/synphora-data";
 import {
   ArtifactData,
+  ArtifactListDelta,
   ArtifactStatus,
   ArtifactType,
   MessageRole,
@@ -90,6 +96,36 @@ const SynphoraPage = () => {
     setCurrentArtifactId,
   } = useArtifacts(initialArtifactStatus, artifactsData, initialArtifactId);
 
+  // 列表只有元数据，打开 artifact 时再获取内容
+  const currentArtifactId = currentArtifact?.id;
+  const needsContent =
+    currentArtifact !== undefined &&
+    currentArtifact.content === undefined &&
+    !currentArtifact.isStreaming;
+  useEffect(() => {
+    if (!currentArtifactId || !needsContent) return;
+    let cancelled = false;
+    fetchArtifact(currentArtifactId)
+      .then((artifact) => {
+        if (cancelled) return;
+        mutate(
+          (prev: ArtifactData[] = []) =>
+            prev.map((a) =>
+              a.id === artifact.id && a.content === undefined
+                ? { ...a, ...artifact }
+                : a
+            ),
+          false
+        );
+      })
+      .catch((error) => {
+        console.error("Error fetching artifact content:", error);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [currentArtifactId, needsContent, mutate]);
+
   if (isLoading) {
     return (
       <div className="flex items-center justify-center h-screen text-gray-500">
@@ -166,9 +202,31 @@ const SynphoraPage = () => {
     );
   };
 
-  const onArtifactListUpdated = () => {
-    // 以服务端为准，刷新缓存
-    mutate();
+  const onArtifactListUpdated = (delta?: ArtifactListDelta) => {
+    // 没有增量、增量无法计算，或本地列表版本与增量的起点不一致（漏掉了变化）时，以服务端为准全量刷新
+    if (!delta || delta.resync || delta.base_version !== getArtifactListVersion()) {
+      mutate();
+      return;
+    }
+
+    // 增量只含元数据：更新过的 artifact 丢弃本地内容，打开时重新获取
+    const removed = new Set(delta.removed);
+    const changed: ArtifactData[] = [...delta.added, ...delta.updated];
+    const changedById = new Map(changed.map((a) => [a.id, a]));
+
+    setArtifactListVersion(delta.version);
+    mutate((prev: ArtifactData[] = []) => {
+      const next = prev
+        .filter((a) => !removed.has(a.id))
+        .map((a) => {
+          const metadata = changedById.get(a.id);
+          if (!metadata) return a;
+          // 正在流式生成的 artifact 内容由流式事件维护
+          return a.isStreaming ? { ...a, ...metadata } : { ...metadata };
+        });
+      const existing = new Set(next.map((a) => a.id));
+      return [...next, ...changed.filter((a) => !existing.has(a.id))];
+    }, false);
   };
 
   return (
@@ -48,7 +48,11 @@ export const ArtifactDetail = ({
         </ArtifactActions>
       </ArtifactHeader>
       <ArtifactContent className="p-0 h-full">
-        {artifact.type === ArtifactType.MIND_MAP ? (
+        {artifact.content === undefined ? (
+          <div className="flex items-center justify-center h-full text-gray-500">
+            <Loader2 className="h-5 w-5 animate-spin" />
+          </div>
+        ) : artifact.type === ArtifactType.MIND_MAP ? (
           <MindMap content={artifact.content} />
         ) : (
           <Markdown content={artifact.content} />
@@ -20,6 +20,7 @@ import { MessageComponent } from "@/components/message";
 import { isShowDebugInfo } from "@/lib/env";
 import { getSynphoraInitialMessages } from "@/lib/synphora-data";
 import {
+  ArtifactListDelta,
   ChatMessage,
   ChatStatus,
   MessageRole,
@@ -62,7 +63,7 @@ export const Chatbot = ({
   ) => void;
   onArtifactContentChunk: (artifactId: string, chunk: string) => void;
   onArtifactContentComplete: (artifactId: string) => void;
-  onArtifactListUpdated: () => void;
+  onArtifactListUpdated: (delta?: ArtifactListDelta) => void;
   onArtifactNavigate?: (artifactId: string) => void;
 }) => {
   const initialMessages = getSynphoraInitialMessages();
@@ -203,7 +204,7 @@ export const Chatbot = ({
 
                 case "ARTIFACT_LIST_UPDATED":
                   console.log("Artifact list updated:", eventData.data);
-                  onArtifactListUpdated();
+                  onArtifactListUpdated(eventData.data);
                   break;
 
                 case "TOOL_CALL_START":
@@ -2,6 +2,18 @@ import { ArtifactData } from './types';
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://127.0.0.1:8000';
 
+// 最近一次获取的 artifact 列表版本号，用于判断 ARTIFACT_LIST_UPDATED 增量能否直接应用
+let artifactListVersion: number | null = null;
+
+export function getArtifactListVersion(): number | null {
+  return artifactListVersion;
+}
+
+export function setArtifactListVersion(version: number) {
+  artifactListVersion = version;
+}
+
+// 获取 artifact 列表（只含元数据），内容通过 fetchArtifact 按需获取
 export async function fetchArtifacts(): Promise<ArtifactData[]> {
   try {
     const response = await fetch(`${API_BASE_URL}/artifacts`);
@@ -11,6 +23,7 @@ export async function fetchArtifacts(): Promise<ArtifactData[]> {
     }
     
     const data = await response.json();
+    artifactListVersion = data.version;
     return data.artifacts;
   } catch (error) {
     console.error('Error fetching artifacts:', error);
@@ -18,6 +31,16 @@ export async function fetchArtifacts(): Promise<ArtifactData[]> {
   }
 }
 
+export async function fetchArtifact(artifactId: string): Promise<ArtifactData> {
+  const response = await fetch(`${API_BASE_URL}/artifacts/${artifactId}`);
+
+  if (!response.ok) {
+    throw new Error(`Failed to fetch artifact: ${response.status}`);
+  }
+
+  return response.json();
+}
+
 export async function createArtifact(title: string, content: string, description?: string): Promise<ArtifactData> {
   const response = await fetch(`${API_BASE_URL}/artifacts`, {
     method: 'POST',
@@ -74,13 +74,26 @@ export enum ArtifactType {
   OTHER = 'other',
 }
 
+export type ArtifactMetadata = Omit<ArtifactData, 'content' | 'isStreaming'>;
+
+// ARTIFACT_LIST_UPDATED 事件携带的列表增量
+export interface ArtifactListDelta {
+  base_version: number;
+  version: number;
+  added: ArtifactMetadata[];
+  updated: ArtifactMetadata[];
+  removed: string[];
+  resync: boolean;
+}
+
 export interface ArtifactData {
   id: string;
   role: MessageRole;
   type: ArtifactType;
   title: string;
   description?: string;
-  content: string;
+  // GET /artifacts 只返回元数据，内容在打开 artifact 时才获取，获取之前为 undefined
+  content?: string;
   created_at?: string;
   updated_at?: string;
   isStreaming?: boolean; // 新增：流式状态标识